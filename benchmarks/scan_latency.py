@@ -0,0 +1,83 @@
+"""
+Benchmark tree scanning on a filesystem with slow round-trips
+
+Every directory listing and stat is delayed by a fixed latency, roughly
+what an NFS or SSHFS mount costs per call, and the tree is walked with
+different numbers of scan workers.
+
+Usage:
+    python benchmarks/scan_latency.py --latency 2 --dirs 200 --notes 5
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from notes_tui.core.notes_manager import NotesManager  # noqa: E402
+
+
+def make_tree(root: Path, dirs: int, notes: int) -> None:
+    """Create folders nested up to three deep, each holding a few notes"""
+    for i in range(dirs):
+        directory = root / f"area{i % 10}" / f"topic{i % 7}" / f"folder{i}"
+        directory.mkdir(parents=True, exist_ok=True)
+        for j in range(notes):
+            (directory / f"note{j}.md").write_text(f"# Note {j}\n")
+
+
+def add_latency(seconds: float) -> None:
+    """Delay every os.scandir and os.stat call like a network filesystem"""
+    scandir, stat = os.scandir, os.stat
+    
+    def slow_scandir(*args, **kwargs):
+        time.sleep(seconds)
+        return scandir(*args, **kwargs)
+    
+    def slow_stat(*args, **kwargs):
+        time.sleep(seconds)
+        return stat(*args, **kwargs)
+    
+    os.scandir, os.stat = slow_scandir, slow_stat
+
+
+def main() -> None:
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency', type=float, default=2.0,
+                        help="Delay per directory listing or stat, in milliseconds")
+    parser.add_argument('--dirs', type=int, default=200, help="Number of leaf folders")
+    parser.add_argument('--notes', type=int, default=5, help="Notes per leaf folder")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16],
+                        help="Scan worker counts to compare")
+    args = parser.parse_args()
+    
+    with TemporaryDirectory() as notes_dir:
+        root = Path(notes_dir)
+        make_tree(root, args.dirs, args.notes)
+        add_latency(args.latency / 1000)
+        print(f"{args.dirs} folders, {args.dirs * args.notes} notes, "
+              f"{args.latency:g}ms per call")
+        print(f"{'workers':>8} {'tree':>10} {'catalog':>10}")
+        
+        for workers in args.workers:
+            manager = NotesManager(root, scan_workers=workers)
+            start = time.perf_counter()
+            manager.get_directory_tree()
+            tree_time = time.perf_counter() - start
+            
+            # A cold catalog walks every folder and stats every note
+            manager = NotesManager(root, scan_workers=workers)
+            start = time.perf_counter()
+            manager.catalog.refresh()
+            catalog_time = time.perf_counter() - start
+            
+            print(f"{workers:>8} {tree_time * 1000:>8.0f}ms {catalog_time * 1000:>8.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
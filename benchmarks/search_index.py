@@ -0,0 +1,90 @@
+"""
+Benchmark the persistent search index against scanning every note
+
+Builds an index over a generated corpus, then times a cold start, the
+refresh after a single edit and a few queries, next to a brute-force scan
+of the same notes.
+
+Usage:
+    python benchmarks/search_index.py --notes 20000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from notes_tui.core.catalog import NoteCatalog  # noqa: E402
+from notes_tui.core.search import Search  # noqa: E402
+from notes_tui.core.search_index import SearchIndex  # noqa: E402
+
+
+def make_corpus(root: Path, notes: int, words: int) -> None:
+    """Write notes of random lines drawn from a Zipf-like vocabulary"""
+    rng = random.Random(42)
+    vocabulary = [
+        ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 10)))
+        for _ in range(50000)
+    ]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    for i in range(notes):
+        directory = root / f"area{i % 20}"
+        directory.mkdir(exist_ok=True)
+        drawn = rng.choices(vocabulary, weights, k=words)
+        lines = [' '.join(drawn[j:j + 12]) for j in range(0, words, 12)]
+        (directory / f"note{i}.md").write_text(f"# Note {i}\n\n" + '\n'.join(lines))
+
+
+def timed(label: str, func):
+    """Run a function and print how long it took"""
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<32} {(time.perf_counter() - start) * 1000:>9.1f}ms")
+    return result
+
+
+def main() -> None:
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--notes', type=int, default=20000, help="Number of notes")
+    parser.add_argument('--words', type=int, default=400, help="Words per note")
+    parser.add_argument('--queries', nargs='+', default=['note', 'abc', 'qz', 'a'],
+                        help="Queries to time")
+    args = parser.parse_args()
+    
+    with TemporaryDirectory() as notes_dir, TemporaryDirectory() as cache_dir:
+        root = Path(notes_dir)
+        make_corpus(root, args.notes, args.words)
+        index_path = Path(cache_dir) / 'index.sqlite'
+        catalog = NoteCatalog(root)
+        catalog.ensure_fresh()
+        print(f"{args.notes} notes, {args.words} words each")
+        
+        timed("build", lambda: SearchIndex(root, index_path).update(catalog))
+        size = sum(f.stat().st_size for f in Path(cache_dir).iterdir())
+        print(f"{'index size':<32} {size / 1024 / 1024:>9.1f}MB")
+        
+        index = SearchIndex(root, index_path)
+        timed("cold load", index.load)
+        timed("refresh, nothing changed", lambda: index.update(catalog))
+        
+        edited = root / 'area0' / 'note0.md'
+        edited.write_text(edited.read_text() + '\nfreshly edited line\n')
+        catalog.invalidate([edited])
+        timed("refresh after one edit", lambda: index.update(catalog))
+        
+        indexed = Search(root, index_path=index_path, catalog=catalog, cache_size=0)
+        scanned = Search(root, catalog=catalog, cache_size=0)
+        indexed.search('warmup')
+        for query in args.queries:
+            found = timed(f"indexed search {query!r}", lambda: indexed.search(query))
+            timed(f"scan search {query!r}", lambda: scanned.search(query))
+            print(f"{'':<32} {len(found):>9} results")
+
+
+if __name__ == '__main__':
+    main()
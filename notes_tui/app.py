@@ -3,10 +3,12 @@ Main TUI application using Textual framework
 """
 
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+from textual import work
 from textual.app import App, ComposeResult
 from textual.containers import Container, Horizontal, Vertical
 from textual.screen import Screen
+from textual.timer import Timer
 from textual.widgets import Header, Footer, Static
 from textual.binding import Binding
 from rich.markdown import Markdown
@@ -16,10 +18,16 @@ from notes_tui.widgets.note_view import NotePreview
 from notes_tui.widgets.status_bar import StatusBar
 from notes_tui.widgets.template_dialog import TemplateSelectionDialog
 from notes_tui.widgets.input_dialog import InputDialog
+from notes_tui.screens.search_screen import SearchScreen
+from notes_tui.screens.quick_open import QuickOpenScreen
 from notes_tui.core.notes_manager import NotesManager
 from notes_tui.core.config import Config
 from notes_tui.core.template_manager import TemplateManager
 from notes_tui.core.editor_manager import EditorManager
+from notes_tui.core.search import Search
+from notes_tui.core.search_index import default_index_path
+from notes_tui.core.session import SessionState
+from notes_tui.core.watcher import DELETED, MOVED, RESCAN, FileEvent, Watcher, create_watcher
 
 
 class NotesApp(App):
@@ -70,6 +78,7 @@ class NotesApp(App):
         Binding("p", "toggle_preview", "Preview", show=True),
         Binding("r", "refresh", "Refresh", show=True),
         Binding("/", "search", "Search", show=True),
+        Binding("o", "quick_open", "Open", show=True),
         Binding("?", "help", "Help", show=True),
         
         # Quit
@@ -90,7 +99,42 @@ class NotesApp(App):
         
         # Initialize managers using config
         self.notes_dir = self.config.notes_directory
-        self.notes_manager = NotesManager(self.notes_dir)
+        self.notes_manager = NotesManager(
+            self.notes_dir,
+            search_workers=self.config.get('search.workers', 1),
+            search_processes=self.config.get('search.use_processes', False),
+            snapshot_path=(
+                default_index_path(self.notes_dir, self.config.cache_directory, 'tree', '.pickle')
+                if self.config.get('ui.tree_snapshot', True) else None
+            ),
+            scan_workers=self.config.get('ui.scan_workers', 1)
+        )
+        # Show the tree from the last run's listings; checked after mount
+        self.notes_manager.load_snapshot()
+        self.search = Search(
+            self.notes_dir,
+            index_path=(
+                default_index_path(self.notes_dir, self.config.cache_directory)
+                if self.config.get('search.index', True) else None
+            ),
+            workers=self.config.get('search.workers', 1),
+            use_processes=self.config.get('search.use_processes', False),
+            cache_size=self.config.get('search.cache_size', 32),
+            max_results=self.config.get('search.max_results', 0),
+            metadata_path=(
+                default_index_path(
+                    self.notes_dir, self.config.cache_directory, 'metadata', '.pickle'
+                )
+                if self.config.get('search.index', True) else None
+            ),
+            catalog=self.notes_manager.catalog
+        )
+        # Expanded folders, selected note and preview scroll of the last run
+        self.session = SessionState(
+            self.notes_dir,
+            default_index_path(self.notes_dir, self.config.cache_directory, 'session', '.pickle')
+            if self.config.get('ui.restore_session', True) else None
+        )
         self.template_manager = TemplateManager(self.config)
         self.editor_manager = EditorManager(self.config)
         
@@ -101,6 +145,15 @@ class NotesApp(App):
         # Current selected note
         self.current_note: Optional[Path] = None
     
+        # File watcher, started after mount if enabled
+        self.watcher: Optional[Watcher] = None
+        # Preview highlighted notes once the cursor rests this long (None: on Enter only)
+        self.preview_delay: Optional[float] = (
+            max(self.config.get('ui.preview_delay_ms', 150), 0) / 1000
+            if self.config.get('ui.preview_on_highlight', False) else None
+        )
+        self._preview_timer: Optional[Timer] = None
+    
     def compose(self) -> ComposeResult:
         """Create child widgets for the app"""
         yield Header()
@@ -108,9 +161,16 @@ class NotesApp(App):
         with Horizontal(id="main-container"):
             yield NotesTreeView(
                 notes_manager=self.notes_manager,
+                page_size=self.config.get('display.max_files', 1000),
+                prefetch=self.config.get('ui.prefetch_notes', 3),
                 id="tree-pane"
             )
-            yield NotePreview(id="note-pane")
+            yield NotePreview(
+                cache_bytes=self.config.get('ui.preview_cache_mb', 32) * 1024 * 1024,
+                window_bytes=self.config.get('ui.preview_window_kb', 64) * 1024,
+                prefetch_bytes=self.config.get('ui.prefetch_mb', 8) * 1024 * 1024,
+                id="note-pane"
+            )
         
         yield StatusBar(id="status-bar")
         yield Footer()
@@ -121,6 +181,128 @@ class NotesApp(App):
         # Set focus to tree view for immediate navigation
         tree_view = self.query_one("#tree-pane", NotesTreeView)
         tree_view.focus()
+        self.restore_session()
+        
+        self.revalidate_tree()
+        if self.config.get('watch.enabled', False):
+            self.start_watcher()
+    
+    def restore_session(self) -> None:
+        """Bring back the folders, note and preview scroll of the last run
+        
+        Folders are listed from the tree snapshot, so only the expanded
+        ones are read and none needs a scan unless it changed since.
+        """
+        if not self.session.load():
+            return
+        tree_view = self.query_one("#tree-pane", NotesTreeView)
+        selected = self.session.selected_path()
+        tree_view.restore_state(self.session.expanded_paths(), selected)
+        if selected is None:
+            return
+        
+        self.current_note = selected
+        note_preview = self.query_one("#note-pane", NotePreview)
+        note_preview.load_note(selected, scroll_y=self.session.preview_scroll)
+        self.update_status(f"Viewing: {selected.relative_to(self.notes_dir)}")
+    
+    def save_session(self) -> None:
+        """Save the expanded folders, note and preview scroll for the next run"""
+        tree_view = self.query_one("#tree-pane", NotesTreeView)
+        note_preview = self.query_one("#note-pane", NotePreview)
+        self.session.record(
+            tree_view.expanded_folders(), self.current_note, note_preview.scroll_y
+        )
+        try:
+            self.session.save()
+        except OSError:
+            # Losing the session only costs re-expanding folders
+            pass
+    
+    async def action_quit(self) -> None:
+        """Action: Save the session and quit"""
+        self.save_session()
+        await super().action_quit()
+    
+    def on_unmount(self) -> None:
+        """Stop the file watcher and the search process pool"""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        self.search.close()
+    
+    @work(exclusive=True, thread=True, group="tree")
+    def revalidate_tree(self) -> None:
+        """Check the tree snapshot against the disk on a worker thread
+        
+        Folders that changed since the snapshot was saved are patched into
+        the tree once the check finishes.
+        """
+        changed = self.notes_manager.revalidate()
+        if changed:
+            tree_view = self.query_one("#tree-pane", NotesTreeView)
+            # The catalog is already in sync; only the widgets need updating
+            self.call_from_thread(tree_view.refresh_tree, changed, invalidate=False)
+    
+    @work(exclusive=True, thread=True, group="watcher")
+    def start_watcher(self) -> None:
+        """Start watching the notes directory on a worker thread
+        
+        Setting up the watch walks every folder, so it stays off the UI thread.
+        """
+        self.watcher = create_watcher(
+            self.notes_dir,
+            self._on_watch_events,
+            debounce=self.config.get('watch.debounce', 1.0),
+            poll_interval=self.config.get('watch.poll_interval', 2.0)
+        )
+    
+    def _on_watch_events(self, events: List[FileEvent]) -> None:
+        """Hand a batch of file events from the watcher thread to the UI"""
+        self.call_from_thread(self.apply_file_events, events)
+    
+    def apply_file_events(self, events: List[FileEvent]) -> None:
+        """Update the tree, search and preview for notes changed on disk
+        
+        Args:
+            events: Coalesced events from the file watcher
+        """
+        tree_view = self.query_one("#tree-pane", NotesTreeView)
+        note_preview = self.query_one("#note-pane", NotePreview)
+        
+        if any(event.kind == RESCAN for event in events):
+            tree_view.refresh_tree()
+            self.search.invalidate()
+            if self.current_note is not None and self.current_note.exists():
+                note_preview.load_note(self.current_note)
+            return
+        
+        paths = []
+        for event in events:
+            paths.append(event.path)
+            if event.dest is not None:
+                paths.append(event.dest)
+        tree_view.refresh_tree(paths)
+        self.search.update_notes(paths)
+        
+        current = self.current_note
+        if current is None:
+            return
+        for event in events:
+            if current != event.path and event.path not in current.parents:
+                continue
+            if event.kind == MOVED:
+                current = event.dest / current.relative_to(event.path)
+            elif event.kind == DELETED:
+                self.current_note = None
+                note_preview.clear()
+                self.update_status(f"Note removed on disk: {current.name}")
+                return
+        
+        if current != self.current_note or any(event.path == current for event in events):
+            self.current_note = current
+            note_preview.load_note(current)
+            self.update_status(f"Reloaded from disk: {current.relative_to(self.notes_dir)}")
     
     def on_notes_tree_view_note_selected(self, event: NotesTreeView.NoteSelected) -> None:
         """Handle note selection from tree view
@@ -128,15 +310,56 @@ class NotesApp(App):
         Args:
             event: Note selection event
         """
-        self.current_note = event.note_path
+        self.view_note(event.note_path)
+    
+    def view_note(self, note_path: Path) -> None:
+        """Make a note current and show it in the preview pane
+        
+        Args:
+            note_path: Path to the note
+        """
+        self._cancel_preview_timer()
+        self.current_note = note_path
         
         # Load note in preview pane
         note_preview = self.query_one("#note-pane", NotePreview)
-        note_preview.load_note(event.note_path)
+        note_preview.load_note(note_path)
         
         # Update status
-        rel_path = event.note_path.relative_to(self.notes_dir)
+        rel_path = note_path.relative_to(self.notes_dir)
         self.update_status(f"Viewing: {rel_path}")
+    
+    def on_notes_tree_view_note_highlighted(self, event: NotesTreeView.NoteHighlighted) -> None:
+        """Prepare the notes the tree cursor is moving towards, and preview
+        the highlighted one once the cursor rests on it
+        
+        Args:
+            event: Note highlighted event
+        """
+        note_preview = self.query_one("#note-pane", NotePreview)
+        note_preview.prefetch(event.ahead, event.direction)
+        if self.preview_delay is not None:
+            # Each move restarts the wait, so notes passed over are never loaded
+            self._cancel_preview_timer()
+            self._preview_timer = self.set_timer(
+                self.preview_delay, lambda: self._preview_highlighted(event.note_path)
+            )
+    
+    def _preview_highlighted(self, note_path: Path) -> None:
+        """Show the note the cursor rested on, unless it is already shown
+        
+        Args:
+            note_path: Path to the highlighted note
+        """
+        self._preview_timer = None
+        if note_path != self.current_note:
+            self.view_note(note_path)
+    
+    def _cancel_preview_timer(self) -> None:
+        """Drop a pending preview of a highlighted note"""
+        if self._preview_timer is not None:
+            self._preview_timer.stop()
+            self._preview_timer = None
 
     def update_status(self, message: str) -> None:
         """Update the status bar message"""
@@ -299,9 +522,12 @@ class NotesApp(App):
                 success = self.editor_manager.launch(note_path)
             
             if success:
+                # The note may have been created or changed
+                self.search.update_notes([note_path])
+                
                 # Refresh the tree view
                 tree_view = self.query_one("#tree-pane", NotesTreeView)
-                tree_view.refresh_tree()
+                tree_view.refresh_tree([note_path])
                 
                 # Set as current note
                 self.current_note = note_path
@@ -377,6 +603,7 @@ class NotesApp(App):
                 success = self.editor_manager.launch(self.current_note)
                 
             if success:
+                self.search.update_notes([self.current_note])
                 self.update_status(f"Edited: {self.current_note.name}")
                 # Refresh the preview
                 note_preview = self.query_one("#note-pane", NotePreview)
@@ -389,7 +616,42 @@ class NotesApp(App):
 
     def action_search(self) -> None:
         """Action: Open search interface"""
-        self.update_status("Search not yet implemented")
+        self.update_status("Search notes...")
+        self.push_screen(SearchScreen(self.search), self._on_search_result)
+    
+    def action_quick_open(self) -> None:
+        """Action: Open a note by fuzzy-matching its path
+        
+        The palette opens at once on the last path index; notes added or
+        removed since are picked up by a worker and shown when it is done.
+        """
+        self.update_status("Open note...")
+        screen = QuickOpenScreen(self.notes_manager.path_finder, self.notes_dir)
+        self.push_screen(screen, self._on_search_result)
+        self.refresh_path_finder(screen)
+    
+    @work(exclusive=True, thread=True, group="quick-open")
+    def refresh_path_finder(self, screen: QuickOpenScreen) -> None:
+        """Bring the path index up to date on a worker thread
+        
+        Args:
+            screen: Quick open screen to hand the new index to
+        """
+        path_finder = self.notes_manager.get_path_finder()
+        if path_finder is not screen.path_finder:
+            self.call_from_thread(screen.set_path_finder, path_finder)
+    
+    def _on_search_result(self, note_path: Optional[Path]) -> None:
+        """Callback when a search or quick open result is chosen
+        
+        Args:
+            note_path: Path of the chosen note or None if cancelled
+        """
+        if note_path is None:
+            self.update_status("Cancelled")
+            return
+        
+        self.view_note(note_path)
     
     def action_toggle_preview(self) -> None:
         """Action: Toggle preview pane visibility"""
@@ -400,6 +662,7 @@ class NotesApp(App):
     
     def action_refresh(self) -> None:
         """Action: Refresh tree view"""
+        self.search.invalidate()
         tree_view = self.query_one("#tree-pane", NotesTreeView)
         tree_view.refresh_tree()
         self.update_status("Tree view refreshed")
@@ -413,6 +676,7 @@ class NotesApp(App):
         help_text += f"  {self.config.get_keybinding('edit_note')} - Edit selected note\n"
         help_text += f"  {self.config.get_keybinding('delete_note')} - Delete selected note\n"
         help_text += f"  {self.config.get_keybinding('search')} - Search notes\n"
+        help_text += f"  {self.config.get_keybinding('quick_open') or 'o'} - Quick open note by path\n"
         help_text += f"  {self.config.get_keybinding('toggle_preview')} - Toggle preview pane\n"
         help_text += f"  {self.config.get_keybinding('refresh')} - Refresh tree view\n"
         help_text += "  Tab - Switch panels\n"
@@ -0,0 +1,251 @@
+"""
+Catalog of every note in the notes directory
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from notes_tui.core.tree_snapshot import TreeSnapshot, walk_tree
+
+
+class CatalogChange(NamedTuple):
+    """Notes that changed between two catalog generations
+    
+    Paths are relative to the notes root, using '/'.
+    """
+    added: Set[str]
+    removed: Set[str]
+    modified: Set[str]
+
+
+class NoteCatalog:
+    """Every note in the notes tree with its mtime and size
+    
+    The catalog owns the walk over the notes directory; note listings, the
+    fuzzy path index and the search indexes read it instead of scanning the
+    disk themselves. Every refresh that finds a difference starts a new
+    generation and tells subscribers which notes changed.
+    
+    Consumers call ensure_fresh() before reading, so invalidations from
+    several places are applied with a single walk. Subscribers are called
+    after the catalog's lock is released, so they may take locks of their
+    own that are also held around calls into the catalog. Invalidating and
+    reading the recorded notes never wait for a walk in progress, so the
+    UI thread can do both while a worker refreshes.
+    """
+    
+    def __init__(self, root_dir: Path, snapshot: Optional[TreeSnapshot] = None):
+        """Initialize the catalog
+        
+        Args:
+            root_dir: Root directory for notes
+            snapshot: Folder listings to walk with, shared with the tree;
+                      a private in-memory snapshot is used if None
+        """
+        self.root_dir = Path(root_dir)
+        self.snapshot = snapshot if snapshot is not None else TreeSnapshot(self.root_dir)
+        # Bumped whenever a refresh finds a difference
+        self.generation = 0
+        # relative path -> (mtime_ns, size); replaced, never mutated, so
+        # readers on other threads always see a consistent mapping
+        self.notes: Dict[str, Tuple[int, int]] = {}
+        self._stale = True
+        # Notes to stat again before the next read
+        self._pending: Set[str] = set()
+        self._listeners: List[Callable[[CatalogChange], None]] = []
+        # Changes applied but not announced yet
+        self._changes: List[CatalogChange] = []
+        # (notes, their paths sorted), reused while self.notes is that mapping
+        self._sorted: Optional[Tuple[Dict[str, Tuple[int, int]], List[str]]] = None
+        # The tree is revalidated on a worker thread while the UI searches;
+        # held for a whole refresh, so only one thread walks at a time
+        self._lock = threading.RLock()
+        # Guards invalidations and queued changes; never held across a walk
+        self._state_lock = threading.Lock()
+    
+    def subscribe(self, callback: Callable[[CatalogChange], None]) -> None:
+        """Call a function whenever notes are added, removed or modified
+        
+        Args:
+            callback: Called with the change, on the thread that refreshed,
+                      without the catalog's lock held
+        """
+        self._listeners.append(callback)
+    
+    def invalidate(self, paths: Optional[Iterable[Path]] = None) -> None:
+        """Mark notes as changed on disk
+        
+        Nothing is read until the next ensure_fresh().
+        
+        Args:
+            paths: Notes that were created, changed or deleted. Folders, or
+                   None, make the next refresh walk the whole tree.
+        """
+        if paths is None:
+            with self._state_lock:
+                self._stale = True
+            return
+        stale = False
+        pending = set()
+        for path in paths:
+            path = Path(path)
+            try:
+                rel = path.relative_to(self.root_dir).as_posix()
+            except ValueError:
+                continue
+            if path.suffix != '.md' or path.is_dir():
+                stale = True
+            else:
+                pending.add(rel)
+        with self._state_lock:
+            self._stale = self._stale or stale
+            self._pending |= pending
+    
+    def ensure_fresh(self) -> List[str]:
+        """Apply outstanding invalidations
+        
+        Returns:
+            Folders whose listing changed, if the whole tree was walked
+        """
+        changed: List[str] = []
+        with self._lock:
+            # Invalidations arriving from here on are kept for the next call
+            with self._state_lock:
+                stale, pending = self._stale, self._pending
+                self._stale, self._pending = False, set()
+            if stale:
+                changed = self._walk()
+            elif pending:
+                notes = dict(self.notes)
+                for rel in pending:
+                    stat = self._stat(os.path.join(self.root_dir, rel))
+                    if stat is None:
+                        notes.pop(rel, None)
+                    else:
+                        notes[rel] = stat
+                self._apply(notes)
+        self._notify()
+        return changed
+    
+    def refresh(self) -> List[str]:
+        """Walk the notes tree once and record every note
+        
+        Folders whose mtime is unchanged are listed from the snapshot, so
+        the walk costs a stat per folder and per note. Notes are statted a
+        folder at a time on the snapshot's worker threads.
+        
+        Returns:
+            Folders whose listing differs from the snapshot
+        """
+        changed = self._refresh()
+        self._notify()
+        return changed
+    
+    def _refresh(self) -> List[str]:
+        """Walk the notes tree without announcing the change; see refresh()"""
+        with self._lock:
+            with self._state_lock:
+                self._stale, self._pending = False, set()
+            return self._walk()
+    
+    def _walk(self) -> List[str]:
+        """Record every note in the tree; called with the lock held"""
+        changed = self.snapshot.revalidate()
+        
+        root = str(self.root_dir)
+        notes = {}
+        
+        def stat_notes(item: Tuple[str, Tuple[str, ...]]) -> List:
+            directory, names = item
+            rel_dir = os.path.relpath(directory, root).replace(os.sep, '/')
+            prefix = '' if rel_dir == '.' else f"{rel_dir}/"
+            for name in names:
+                stat = self._stat(os.path.join(directory, name))
+                if stat is not None:
+                    notes[prefix + name] = stat
+            return []
+        
+        walk_tree(
+            [(directory, names) for directory, (_, _, names) in list(self.snapshot.dirs.items())],
+            stat_notes, self.snapshot.workers
+        )
+        self._apply(notes)
+        return changed
+    
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int]]:
+        """Get the (mtime_ns, size) of a note, None if it is gone"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+    
+    def _apply(self, notes: Dict[str, Tuple[int, int]]) -> None:
+        """Replace the recorded notes and queue the change for _notify()"""
+        old = self.notes
+        change = CatalogChange(
+            added=notes.keys() - old.keys(),
+            removed=old.keys() - notes.keys(),
+            modified={rel for rel in notes.keys() & old.keys() if notes[rel] != old[rel]},
+        )
+        if not (change.added or change.removed or change.modified):
+            return
+        cached = self._sorted
+        if cached is not None and cached[0] is old and not (change.added or change.removed):
+            # Same paths, so the sorted list still holds
+            self._sorted = (notes, cached[1])
+        self.notes = notes
+        self.generation += 1
+        with self._state_lock:
+            self._changes.append(change)
+    
+    def _notify(self) -> None:
+        """Announce the queued changes to subscribers
+        
+        Called without the lock: a subscriber blocking on its own lock,
+        held by a thread that is waiting for the catalog, would otherwise
+        deadlock.
+        """
+        with self._state_lock:
+            changes, self._changes = self._changes, []
+        for change in changes:
+            for callback in self._listeners:
+                callback(change)
+    
+    def relative_paths(self) -> List[str]:
+        """Get every note path relative to the root
+        
+        Returns:
+            Paths using '/', sorted like Path objects (folder by folder)
+        """
+        # Read without the lock, so a walk in progress does not block callers
+        notes, cached = self.notes, self._sorted
+        if cached is not None and cached[0] is notes:
+            return cached[1]
+        paths = sorted(notes, key=lambda rel: rel.split('/'))
+        self._sorted = (notes, paths)
+        return paths
+    
+    def note_paths(self, directory: Optional[Path] = None) -> List[Path]:
+        """Get the notes in the tree or below one folder
+        
+        Args:
+            directory: Only return notes below this folder
+        
+        Returns:
+            Sorted absolute paths
+        """
+        paths = self.relative_paths()
+        if directory is not None:
+            prefix = Path(directory).relative_to(self.root_dir).as_posix()
+            if prefix != '.':
+                prefix += '/'
+                paths = [rel for rel in paths if rel.startswith(prefix)]
+        return [self.root_dir / rel for rel in paths]
+    
+    def __len__(self) -> int:
+        """Number of notes"""
+        return len(self.notes)
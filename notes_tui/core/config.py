@@ -157,6 +157,13 @@ class Config:
         """Get templates directory as Path object"""
         return Path(self.config['templates_directory'])
     
+    @property
+    def cache_directory(self) -> Path:
+        """Get cache directory as Path object"""
+        return Path(self.get(
+            'cache_directory', Path.home() / '.cache' / 'notes-tui'
+        )).expanduser()
+    
     @property
     def default_editor(self) -> str:
         """Get default editor command"""
@@ -0,0 +1,190 @@
+"""
+Fuzzy path matching for quick open
+"""
+
+import heapq
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from notes_tui.core.note_entry import NoteEntry
+
+
+# Scoring weights, loosely modelled on fzf
+SCORE_MATCH = 16
+BONUS_BOUNDARY = 10
+BONUS_CONSECUTIVE = 8
+BONUS_BASENAME = 20
+PENALTY_GAP_START = 3
+PENALTY_GAP_EXTENSION = 1
+BOUNDARY_CHARS = '/-_ .'
+INITIAL_RE = re.compile(r'(?:^|(?<=[/\-_ .]))(.)')
+
+# Number of recent queries whose match sets are kept for narrowing
+MATCH_CACHE_SIZE = 64
+
+
+def _match_window(text: str, query: str, start: int) -> Optional[Tuple[int, int]]:
+    """Find the shortest window of text containing query as a subsequence
+    
+    Scans forward to the earliest possible end, then backward from there
+    to the latest possible start, like fzf's v1 algorithm.
+    
+    Returns:
+        (first, last) positions of the window, or None if there is no match
+    """
+    pos = start - 1
+    for ch in query:
+        pos = text.find(ch, pos + 1)
+        if pos == -1:
+            return None
+    last = pos
+    
+    for ch in reversed(query):
+        pos = text.rfind(ch, start, pos + 1)
+        pos -= 1
+    return pos + 1, last
+
+
+def _score_window(text: str, query: str, first: int, basename_start: int) -> int:
+    """Score the query matched greedily inside a window starting at first"""
+    score = 0
+    consecutive = 0
+    prev = first - 1
+    pos = first - 1
+    for ch in query:
+        pos = text.find(ch, pos + 1)
+        gap = pos - prev - 1
+        if gap:
+            score -= PENALTY_GAP_START + PENALTY_GAP_EXTENSION * (gap - 1)
+            consecutive = 0
+        else:
+            consecutive += 1
+        score += SCORE_MATCH
+        if pos == 0 or text[pos - 1] in BOUNDARY_CHARS:
+            score += BONUS_BOUNDARY
+        if consecutive > 1:
+            score += BONUS_CONSECUTIVE
+        prev = pos
+    if first >= basename_start:
+        score += BONUS_BASENAME
+    return score
+
+
+class PathFinder:
+    """In-memory fuzzy finder over note paths
+    
+    Lowercase forms and basename offsets are computed once when paths are
+    loaded. Queries narrow incrementally: when a query extends a recent one,
+    only the paths that matched it are rescored. find() runs on worker
+    threads, and lookups for superseded queries may overlap.
+    """
+    
+    def __init__(self, paths: Iterable[str] = ()):
+        """Initialize the finder
+        
+        Args:
+            paths: Relative note paths using '/' separators
+        """
+        self.set_paths(paths)
+    
+    def set_paths(self, paths: Iterable[str]) -> None:
+        """Replace the indexed paths
+        
+        Args:
+            paths: Relative note paths using '/' separators
+        """
+        self.paths: List[str] = list(paths)
+        self.lower: List[str] = [path.lower() for path in self.paths]
+        self.basename_starts: List[int] = [path.rfind('/') + 1 for path in self.paths]
+        # Paths containing each character, to seed the first keystroke
+        self.by_char: Dict[str, List[int]] = {}
+        # Paths whose file name has a word starting with each character,
+        # shortest first; these hold the best scores for one-letter queries
+        self.by_initial: Dict[str, List[int]] = {}
+        for i, path in enumerate(self.lower):
+            for ch in set(path):
+                self.by_char.setdefault(ch, []).append(i)
+            for ch in set(INITIAL_RE.findall(path, self.basename_starts[i])):
+                self.by_initial.setdefault(ch, []).append(i)
+        for ids in self.by_initial.values():
+            ids.sort(key=lambda i: len(self.lower[i]))
+        # Recent queries -> indexes of matching paths, for narrowing
+        self._matches: "OrderedDict[str, List[int]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def load_tree(self, tree: NoteEntry) -> None:
+        """Index the notes of a directory tree
+        
+        Args:
+            tree: Root entry from NotesManager.get_directory_tree()
+        """
+        self.set_paths(sorted(path for _, path in tree.walk()))
+    
+    def find(self, query: str, limit: int = 50) -> List[Tuple[str, int]]:
+        """Find the best matching paths
+        
+        Args:
+            query: Characters to match in order; spaces are ignored
+            limit: Maximum number of results
+        
+        Returns:
+            List of (path, score), best first
+        """
+        query = query.lower().replace(' ', '')
+        if not query:
+            return [(path, 0) for path in self.paths[:limit]]
+        
+        if len(query) == 1:
+            initials = self.by_initial.get(query, [])
+            if len(initials) >= limit:
+                # Every one of these gets the top score; shortest paths win ties
+                self._remember(query, self.by_char[query])
+                score = SCORE_MATCH + BONUS_BOUNDARY + BONUS_BASENAME
+                return [(self.paths[i], score) for i in initials[:limit]]
+        
+        # Narrow from the longest recent prefix, or from the paths holding
+        # the rarest query character
+        candidates = None
+        for end in range(len(query), 0, -1):
+            candidates = self._matches.get(query[:end])
+            if candidates is not None:
+                break
+        if candidates is None:
+            candidates = min((self.by_char.get(ch, []) for ch in set(query)), key=len)
+        
+        lower = self.lower
+        basename_starts = self.basename_starts
+        matches = []
+        scored = []
+        for i in candidates:
+            text = lower[i]
+            window = _match_window(text, query, 0)
+            if window is None:
+                continue
+            matches.append(i)
+            basename_start = basename_starts[i]
+            score = _score_window(text, query, window[0], basename_start)
+            # Prefer a match that fits entirely in the file name
+            if window[0] < basename_start:
+                base_window = _match_window(text, query, basename_start)
+                if base_window is not None:
+                    score = max(score, _score_window(text, query, base_window[0], basename_start))
+            scored.append((score, -len(text), i))
+        
+        self._remember(query, matches)
+        return [(self.paths[i], score) for score, _, i in heapq.nlargest(limit, scored)]
+    
+    def _remember(self, query: str, matches: List[int]) -> None:
+        """Keep the match set of a query for narrowing later keystrokes"""
+        # A superseded lookup may still be finishing on another thread
+        with self._lock:
+            self._matches[query] = matches
+            self._matches.move_to_end(query)
+            if len(self._matches) > MATCH_CACHE_SIZE:
+                self._matches.popitem(last=False)
+    
+    def __len__(self) -> int:
+        """Number of indexed paths"""
+        return len(self.paths)
@@ -0,0 +1,308 @@
+"""
+Frontmatter parsing and metadata index for filtering notes
+"""
+
+import os
+import pickle
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+import yaml
+
+from notes_tui.core.catalog import NoteCatalog
+from notes_tui.core.query import TOKEN_RE
+
+
+# Bump whenever the on-disk layout changes so stale caches are rebuilt
+METADATA_VERSION = 1
+
+# Frontmatter larger than this is ignored rather than read in full
+FRONTMATTER_MAX_BYTES = 16384
+
+# Filter names usable in queries -> frontmatter keys they look up
+FILTER_FIELDS = {
+    'tag': 'tags',
+    'status': 'status',
+    'category': 'category',
+    'date': 'date',
+}
+
+FILTER_RE = re.compile(r'(tag|status|category|date):(\S+)', re.IGNORECASE)
+
+
+def read_frontmatter(note_path: Path) -> Dict:
+    """Parse the YAML frontmatter of a note without reading its body
+    
+    Args:
+        note_path: Path to the note
+    
+    Returns:
+        Frontmatter mapping, empty if the note has none or it is invalid
+    """
+    lines = []
+    try:
+        with open(note_path, 'rb') as f:
+            first = f.readline(FRONTMATTER_MAX_BYTES)
+            if first.lstrip(b'\xef\xbb\xbf').strip() != b'---':
+                return {}
+            size = len(first)
+            for line in f:
+                if line.strip() in (b'---', b'...'):
+                    break
+                size += len(line)
+                if size > FRONTMATTER_MAX_BYTES:
+                    return {}
+                lines.append(line)
+            else:
+                # No closing fence: not frontmatter
+                return {}
+    except OSError:
+        return {}
+    
+    try:
+        data = yaml.safe_load(b''.join(lines).decode('utf-8', errors='ignore'))
+    except yaml.YAMLError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def split_filters(query: str) -> Tuple[List[Tuple[str, str]], str]:
+    """Split metadata filters such as tag:work off a search query
+    
+    Args:
+        query: Search query
+    
+    Returns:
+        Tuple of ((field, value) filters, remaining query text); the text
+        is the query with the filters cut out, otherwise as typed
+    """
+    filters = []
+    rest = ''
+    pos = 0
+    # Tokenized like search queries, so quoted phrases stay intact
+    for token in TOKEN_RE.finditer(query):
+        match = FILTER_RE.fullmatch(token.group())
+        if match:
+            filters.append((match.group(1).lower(), match.group(2).lower()))
+            rest += query[pos:token.start()]
+            pos = token.end()
+            # Only one of the spaces around a filter is kept
+            while pos < len(query) and query[pos].isspace() and (not rest or rest[-1].isspace()):
+                pos += 1
+    if not filters:
+        return [], query
+    return filters, (rest + query[pos:]).strip()
+
+
+def _field_values(meta: Dict, field: str) -> List[str]:
+    """Get the normalized values of a filter field from frontmatter"""
+    value = meta.get(FILTER_FIELDS[field])
+    if value is None or value == '':
+        return []
+    if field == 'tag':
+        if isinstance(value, str):
+            value = re.split(r'[,\s]+', value)
+        elif not isinstance(value, (list, tuple, set)):
+            value = [value]
+        return [str(tag).strip().lstrip('#').lower() for tag in value if str(tag).strip()]
+    return [str(value).strip().lower()]
+
+
+class MetadataIndex:
+    """Frontmatter of every note, indexed by filterable field values
+    
+    Frontmatter is cached per note by mtime and size, so refreshing only
+    re-reads the headers of notes that changed and filters never open a
+    note at all.
+    """
+    
+    def __init__(self, root_dir: Path, index_path: Optional[Path] = None):
+        """Initialize the index
+        
+        Args:
+            root_dir: Root directory for notes
+            index_path: Optional file the index is persisted to
+        """
+        self.root_dir = Path(root_dir)
+        self.index_path = Path(index_path) if index_path else None
+        self.loaded = False
+        self.dirty = False
+        # relative path -> (mtime_ns, size, frontmatter)
+        self.notes: Dict[str, Tuple[int, int, Dict]] = {}
+        # filter field -> value -> relative paths
+        self.values: Dict[str, Dict[str, Set[str]]] = {field: {} for field in FILTER_FIELDS}
+    
+    def load(self) -> bool:
+        """Load the index from disk
+        
+        Returns:
+            True if a compatible index was loaded, False otherwise
+        """
+        self.loaded = True
+        if self.index_path is None:
+            return False
+        try:
+            with open(self.index_path, 'rb') as f:
+                data = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+            return False
+        
+        if (not isinstance(data, dict)
+                or data.get('version') != METADATA_VERSION
+                or data.get('root') != str(self.root_dir)):
+            return False
+        
+        self.notes = {}
+        self.values = {field: {} for field in FILTER_FIELDS}
+        for rel, (mtime_ns, size, meta) in data['notes'].items():
+            self._add(rel, mtime_ns, size, meta)
+        self.dirty = False
+        return True
+    
+    def save(self) -> None:
+        """Write the index to disk atomically"""
+        if self.index_path is None:
+            self.dirty = False
+            return
+        data = {
+            'version': METADATA_VERSION,
+            'root': str(self.root_dir),
+            'notes': self.notes,
+        }
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.index_path)
+        self.dirty = False
+    
+    def update(self, catalog: Optional[NoteCatalog] = None) -> int:
+        """Bring the index in sync with the notes directory
+        
+        Only the frontmatter of notes whose mtime or size changed is read.
+        
+        Args:
+            catalog: Catalog of the notes directory; the directory is walked
+                     for a new one if None
+        
+        Returns:
+            Number of notes added, changed or removed
+        """
+        if not self.loaded:
+            self.load()
+        if catalog is None:
+            catalog = NoteCatalog(self.root_dir)
+        catalog.ensure_fresh()
+        notes = catalog.notes
+        
+        changed = 0
+        for rel, (mtime_ns, size) in notes.items():
+            entry = self.notes.get(rel)
+            if entry and entry[0] == mtime_ns and entry[1] == size:
+                continue
+            
+            if entry:
+                self._remove(rel)
+            self._add(rel, mtime_ns, size, read_frontmatter(self.root_dir / rel))
+            self.dirty = True
+            changed += 1
+        
+        for rel in [rel for rel in self.notes if rel not in notes]:
+            self._remove(rel)
+            self.dirty = True
+            changed += 1
+        
+        if self.dirty:
+            self.save()
+        return changed
+    
+    def _add(self, rel: str, mtime_ns: int, size: int, meta: Dict) -> None:
+        """Record a note's frontmatter and link its field values"""
+        self.notes[rel] = (mtime_ns, size, meta)
+        for field, values in self.values.items():
+            for value in _field_values(meta, field):
+                values.setdefault(value, set()).add(rel)
+    
+    def _remove(self, rel: str) -> None:
+        """Forget a note and unlink its field values"""
+        _, _, meta = self.notes.pop(rel)
+        for field, values in self.values.items():
+            for value in _field_values(meta, field):
+                notes = values.get(value)
+                if notes is None:
+                    continue
+                notes.discard(rel)
+                if not notes:
+                    del values[value]
+    
+    def get(self, rel: str) -> Dict:
+        """Get the frontmatter of a note
+        
+        Args:
+            rel: Path of the note relative to the root, using '/'
+        
+        Returns:
+            Frontmatter mapping, empty if the note is unknown
+        """
+        entry = self.notes.get(rel)
+        return entry[2] if entry else {}
+    
+    def filter(self, filters: List[Tuple[str, str]]) -> Set[str]:
+        """Find the notes matching every filter
+        
+        Values compare case-insensitively; dates also match by prefix, so
+        date:2024-05 finds every note from May 2024.
+        
+        Args:
+            filters: (field, value) pairs as returned by split_filters()
+        
+        Returns:
+            Relative paths of the matching notes
+        """
+        result: Optional[Set[str]] = None
+        for field, value in filters:
+            values = self.values[field]
+            if field == 'date':
+                notes = set()
+                for date, dated in values.items():
+                    if date.startswith(value):
+                        notes |= dated
+            else:
+                notes = values.get(value, set())
+            result = set(notes) if result is None else result & notes
+            if not result:
+                break
+        return result if result is not None else set(self.notes)
+    
+    def query(self, query: str) -> List[str]:
+        """Find notes by a filter query such as 'tag:work status:active'
+        
+        Args:
+            query: Space separated field:value filters
+        
+        Returns:
+            Sorted relative paths of the matching notes
+        """
+        filters, _ = split_filters(query)
+        return sorted(self.filter(filters))
+    
+    def facets(self, field: str, notes: Optional[Set[str]] = None) -> Dict[str, int]:
+        """Count notes per value of a field
+        
+        Args:
+            field: Filter field name (tag, status, category or date)
+            notes: Only count these relative paths, e.g. a filter result
+        
+        Returns:
+            Mapping of value to number of notes, most common first
+        """
+        counts = Counter({
+            value: len(paths if notes is None else paths & notes)
+            for value, paths in self.values[field].items()
+        })
+        return {value: count for value, count in counts.most_common() if count}
+    
+    def __len__(self) -> int:
+        """Number of indexed notes"""
+        return len(self.notes)
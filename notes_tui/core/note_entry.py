@@ -0,0 +1,106 @@
+"""
+Compact records for folders and notes in the directory tree
+"""
+
+import os
+import sys
+from typing import List, Optional, Sequence, Tuple
+
+
+class NoteEntry:
+    """A folder or note in the directory tree
+    
+    Entries store only their own name and a reference to their parent
+    folder; full paths are rebuilt on demand. Names are interned, so the
+    names repeated across folders (dates, "index", "meeting-notes") are
+    stored once, and notes share one empty children tuple.
+    """
+    
+    __slots__ = ('name', 'parent', 'is_dir', 'children', 'loaded', 'mtime_ns')
+    
+    def __init__(self, name: str, parent: Optional['NoteEntry'] = None, is_dir: bool = False):
+        """Initialize the entry
+        
+        Args:
+            name: File name without the .md extension for notes, the folder
+                  name for folders, or the full directory path for a root
+            parent: Folder containing the entry, None for a root
+            is_dir: Whether the entry is a folder
+        """
+        self.name = sys.intern(name) if parent is not None else name
+        self.parent = parent
+        self.is_dir = is_dir
+        # Filled in with a list once the folder has been listed
+        self.children: Sequence['NoteEntry'] = ()
+        # Set by the tree view once a folder's contents are shown
+        self.loaded = False
+        # Directory mtime the children were listed at, None if unknown
+        self.mtime_ns: Optional[int] = None
+    
+    @classmethod
+    def root(cls, directory: str) -> 'NoteEntry':
+        """Create the entry for the top of a tree
+        
+        Args:
+            directory: Path of the directory
+        
+        Returns:
+            Folder entry without a parent
+        """
+        return cls(str(directory), None, True)
+    
+    @property
+    def path(self) -> str:
+        """Full path of the folder or note file"""
+        parts: List[str] = []
+        entry = self
+        while entry.parent is not None:
+            parts.append(entry.name)
+            entry = entry.parent
+        parts.append(entry.name)
+        path = os.path.join(*reversed(parts))
+        return path if self.is_dir else path + '.md'
+    
+    @property
+    def title(self) -> str:
+        """Name to show for the entry"""
+        if self.parent is None:
+            return os.path.basename(self.name) or 'notes'
+        return self.name
+    
+    def set_children(self, dirs: Sequence[str], notes: Sequence[str]) -> List['NoteEntry']:
+        """Replace the children with entries for a directory listing
+        
+        Args:
+            dirs: Subfolder names, sorted
+            notes: Note file names including .md, sorted
+        
+        Returns:
+            Entries of the subfolders, which are still to be listed
+        """
+        subdirs = [NoteEntry(name, self, True) for name in dirs]
+        self.children = subdirs + [NoteEntry(name[:-3], self) for name in notes]
+        return subdirs
+    
+    def walk(self) -> List[Tuple['NoteEntry', str]]:
+        """List the notes below a folder
+        
+        Returns:
+            (entry, path relative to this folder using '/' and without
+            .md) for every note, in no particular order
+        """
+        notes = []
+        stack = [(self, '')]
+        while stack:
+            entry, prefix = stack.pop()
+            for child in entry.children:
+                if child.is_dir:
+                    stack.append((child, f"{prefix}{child.name}/"))
+                else:
+                    notes.append((child, f"{prefix}{child.name}"))
+        return notes
+    
+    def __repr__(self) -> str:
+        """String representation of the entry"""
+        kind = 'dir' if self.is_dir else 'note'
+        return f"NoteEntry({self.path!r}, {kind})"
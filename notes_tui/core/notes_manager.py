@@ -2,21 +2,50 @@
 Notes Manager - Core business logic for note operations
 """
 
+import os
+import threading
 from pathlib import Path
 from typing import List, Dict, Optional
 import yaml
 
+from notes_tui.core.catalog import CatalogChange, NoteCatalog
+from notes_tui.core.fuzzy import PathFinder
+from notes_tui.core.note_entry import NoteEntry
+from notes_tui.core.search import scan_notes
+from notes_tui.core.tree_snapshot import TreeSnapshot, walk_tree
+
 
 class NotesManager:
     """Manages note file operations and metadata"""
     
-    def __init__(self, root_dir: Path):
+    def __init__(self, root_dir: Path, search_workers: int = 1,
+                 search_processes: bool = False, snapshot_path: Optional[Path] = None,
+                 scan_workers: int = 1):
         """Initialize the notes manager
         
         Args:
             root_dir: Root directory containing all notes
+            search_workers: Number of parallel workers for search_notes
+            search_processes: Match note contents on a process pool
+            snapshot_path: Optional file the directory listings are
+                           persisted to between runs
+            scan_workers: Number of folders read at once when walking the
+                          tree, for filesystems with slow round-trips
         """
         self.root_dir = Path(root_dir)
+        self.search_workers = max(1, search_workers)
+        self.search_processes = search_processes
+        # Fuzzy path index, rebuilt whenever the whole tree is scanned. A
+        # new finder replaces the old one, so a finder handed out is never
+        # changed while it is being searched.
+        self.path_finder = PathFinder()
+        self._paths_stale = True
+        # Directory listings, reused for folders whose mtime is unchanged
+        self.snapshot = TreeSnapshot(self.root_dir, snapshot_path, scan_workers)
+        # Every note with its stat metadata, walked using the snapshot
+        self.catalog = NoteCatalog(self.root_dir, self.snapshot)
+        self.catalog.subscribe(self._on_catalog_change)
+        self._revalidate_lock = threading.Lock()
         
         # Auto-discover categories from existing directories
         self.categories = {}
@@ -31,7 +60,8 @@ class NotesManager:
         Returns:
             List of Path objects to all .md files
         """
-        return list(self.root_dir.rglob('*.md'))
+        self.catalog.ensure_fresh()
+        return self.catalog.note_paths()
     
     def get_notes_by_category(self, category: str) -> List[Path]:
         """Get notes in a specific category
@@ -45,7 +75,8 @@ class NotesManager:
         cat_dir = self.categories.get(category)
         if not cat_dir or not cat_dir.exists():
             return []
-        return sorted(cat_dir.rglob('*.md'))
+        self.catalog.ensure_fresh()
+        return self.catalog.note_paths(cat_dir)
     
     def read_note(self, note_path: Path) -> str:
         """Read the content of a note
@@ -61,47 +92,139 @@ class NotesManager:
         except Exception as e:
             return f"Error reading note: {e}"
     
-    def get_directory_tree(self, directory: Optional[Path] = None) -> Dict:
+    def get_directory_tree(self, directory: Optional[Path] = None,
+                           iterative: bool = False) -> NoteEntry:
         """Get a tree structure of the notes directory
         
+        With more than one scan worker, subfolders are listed concurrently;
+        every folder's children are still in listing order.
+        
         Args:
             directory: Directory to build tree for (defaults to root)
+            iterative: Walk with an explicit stack instead of recursion, so
+                       arbitrarily deep trees cannot hit the recursion limit
             
         Returns:
-            Nested dictionary representing the directory structure
+            Root entry of the directory structure
         """
         if directory is None:
-            directory = self.root_dir
+            tree = self.get_directory_tree(self.root_dir, iterative)
+            path_finder = PathFinder()
+            path_finder.load_tree(tree)
+            self.path_finder = path_finder
+            self._paths_stale = False
+            return tree
         
-        tree = {
-            'name': directory.name or 'notes',
-            'path': str(directory),
-            'is_dir': True,
-            'children': []
-        }
+        tree = NoteEntry.root(str(directory))
+        if not iterative and self.snapshot.workers <= 1:
+            self._fill_tree(tree)
+            return tree
         
-        try:
-            items = sorted(directory.iterdir(), key=lambda x: (not x.is_dir(), x.name))
-            
-            for item in items:
-                # Skip hidden files except .config
-                if item.name.startswith('.') and item.name != '.config':
-                    continue
-                
-                if item.is_dir():
-                    tree['children'].append(self.get_directory_tree(item))
-                elif item.suffix == '.md':
-                    tree['children'].append({
-                        'name': item.stem,
-                        'path': str(item),
-                        'is_dir': False,
-                        'children': []
-                    })
-        except PermissionError:
-            pass
+        walk_tree([tree], self.load_children, self.snapshot.workers)
+        return tree
+    
+    def list_directory(self, directory: Optional[Path] = None) -> NoteEntry:
+        """Get the contents of a single directory without descending into it
+        
+        Args:
+            directory: Directory to list (defaults to root)
         
+        Returns:
+            Root entry like get_directory_tree(), except that the children
+            of its subdirectories are left empty
+        """
+        tree = NoteEntry.root(str(directory or self.root_dir))
+        self.load_children(tree)
         return tree
     
+    def get_path_finder(self) -> PathFinder:
+        """Get the fuzzy path index, rescanning the tree if notes changed
+        
+        This may walk the notes directory, so callers on the UI thread
+        should use path_finder and call this from a worker.
+        
+        Returns:
+            PathFinder over all note paths
+        """
+        with self._revalidate_lock:
+            self.catalog.ensure_fresh()
+            if self._paths_stale:
+                self._load_paths()
+        return self.path_finder
+    
+    def load_snapshot(self) -> bool:
+        """Load the directory listings saved by the previous run
+        
+        Until revalidate() has checked them, folders are listed from the
+        snapshot whenever their mtime still matches.
+        
+        Returns:
+            True if a snapshot was loaded
+        """
+        return self.snapshot.load()
+    
+    def revalidate(self) -> List[Path]:
+        """Bring the catalog, snapshot and fuzzy path index in sync with the disk
+        
+        Folders whose mtime is unchanged are not read again, so this costs
+        one stat per folder and note when little has changed; the path
+        index is only rebuilt when notes were added or removed.
+        
+        Returns:
+            Folders whose contents differ from the previous snapshot
+        """
+        with self._revalidate_lock:
+            changed = self.catalog.refresh()
+            if self._paths_stale:
+                self._load_paths()
+            if self.snapshot.dirty:
+                try:
+                    self.snapshot.save()
+                except OSError:
+                    pass
+        return [Path(directory) for directory in changed]
+    
+    def invalidate_paths(self, paths: Optional[List[Path]] = None) -> None:
+        """Mark notes as changed on disk, e.g. after they were added or removed
+        
+        Args:
+            paths: Notes or folders that changed, None if unknown
+        """
+        self.catalog.invalidate(paths)
+    
+    def _on_catalog_change(self, change: CatalogChange) -> None:
+        """Rebuild the fuzzy path index once notes were added or removed"""
+        if change.added or change.removed:
+            self._paths_stale = True
+    
+    def _load_paths(self) -> None:
+        """Fill the fuzzy path index from the catalog"""
+        self.path_finder = PathFinder(sorted(rel[:-3] for rel in self.catalog.relative_paths()))
+        self._paths_stale = False
+    
+    def _fill_tree(self, entry: NoteEntry) -> None:
+        """Recursively add the contents of a folder entry"""
+        for child in self.load_children(entry):
+            self._fill_tree(child)
+    
+    def load_children(self, entry: NoteEntry) -> List[NoteEntry]:
+        """List one folder and replace the children of its entry
+        
+        The listing comes from the snapshot when the directory's mtime is
+        unchanged, and from a fresh scan otherwise. The entry's mtime_ns is
+        set to the directory mtime the listing matches, or None if that
+        mtime is too recent to rely on.
+        
+        Args:
+            entry: Folder entry to fill
+        
+        Returns:
+            Entries of the subfolders, still to be listed
+        """
+        mtime_ns, listing = self.snapshot.listing(entry.path)
+        entry.mtime_ns = mtime_ns
+        return entry.set_children(*listing)
+    
     def create_note(self, category: str, filename: str, content: str = "") -> Optional[Path]:
         """Create a new note
         
@@ -122,6 +245,7 @@ class NotesManager:
         
         try:
             note_path.write_text(content, encoding='utf-8')
+            self.catalog.invalidate([note_path])
             return note_path
         except Exception as e:
             print(f"Error creating note: {e}")
@@ -138,6 +262,7 @@ class NotesManager:
         """
         try:
             note_path.unlink()
+            self.catalog.invalidate([note_path])
             return True
         except Exception as e:
             print(f"Error deleting note: {e}")
@@ -152,12 +277,8 @@ class NotesManager:
         Returns:
             List of Path objects matching the search
         """
-        results = []
-        for note_path in self.get_all_notes():
-            try:
-                content = note_path.read_text(encoding='utf-8', errors='ignore')
-                if query.lower() in content.lower():
-                    results.append(note_path)
-            except Exception:
-                pass
-        return results
+        matches = scan_notes(
+            self.get_all_notes(), query, max_lines=0,
+            workers=self.search_workers, use_processes=self.search_processes
+        )
+        return [note_path for note_path, _, _ in matches]
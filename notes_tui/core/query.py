@@ -0,0 +1,268 @@
+"""
+Compiled search queries with phrase, regex and boolean terms
+"""
+
+import re
+from typing import List, Optional, Set, Tuple
+
+
+# Quoted phrases, /regex/ literals, parentheses and bare words
+TOKEN_RE = re.compile(r'"[^"]*"|/(?:\\.|[^/\\])+/|\(|\)|[^\s()]+')
+OPERATORS = {'AND', 'OR', 'NOT'}
+
+
+class QueryError(ValueError):
+    """Raised when a search query cannot be parsed"""
+
+
+class Term:
+    """A single literal or regex term of a query"""
+    
+    def __init__(self, index: int, pattern: str, literal: Optional[str] = None):
+        """Initialize the term
+        
+        Args:
+            index: Position of the term within its query
+            pattern: Regular expression source for the term
+            literal: Plain text of the term, None for regex terms
+        """
+        self.index = index
+        self.pattern = pattern
+        self.literal = literal
+        self.regex = re.compile(pattern, re.IGNORECASE)
+    
+    def evaluate(self, present: Set[int]) -> bool:
+        """Check whether the term is present"""
+        return self.index in present
+
+
+class Not:
+    """Negation of a sub-expression"""
+    
+    def __init__(self, operand):
+        """Initialize with the negated expression"""
+        self.operand = operand
+    
+    def evaluate(self, present: Set[int]) -> bool:
+        """Check that the operand does not hold"""
+        return not self.operand.evaluate(present)
+
+
+class And:
+    """Conjunction of sub-expressions"""
+    
+    def __init__(self, operands: list):
+        """Initialize with the combined expressions"""
+        self.operands = operands
+    
+    def evaluate(self, present: Set[int]) -> bool:
+        """Check that every operand holds"""
+        return all(operand.evaluate(present) for operand in self.operands)
+
+
+class Or:
+    """Disjunction of sub-expressions"""
+    
+    def __init__(self, operands: list):
+        """Initialize with the alternative expressions"""
+        self.operands = operands
+    
+    def evaluate(self, present: Set[int]) -> bool:
+        """Check that at least one operand holds"""
+        return any(operand.evaluate(present) for operand in self.operands)
+
+
+class Query:
+    """A search query compiled once and matched against many notes
+    
+    Plain queries match their text as a case-insensitive substring, exactly
+    like the original search. Queries that use quoted phrases, /regex/
+    terms or the AND, OR and NOT keywords are parsed into a boolean
+    expression that is evaluated per note; adjacent terms are ANDed.
+    
+    A query that cannot be parsed, such as 'c++ AND', is searched for
+    literally like a plain query, and the empty query matches every line.
+    
+    Examples:
+        >>> Query('python')
+        >>> Query('"daily standup" OR /todo:?/')
+        >>> Query('python AND NOT javascript')
+    """
+    
+    def __init__(self, text: str):
+        """Compile a query
+        
+        Args:
+            text: Query text
+        """
+        self.text = text.strip()
+        self.terms: List[Term] = []
+        # Why the query is matched literally instead of as written
+        self.error: Optional[str] = None
+        tokens = TOKEN_RE.findall(self.text)
+        self.is_plain = not any(
+            token in OPERATORS or token[0] in '"/' and len(token) > 1 and token[-1] == token[0]
+            for token in tokens
+        )
+        
+        if not self.is_plain:
+            self._tokens = tokens
+            self._pos = 0
+            try:
+                self.expr = self._parse_or()
+                if self._pos < len(self._tokens):
+                    raise QueryError(f"Unexpected '{self._tokens[self._pos]}' in query")
+            except QueryError as e:
+                self.error = str(e)
+                self.terms = []
+                self.is_plain = True
+            del self._tokens, self._pos
+        if self.is_plain:
+            # An empty query matches at the start of every line
+            self.expr = self._add_term(re.escape(self.text) if self.text else '^', self.text)
+        
+        # Terms whose occurrences make a line a match: everything not negated
+        self.line_terms = [
+            term for term in self.terms if term.index not in self._negated(self.expr, False)
+        ]
+        # One alternation lets a single pass over the note find every line term
+        self.combined = re.compile(
+            '|'.join(f'(?P<t{term.index}>{term.pattern})' for term in self.line_terms),
+            re.IGNORECASE | re.MULTILINE
+        ) if self.line_terms else None
+    
+    def _add_term(self, pattern: str, literal: Optional[str]) -> Term:
+        """Register a new term"""
+        try:
+            term = Term(len(self.terms), pattern, literal)
+        except re.error as e:
+            raise QueryError(f"Invalid regular expression /{pattern}/: {e}")
+        self.terms.append(term)
+        return term
+    
+    def _peek(self) -> Optional[str]:
+        """Current token, or None at the end of the query"""
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else None
+    
+    def _parse_or(self):
+        """or_expr := and_expr ('OR' and_expr)*"""
+        operands = [self._parse_and()]
+        while self._peek() == 'OR':
+            self._pos += 1
+            operands.append(self._parse_and())
+        return operands[0] if len(operands) == 1 else Or(operands)
+    
+    def _parse_and(self):
+        """and_expr := not_expr (['AND'] not_expr)*"""
+        operands = [self._parse_not()]
+        while self._peek() not in (None, 'OR', ')'):
+            if self._peek() == 'AND':
+                self._pos += 1
+            operands.append(self._parse_not())
+        return operands[0] if len(operands) == 1 else And(operands)
+    
+    def _parse_not(self):
+        """not_expr := 'NOT' not_expr | '(' or_expr ')' | term"""
+        token = self._peek()
+        if token is None or token in ('AND', 'OR', ')'):
+            raise QueryError(f"Expected a search term, got '{token or 'end of query'}'")
+        self._pos += 1
+        
+        if token == 'NOT':
+            return Not(self._parse_not())
+        if token == '(':
+            expr = self._parse_or()
+            if self._peek() != ')':
+                raise QueryError("Missing ')' in query")
+            self._pos += 1
+            return expr
+        if len(token) > 1 and token[0] == token[-1] == '"':
+            phrase = token[1:-1]
+            if not phrase:
+                raise QueryError("Empty phrase in query")
+            return self._add_term(re.escape(phrase), phrase)
+        if len(token) > 2 and token[0] == token[-1] == '/':
+            return self._add_term(token[1:-1], None)
+        return self._add_term(re.escape(token), token)
+    
+    def _negated(self, expr, negated: bool) -> Set[int]:
+        """Collect indexes of terms that only appear under a NOT"""
+        if isinstance(expr, Term):
+            return {expr.index} if negated else set()
+        if isinstance(expr, Not):
+            return self._negated(expr.operand, not negated)
+        result = set()
+        for operand in expr.operands:
+            result |= self._negated(operand, negated)
+        return result
+    
+    def required_literals(self) -> List[str]:
+        """Get literal terms every matching note must contain
+        
+        Used to narrow candidates with the search index. Only terms that
+        are ANDed at the top level qualify.
+        
+        Returns:
+            List of literal strings, empty if nothing is strictly required
+        """
+        operands = self.expr.operands if isinstance(self.expr, And) else [self.expr]
+        return [
+            operand.literal for operand in operands
+            if isinstance(operand, Term) and operand.literal is not None
+        ]
+    
+    def find_lines(self, content: str) -> Optional[List[Tuple[int, int]]]:
+        """Match the query against note content in a single pass
+        
+        Args:
+            content: Full note text
+        
+        Returns:
+            List of (line number, offset of line start) for every line with
+            a match, or None if the note does not match the query
+        """
+        lines: List[Tuple[int, int]] = []
+        present: Set[int] = set()
+        
+        if self.combined is not None:
+            line_no = 1
+            line_start = 0
+            scanned = 0
+            for match in self.combined.finditer(content):
+                start = match.start()
+                newlines = content.count('\n', scanned, start)
+                if newlines:
+                    line_no += newlines
+                    line_start = content.rfind('\n', scanned, start) + 1
+                scanned = start
+                present.add(int(match.lastgroup[1:]))
+                if not lines or lines[-1][0] != line_no:
+                    lines.append((line_no, line_start))
+        
+        # Negated terms, and line terms hidden by an overlapping match of
+        # another term, still need their own lookup
+        if len(self.terms) > 1:
+            for term in self.terms:
+                if term.index not in present and term.regex.search(content):
+                    present.add(term.index)
+        
+        if not self.expr.evaluate(present):
+            return None
+        return lines
+    
+    def matches(self, content: str) -> bool:
+        """Check whether note content matches the query
+        
+        Args:
+            content: Full note text
+        
+        Returns:
+            True if the note matches
+        """
+        if self.is_plain:
+            return self.terms[0].regex.search(content) is not None
+        return self.find_lines(content) is not None
+    
+    def __repr__(self) -> str:
+        """String representation of the query"""
+        return f"Query({self.text!r})"
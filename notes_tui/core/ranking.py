@@ -0,0 +1,54 @@
+"""
+Relevance ranking for search results
+"""
+
+import math
+from typing import Iterable, Tuple
+
+
+class BM25:
+    """Okapi BM25 scoring
+    
+    Document length is measured in bytes and term frequency in matching
+    lines, which is what the search index tracks per note.
+    """
+    
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """Initialize the scorer
+        
+        Args:
+            k1: Term frequency saturation
+            b: Strength of document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+    
+    def idf(self, doc_freq: int, doc_count: int) -> float:
+        """Inverse document frequency of a term
+        
+        Args:
+            doc_freq: Number of notes containing the term
+            doc_count: Number of notes in the corpus
+        
+        Returns:
+            IDF weight, always positive
+        """
+        return math.log(1.0 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+    
+    def score(self, terms: Iterable[Tuple[float, int]], doc_length: int,
+              avg_length: float) -> float:
+        """Score one note
+        
+        Args:
+            terms: (idf, term frequency) for each query term
+            doc_length: Length of the note
+            avg_length: Average note length in the corpus
+        
+        Returns:
+            BM25 score, higher is more relevant
+        """
+        norm = self.k1 * (1 - self.b + self.b * doc_length / avg_length) if avg_length else self.k1
+        return sum(
+            idf * tf * (self.k1 + 1) / (tf + norm)
+            for idf, tf in terms if tf
+        )
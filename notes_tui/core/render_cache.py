@@ -0,0 +1,89 @@
+"""
+LRU cache of rendered notes
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class RenderCache:
+    """LRU cache of rendered notes bounded by an estimated size in bytes
+    
+    Keys include everything the rendering depends on, typically the note's
+    path, mtime and size together with the render width and theme, so an
+    entry can never be served for an edited note or a different layout.
+    """
+    
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        """Initialize the cache
+        
+        Args:
+            max_bytes: Total estimated size of the entries to keep
+        """
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        # key -> (value, estimated size)
+        self.entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        # Notes are rendered on worker threads
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Look up a rendered note
+        
+        Args:
+            key: Key the note was stored under
+        
+        Returns:
+            The rendered note, or None on a miss
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+    
+    def put(self, key: Hashable, value: Any, size: int) -> None:
+        """Store a rendered note, evicting the least recently used ones
+        
+        Args:
+            key: Key to store the note under
+            value: The rendered note
+            size: Estimated size of the value in bytes; values larger than
+                  the whole budget are not stored
+        """
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            self.entries[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted
+    
+    def size(self, key: Hashable) -> int:
+        """Get the estimated size of an entry without marking it as used
+        
+        Args:
+            key: Key the note was stored under
+        
+        Returns:
+            Size the note was stored with, 0 if it is not cached
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+            return 0 if entry is None else entry[1]
+    
+    def clear(self) -> None:
+        """Drop every cached note"""
+        with self._lock:
+            self.entries.clear()
+            self.total_bytes = 0
+    
+    def __len__(self) -> int:
+        """Number of cached notes"""
+        return len(self.entries)
@@ -2,53 +2,747 @@
 Search functionality for notes
 """
 
+import heapq
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Set, Tuple, Union
+
+from notes_tui.core.catalog import CatalogChange, NoteCatalog
+from notes_tui.core.metadata import MetadataIndex, split_filters
+from notes_tui.core.query import Query
+from notes_tui.core.ranking import BM25
+from notes_tui.core.search_cache import SearchCache
+from notes_tui.core.search_index import SearchIndex, tokenize
+
+
+# Number of files handed to the process pool per batch
+PROCESS_BATCH_SIZE = 256
+
+# Searches run on worker threads, and forking a threaded process can copy
+# locks held by other threads, so pool workers start from a clean process
+PROCESS_START_METHOD = (
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+
+def _read_note(note_path: Path) -> Optional[str]:
+    """Read a note for searching, returning None if it cannot be read"""
+    try:
+        return note_path.read_text(encoding='utf-8', errors='ignore')
+    except Exception:
+        return None
+
+
+def _match_content(content: Optional[str], query: Query,
+                   max_lines: int) -> Optional[Tuple[int, List[Tuple[int, int]]]]:
+    """Match a compiled query against note content
+    
+    Kept at module level so it can be shipped to a process pool.
+    
+    Args:
+        content: Note content, or None if the note could not be read
+        query: Compiled search query
+        max_lines: Number of matching lines to return; 0 only checks
+                   whether the note matches at all
+    
+    Returns:
+        Tuple of (match count, first hits), or None if no match. Hits are
+        (line number, offset of the line start); no text is copied.
+    """
+    if content is None:
+        return None
+    if max_lines == 0:
+        return (1, []) if query.matches(content) else None
+    
+    found = query.find_lines(content)
+    if found is None:
+        return None
+    return (len(found), found[:max_lines])
+    
+
+def extract_context(content: str, hits: List[Tuple[int, Optional[int]]],
+                    context: int = 0) -> List[List[Tuple[int, str]]]:
+    """Cut the lines around search hits out of a note
+    
+    Only the requested windows are sliced out of the content, so the cost
+    depends on the number of hits shown, not on the size of the note.
+    
+    Args:
+        content: Note content
+        hits: (line number, offset of the line start) from a search result;
+              a missing offset, or one that no longer starts a line, is
+              found by counting lines
+        context: Number of lines to include before and after each hit
+    
+    Returns:
+        One window per hit, each a list of (line number, stripped text)
+    """
+    windows = []
+    line, pos = 1, 0
+    for line_no, start in hits:
+        if start is not None and (
+                start > len(content) or (start and content[start - 1] != '\n')):
+            # The note changed since the offset was taken
+            start = None
+        if start is None:
+            # Hits are in line order, so counting resumes from the last one
+            if line_no < line:
+                line, pos = 1, 0
+            while line < line_no and pos != -1:
+                pos = content.find('\n', pos)
+                if pos != -1:
+                    pos += 1
+                    line += 1
+            if pos == -1:
+                break
+            start = pos
+        
+        first, window_start = line_no, start
+        while first > 1 and first > line_no - context:
+            window_start = content.rfind('\n', 0, window_start - 1) + 1
+            first -= 1
+        
+        window = []
+        cursor = window_start
+        for n in range(first, line_no + context + 1):
+            end = content.find('\n', cursor)
+            window.append((n, content[cursor:end if end != -1 else None].strip()))
+            if end == -1:
+                break
+            cursor = end + 1
+        windows.append(window)
+    return windows
+
+
+def _match_chunk(contents: List[Optional[str]], query: Query,
+                 max_lines: int) -> List[Optional[Tuple[int, List[Tuple[int, int]]]]]:
+    """Match several notes in one call to a process pool worker"""
+    return [_match_content(content, query, max_lines) for content in contents]
+
+
+def _cancel(futures: Iterable[Future]) -> None:
+    """Cancel the futures that have not started yet"""
+    for future in futures:
+        future.cancel()
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    """Start a process pool for matching note contents
+    
+    Args:
+        workers: Number of worker processes
+    
+    Returns:
+        Pool whose workers do not inherit the threads of this process
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context(PROCESS_START_METHOD)
+    )
+
+
+def _never() -> bool:
+    """Cancellation check of a search that cannot be cancelled"""
+    return False
+
+
+def scan_notes(note_paths: Iterable[Path], query: Union[str, Query], max_lines: int = 5,
+               workers: int = 1, use_processes: bool = False,
+               cancelled: Callable[[], bool] = _never,
+               matchers: Optional[ProcessPoolExecutor] = None
+               ) -> Iterator[Tuple[Path, int, List[Tuple[int, int]]]]:
+    """Scan notes for a search query
+    
+    With more than one worker, notes are read on a thread pool and matched
+    either on those threads or, with use_processes, on a process pool.
+    Results are always yielded in the order of note_paths.
+    
+    Args:
+        note_paths: Notes to scan
+        query: Search query, compiled once if given as text
+        max_lines: Number of hits to return per note
+        workers: Number of parallel workers (1 scans sequentially)
+        use_processes: Match on a process pool instead of threads
+        cancelled: Checked before every note; once it returns True the
+                   scan stops and queued notes are not read
+        matchers: Process pool to match on with use_processes, kept by the
+                  caller across scans; a pool is started for this scan if None
+    
+    Yields:
+        Tuples of (note path, match count, first hits as
+        (line number, offset of the line start))
+    """
+    if isinstance(query, str):
+        query = Query(query)
+    
+    if workers <= 1:
+        # Stay lazy so results stream while note_paths is still being walked
+        for note_path in note_paths:
+            if cancelled():
+                return
+            match = _match_content(_read_note(note_path), query, max_lines)
+            if match:
+                yield (note_path, match[0], match[1])
+        return
+    
+    note_paths = list(note_paths)
+    with ThreadPoolExecutor(max_workers=workers) as readers:
+        if use_processes:
+            batches = [
+                note_paths[i:i + PROCESS_BATCH_SIZE]
+                for i in range(0, len(note_paths), PROCESS_BATCH_SIZE)
+            ]
+            
+            def read(batch: List[Path]) -> List[Future]:
+                return [readers.submit(_read_note, note_path) for note_path in batch]
+            
+            own_pool = matchers is None
+            if own_pool:
+                matchers = process_pool(workers)
+            try:
+                # Read the next batch on threads while the current one is matched
+                pending = read(batches[0]) if batches else []
+                for i, batch in enumerate(batches):
+                    if cancelled():
+                        _cancel(pending)
+                        return
+                    contents = [future.result() for future in pending]
+                    pending = []
+                    if i + 1 < len(batches):
+                        pending = read(batches[i + 1])
+                    size = max(1, len(contents) // workers)
+                    chunks = [
+                        matchers.submit(_match_chunk, contents[j:j + size], query, max_lines)
+                        for j in range(0, len(contents), size)
+                    ]
+                    for j, chunk in enumerate(chunks):
+                        if cancelled():
+                            _cancel(pending + chunks)
+                            return
+                        for note_path, match in zip(batch[j * size:], chunk.result()):
+                            if match:
+                                yield (note_path, match[0], match[1])
+            finally:
+                if own_pool:
+                    matchers.shutdown()
+        else:
+            futures = [
+                readers.submit(
+                    lambda note_path: _match_content(_read_note(note_path), query, max_lines),
+                    note_path
+                )
+                for note_path in note_paths
+            ]
+            for note_path, future in zip(note_paths, futures):
+                if cancelled():
+                    # Only the notes already being read are waited for
+                    _cancel(futures)
+                    return
+                match = future.result()
+                if match:
+                    yield (note_path, match[0], match[1])
 
 
 class Search:
     """Handles full-text search in notes"""
     
-    def __init__(self, root_dir: Path):
+    def __init__(self, root_dir: Path, index_path: Optional[Path] = None,
+                 workers: int = 1, use_processes: bool = False, cache_size: int = 32,
+                 max_results: int = 0, metadata_path: Optional[Path] = None,
+                 catalog: Optional[NoteCatalog] = None):
         """Initialize search
         
         Args:
             root_dir: Root directory for notes
+            index_path: Optional file for a persistent search index.
+                        If None, every query scans the notes directly.
+            metadata_path: Optional file for persisting note frontmatter
+            workers: Number of parallel workers used when scanning
+            use_processes: Match file contents on a process pool
+            cache_size: Number of recent queries whose results are cached
+            max_results: Default number of results to return (0 for all)
+            catalog: Catalog of the notes to search, shared with the notes
+                     manager; a private one is created if None
         """
         self.root_dir = Path(root_dir)
+        self.catalog = catalog if catalog is not None else NoteCatalog(self.root_dir)
+        self.catalog.subscribe(self._on_catalog_change)
+        self.index = SearchIndex(self.root_dir, index_path) if index_path else None
+        self.metadata = MetadataIndex(self.root_dir, metadata_path)
+        self.workers = max(1, workers)
+        self.use_processes = use_processes
+        # Started on the first scan that needs it and kept until close()
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self.max_results = max(0, max_results)
+        self.ranking = BM25()
+        self.cache = SearchCache(cache_size)
+        self._index_stale = False
+        self._metadata_stale = False
+        # Searches may run on worker threads; only one may touch the indexes at
+        # a time. Re-entrant, as syncing an index can refresh the catalog.
+        self._index_lock = threading.RLock()
+    
+    def close(self) -> None:
+        """Stop the process pool, if one was started"""
+        with self._pool_lock:
+            pool, self._process_pool = self._process_pool, None
+        if pool is not None:
+            pool.shutdown()
+    
+    def _matchers(self) -> Optional[ProcessPoolExecutor]:
+        """Get the process pool scans match on, None without use_processes"""
+        if not self.use_processes or self.workers <= 1:
+            return None
+        with self._pool_lock:
+            if self._process_pool is None:
+                self._process_pool = process_pool(self.workers)
+            return self._process_pool
+    
+    @property
+    def generation(self) -> int:
+        """Corpus generation; cached results from older generations are ignored"""
+        return self.catalog.generation
+    
+    def invalidate(self) -> None:
+        """Mark the notes as changed
+        
+        The catalog is walked again before the next query; if anything
+        changed, a new generation starts and the indexes pick up the
+        changed notes.
+        """
+        self.catalog.invalidate()
+    
+    def update_notes(self, paths: Iterable[Path]) -> None:
+        """Apply changes reported for individual notes, e.g. by the file watcher
+        
+        Only the given notes are checked again before the next query. A
+        path that is not a note, such as a moved folder, makes the catalog
+        walk the whole tree instead.
+        
+        Args:
+            paths: Notes or folders that were created, changed or deleted
+        """
+        self.catalog.invalidate(paths)
+    
+    def _on_catalog_change(self, change: CatalogChange) -> None:
+        """Have the indexes re-read changed notes before they are next used"""
+        # Only flags are set: this may run on any thread, and a search
+        # holding the index lock may be waiting on the catalog
+        self._index_stale = True
+        self._metadata_stale = True
     
-    def search(self, query: str) -> List[Dict]:
+    def refresh_index(self) -> int:
+        """Re-index notes that changed since the last refresh
+        
+        Returns:
+            Number of notes added, changed or removed
+        """
+        if self.index is None:
+            return 0
+        with self._index_lock:
+            self._index_stale = False
+            return self.index.update(self.catalog)
+    
+    def search(self, query: str, limit: Optional[int] = None,
+               cancelled: Callable[[], bool] = _never) -> List[Dict]:
         """Search for text in notes
         
+        With a limit only the best results are kept on a bounded heap, and
+        with an index, candidates are visited best first so reading stops
+        once no remaining note can make it into the top results.
+        
+        Args:
+            query: Search query (see Query for the supported syntax), plus
+                   optional metadata filters such as tag:work status:active
+            limit: Maximum number of results, defaults to max_results
+                   (0 for all)
+            cancelled: Checked before every note is read; once it returns
+                       True the search stops and returns the results found
+                       so far, which are not cached
+            
+        Returns:
+            List of dictionaries containing search results, most relevant
+            first
+        """
+        if limit is None:
+            limit = self.max_results
+        self.catalog.ensure_fresh()
+        generation = self.generation
+        compiled, allowed, key = self._parse(query)
+        cached = self.cache.get(key, generation)
+        if cached is not None:
+            return list(cached[:limit] if limit else cached)
+        
+        lookup = self._index_lookup(compiled, allowed) if compiled else None
+        if compiled is None:
+            results = self._metadata_results(allowed)
+        elif lookup is not None:
+            if limit:
+                # Truncated results cannot serve other queries, so they are not cached
+                return self._top_index_results(compiled, *lookup, limit, cancelled=cancelled)
+            results = list(self._iter_index_results(compiled, *lookup, cancelled=cancelled))
+        else:
+            # Sorted paths plus a stable sort keep ties in a deterministic order
+            note_paths = self._narrowed_paths(compiled, key, generation, allowed)
+            if note_paths is None:
+                note_paths = self.catalog.note_paths()
+            found = (
+                self._result(note_path, count, hits)
+                for note_path, count, hits in scan_notes(
+                    note_paths, compiled, workers=self.workers,
+                    use_processes=self.use_processes, cancelled=cancelled,
+                    matchers=self._matchers()
+                )
+            )
+            if limit:
+                return heapq.nlargest(limit, found, key=self._rank_key)
+            results = list(found)
+        
+        results = self.rank(results)
+        if cancelled():
+            return results
+        self.cache.put(key, generation, results)
+        return list(results)
+    
+    def iter_search(self, query: str, limit: Optional[int] = None,
+                    cancelled: Callable[[], bool] = _never) -> Iterator[Dict]:
+        """Search for text in notes, yielding each result as soon as it is found
+        
+        Results come in discovery order rather than ranked, so callers can
+        display the first hits before the whole corpus has been scanned and
+        stop consuming at any point to abandon the search.
+        
+        Args:
+            query: Search query, as for search()
+            limit: Stop after this many results, defaults to max_results
+                   (0 for all)
+            cancelled: Checked before every note is read; once it returns
+                       True the search stops without yielding more results
+        
+        Yields:
+            Result dictionaries in the same shape as search()
+        """
+        if limit is None:
+            limit = self.max_results
+        self.catalog.ensure_fresh()
+        generation = self.generation
+        compiled, allowed, key = self._parse(query)
+        cached = self.cache.get(key, generation)
+        if cached is not None:
+            yield from (cached[:limit] if limit else cached)
+            return
+        
+        lookup = self._index_lookup(compiled, allowed) if compiled else None
+        if compiled is None:
+            found = iter(self._metadata_results(allowed))
+        elif lookup is not None:
+            found = self._iter_index_results(compiled, *lookup, cancelled=cancelled)
+        else:
+            note_paths = self._narrowed_paths(compiled, key, generation, allowed)
+            if note_paths is None:
+                note_paths = self.catalog.note_paths()
+            found = (
+                self._result(note_path, count, hits)
+                for note_path, count, hits in scan_notes(
+                    note_paths, compiled, cancelled=cancelled
+                )
+            )
+        
+        results = []
+        for result in found:
+            results.append(result)
+            yield result
+            if len(results) == limit:
+                return
+        if cancelled():
+            return
+        
+        # Only a search that ran to completion may be reused
+        self.cache.put(key, generation, self.rank(results))
+    
+    @staticmethod
+    def _rank_key(result: Dict) -> Tuple[float, int]:
+        """Sort key ordering results by relevance"""
+        return result['score'], result['matches']
+    
+    def rank(self, results: List[Dict]) -> List[Dict]:
+        """Order results by relevance
+        
+        Args:
+            results: Result dictionaries, e.g. streamed by iter_search()
+        
+        Returns:
+            The results, most relevant first
+        """
+        return sorted(results, key=self._rank_key, reverse=True)
+    
+    def _parse(self, query: str) -> Tuple[Optional[Query], Optional[Set[str]], str]:
+        """Split a query into its text part and metadata filters
+        
         Args:
             query: Search query
+        
+        Returns:
+            Tuple of (compiled text query, or None if the query only has
+            filters; relative paths allowed by the filters, or None without
+            filters; normalized query for the result cache)
+        """
+        filters, text = split_filters(query)
+        if not filters:
+            compiled = Query(query)
+            return compiled, None, self._cache_key(compiled)
+        
+        compiled = Query(text) if text.strip() else None
+        with self._index_lock:
+            if not self.metadata.loaded or self._metadata_stale:
+                self._metadata_stale = False
+                self.metadata.update(self.catalog)
+            allowed = self.metadata.filter(filters)
+        
+        # Filters follow a separator no typed query contains, so a filtered
+        # key is never taken for the prefix of another query
+        key = self._cache_key(compiled) if compiled else ''
+        return compiled, allowed, key + '\0' + ' '.join(f"{field}:{value}" for field, value in filters)
+    
+    def _cache_key(self, query: Query) -> str:
+        """Normalize a query for the result cache"""
+        # Plain queries are case-insensitive substrings; operators are case-sensitive
+        return query.text.lower() if query.is_plain else query.text
+    
+    def _metadata_results(self, allowed: Set[str]) -> List[Dict]:
+        """Build results for a query made only of metadata filters"""
+        return [self._result(self.root_dir / rel, 0, []) for rel in sorted(allowed)]
+        
+    def _narrowed_paths(self, query: Query, key: str, generation: int,
+                        allowed: Optional[Set[str]] = None) -> Optional[List[Path]]:
+        """Get the notes worth scanning when the search can be narrowed
+        
+        Metadata filters restrict the scan to the notes they allow. A note
+        containing a plain query also contains every prefix of it, so
+        otherwise only the hits of the longest cached prefix are checked.
+        
+        Args:
+            query: Compiled search query
+            key: Normalized query
+            generation: Current corpus generation
+            allowed: Relative paths allowed by metadata filters, if any
+        
+        Returns:
+            Sorted paths of the notes to scan, or None to scan every note
+        """
+        if allowed is not None:
+            return sorted(self.root_dir / rel for rel in allowed)
+        if not query.is_plain:
+            return None
+        base = self.cache.get_prefix(key, generation)
+        if base is None:
+            return None
+        return sorted(result['file'] for result in base)
+    
+    def _result(self, note_path: Path, count: int, hits: List[Tuple[int, Optional[int]]],
+                terms: Optional[List[Tuple[float, int]]] = None) -> Dict:
+        """Build a result dictionary
+        
+        Results only record where the first matches are; the text around
+        them is extracted by snippets() once a result is displayed.
+        
+        Args:
+            note_path: Path to the matching note
+            count: Number of matching lines
+            hits: First matches as (line number, offset of the line start),
+                  the offset being None when only the line is known
+            terms: (idf, term frequency) per query term; without index
+                   statistics the whole query counts as one term
+        """
+        relative_path = note_path.relative_to(self.root_dir)
+        doc_length, avg_length = 0, 0.0
+        if self.index is not None:
+            doc_length = self.index.note_size(relative_path.as_posix()) or 0
+            avg_length = self.index.avg_size
+        
+        return {
+            'file': note_path,
+            'relative_path': relative_path,
+            'matches': count,
+            'score': self.ranking.score(terms or [(1.0, count)], doc_length, avg_length),
+            'hits': hits  # First 5 matches
+        }
+    
+    def snippets(self, result: Dict, context: int = 0) -> List[List[Tuple[int, str]]]:
+        """Extract the text around the hits of a result
+        
+        Args:
+            result: Result dictionary from search() or iter_search()
+            context: Number of lines to include before and after each hit
+        
+        Returns:
+            One window of (line number, text) per hit; empty if the note
+            can no longer be read
+        """
+        content = _read_note(result['file'])
+        if content is None:
+            return []
+        hits = result['hits']
+        if self.index is not None and any(start is None for _, start in hits):
+            # Hits answered by the postings alone only know their line
+            line_numbers = [line_no for line_no, _ in hits]
+            with self._index_lock:
+                starts = self.index.line_offsets(
+                    result['relative_path'].as_posix(), line_numbers
+                )
+            if starts is not None:
+                hits = list(zip(line_numbers, starts))
+        return extract_context(content, hits, context)
+    
+    def _index_lookup(self, query: Query, allowed: Optional[Set[str]] = None
+                      ) -> Optional[Tuple[Dict[str, Optional[List[int]]],
+                                          List[Tuple[float, Dict[str, int]]]]]:
+        """Narrow a query down to candidate notes using the search index
+        
+        Args:
+            query: Compiled search query
+            allowed: Only return candidates among these relative paths
+        
+        Returns:
+            Tuple of (candidates, term statistics), or None if there is no
+            index or it cannot narrow this query. Candidates map relative
+            paths to matching line numbers, sorted by path; line numbers are
+            None when the note still has to be matched against the query.
+            Term statistics hold (idf, term frequency per note) for each
+            indexed query term.
+        """
+        if self.index is None:
+            return None
+        
+        with self._index_lock:
+            if not self.index.loaded or self._index_stale:
+                self._index_stale = False
+                self.index.update(self.catalog)
+            doc_count = len(self.index)
+        
+            # A single-word plain query is answered by the postings alone
+            if query.is_plain and self.index.is_exact(query.text):
+                found = self.index.candidates(query.text)
+                terms = [(
+                    self.ranking.idf(len(found), doc_count),
+                    {rel: len(lines) for rel, lines in found.items()}
+                )]
+                return {
+                    rel: lines for rel, lines in sorted(found.items())
+                    if allowed is None or rel in allowed
+                }, terms
+            
+            literals = [
+                literal for literal in query.required_literals()
+                if tokenize(literal.lower())
+            ]
+            if not literals:
+                return None
+            
+            notes = None
+            terms = []
+            for literal in literals:
+                found = self.index.candidates(literal)
+                terms.append((
+                    self.ranking.idf(len(found), doc_count),
+                    {rel: len(lines) for rel, lines in found.items()}
+                ))
+                notes = set(found) if notes is None else notes & set(found)
+            if allowed is not None:
+                notes &= allowed
+            return {rel: None for rel in sorted(notes)}, terms
+    
+    def _iter_index_results(self, query: Query,
+                            candidates: Dict[str, Optional[List[int]]],
+                            terms: List[Tuple[float, Dict[str, int]]],
+                            cancelled: Callable[[], bool] = _never) -> Iterator[Dict]:
+        """Turn index candidates into result dictionaries
+        
+        Args:
+            query: Compiled search query
+            candidates: Candidates from _index_lookup()
+            terms: Term statistics from _index_lookup()
+            cancelled: Checked before every candidate; stops when True
+        
+        Yields:
+            Result dictionaries for notes that really match
+        """
+        for rel, line_numbers in candidates.items():
+            if cancelled():
+                return
+            result = self._index_result(query, rel, line_numbers, terms)
+            if result is not None:
+                yield result
             
+    def _top_index_results(self, query: Query,
+                           candidates: Dict[str, Optional[List[int]]],
+                           terms: List[Tuple[float, Dict[str, int]]],
+                           limit: int, cancelled: Callable[[], bool] = _never) -> List[Dict]:
+        """Find the best index candidates, reading as few notes as possible
+        
+        A candidate's score only depends on index statistics, so candidates
+        are popped from a heap best first and only read when the match has
+        to be verified. Once limit results are found, candidates scoring
+        below the last of them cannot displace any result.
+        
+        Args:
+            query: Compiled search query
+            candidates: Candidates from _index_lookup()
+            terms: Term statistics from _index_lookup()
+            limit: Number of results to return
+            cancelled: Checked before every candidate; stops when True
+        
         Returns:
-            List of dictionaries containing search results
+            The same results as the first limit entries of a full search,
+            or the best found so far if cancelled
         """
+        avg_length = self.index.avg_size
+        heap = []
+        for rel in candidates:
+            note_terms = [(idf, tf.get(rel, 0)) for idf, tf in terms]
+            score = self.ranking.score(note_terms, self.index.note_size(rel) or 0, avg_length)
+            heap.append((-score, rel))
+        heapq.heapify(heap)
+            
         results = []
+        while heap and not cancelled():
+            neg_score, rel = heapq.heappop(heap)
+            # Notes tied with the last result still compete on match count
+            if len(results) >= limit and -neg_score < results[limit - 1]['score']:
+                break
+            result = self._index_result(query, rel, candidates[rel], terms)
+            if result is not None:
+                results.append(result)
+            
+        # Candidates were popped in path order within equal scores, like a full search
+        return heapq.nlargest(limit, results, key=self._rank_key)
         
-        for note_path in self.root_dir.rglob('*.md'):
-            try:
-                content = note_path.read_text(encoding='utf-8', errors='ignore')
-                
-                # Case-insensitive search
-                if query.lower() in content.lower():
-                    # Find line numbers containing the query
-                    lines = content.split('\n')
-                    matching_lines = []
-                    
-                    for i, line in enumerate(lines, 1):
-                        if query.lower() in line.lower():
-                            matching_lines.append((i, line.strip()))
-                    
-                    results.append({
-                        'file': note_path,
-                        'relative_path': note_path.relative_to(self.root_dir),
-                        'matches': len(matching_lines),
-                        'lines': matching_lines[:5]  # Show first 5 matches
-                    })
-            except Exception:
-                pass
-        
-        return sorted(results, key=lambda x: x['matches'], reverse=True)
+    def _index_result(self, query: Query, rel: str, line_numbers: Optional[List[int]],
+                      terms: List[Tuple[float, Dict[str, int]]]) -> Optional[Dict]:
+        """Build the result for one index candidate
+        
+        Args:
+            query: Compiled search query
+            rel: Relative path of the candidate note
+            line_numbers: Matching lines from the index, or None to match
+                          the note against the query
+            terms: Term statistics from _index_lookup()
+        
+        Returns:
+            Result dictionary, or None if the note does not really match
+        """
+        note_path = self.root_dir / rel
+        note_terms = [(idf, tf.get(rel, 0)) for idf, tf in terms]
+        
+        if line_numbers is None:
+            match = _match_content(_read_note(note_path), query, 5)
+            if not match:
+                return None
+            return self._result(note_path, match[0], match[1], note_terms)
+        
+        # The postings already hold the matching lines, so the note is not read
+        return self._result(
+            note_path, len(line_numbers), [(i, None) for i in line_numbers[:5]], note_terms
+        )
@@ -0,0 +1,79 @@
+"""
+LRU cache of search results
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+class SearchCache:
+    """Bounded LRU cache of search results keyed by query and corpus generation
+    
+    Entries from an older generation are never returned, so bumping the
+    generation whenever notes change is enough to keep results fresh.
+    """
+    
+    def __init__(self, max_entries: int = 32):
+        """Initialize the cache
+        
+        Args:
+            max_entries: Maximum number of queries to keep
+        """
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple[str, int], List[Dict]]" = OrderedDict()
+        # Searches run on worker threads as well as the UI thread
+        self._lock = threading.Lock()
+    
+    def get(self, key: str, generation: int) -> Optional[List[Dict]]:
+        """Look up the results of a query
+        
+        Args:
+            key: Normalized query
+            generation: Current corpus generation
+        
+        Returns:
+            Cached results, or None on a miss
+        """
+        with self._lock:
+            results = self.entries.get((key, generation))
+            if results is not None:
+                self.entries.move_to_end((key, generation))
+            return results
+    
+    def get_prefix(self, key: str, generation: int) -> Optional[List[Dict]]:
+        """Find the results of the longest cached query that key extends
+        
+        Args:
+            key: Normalized query
+            generation: Current corpus generation
+        
+        Returns:
+            Results of the longest cached prefix of key, or None
+        """
+        for end in range(len(key) - 1, 0, -1):
+            results = self.get(key[:end], generation)
+            if results is not None:
+                return results
+        return None
+    
+    def put(self, key: str, generation: int, results: List[Dict]) -> None:
+        """Store the results of a query
+        
+        Args:
+            key: Normalized query
+            generation: Corpus generation the results were computed for
+            results: Search results
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self.entries[(key, generation)] = results
+            self.entries.move_to_end((key, generation))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop every cached result"""
+        with self._lock:
+            self.entries.clear()
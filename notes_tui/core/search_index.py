@@ -0,0 +1,638 @@
+"""
+Persistent inverted index for full-text search
+"""
+
+import hashlib
+import re
+import sqlite3
+from array import array
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from notes_tui.core.catalog import NoteCatalog
+
+
+# Bump whenever the on-disk layout changes so stale caches are rebuilt
+INDEX_VERSION = 4
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Length of the substrings terms are looked up by
+GRAM_SIZE = 3
+
+# Notes whose postings of one term share a row; an edit rewrites one row
+# per term of the note, a query reads one row per term and block
+BLOCK_DOCS = 256
+
+# Notes indexed before their postings are merged into the database
+FLUSH_DOCS = 2048
+
+# Terms looked up per statement, well below SQLite's parameter limit
+LOOKUP_BATCH = 500
+
+# Refreshing more notes than this loads the whole vocabulary up front
+# instead of looking up each note's terms
+VOCABULARY_THRESHOLD = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, rel TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, terms BLOB NOT NULL,
+    lines BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS terms (id INTEGER PRIMARY KEY, term TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS grams (
+    gram TEXT NOT NULL, term_id INTEGER NOT NULL, PRIMARY KEY (gram, term_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS postings (
+    term_id INTEGER NOT NULL, block INTEGER NOT NULL, docs BLOB NOT NULL,
+    PRIMARY KEY (term_id, block)
+) WITHOUT ROWID;
+"""
+
+def tokenize(text: str) -> List[str]:
+    """Split lowercased text into index terms
+    
+    Args:
+        text: Text to tokenize (expected to be lowercased already)
+    
+    Returns:
+        List of terms in order of appearance
+    """
+    return TOKEN_RE.findall(text)
+
+
+def grams(term: str) -> Set[str]:
+    """Get the substrings of GRAM_SIZE characters of a term
+    
+    Args:
+        term: Index term or query token
+    
+    Returns:
+        Distinct substrings, empty for terms shorter than GRAM_SIZE
+    """
+    return {term[i:i + GRAM_SIZE] for i in range(len(term) - GRAM_SIZE + 1)}
+
+
+def pack_ints(values: Sequence[int]) -> bytes:
+    """Serialize non-negative integers, two bytes each when they fit
+    
+    Args:
+        values: Integers below 2**32
+    
+    Returns:
+        Type code followed by the packed values
+    """
+    typecode = 'H' if max(values, default=0) < 0x10000 else 'I'
+    return typecode.encode() + array(typecode, values).tobytes()
+
+
+def unpack_ints(data: bytes) -> array:
+    """Read back integers written by pack_ints()
+    
+    Args:
+        data: Packed integers
+    
+    Returns:
+        The integers
+    """
+    values = array(chr(data[0]))
+    values.frombytes(data[1:])
+    return values
+
+
+def pack_block(chunks: Sequence[array]) -> bytes:
+    """Serialize the postings of one term in a block of notes
+    
+    Args:
+        chunks: Postings of each note, as made by _index_file(): the doc id
+                offset in the block, the line count and the line numbers
+    
+    Returns:
+        The chunks behind a common type code
+    """
+    if all(chunk.typecode == 'H' for chunk in chunks):
+        return b'H' + b''.join(chunk.tobytes() for chunk in chunks)
+    return b'I' + b''.join(array('I', chunk).tobytes() for chunk in chunks)
+
+
+def unpack_block(data: bytes) -> Iterator[array]:
+    """Split a block written by pack_block() back into chunks
+    
+    Args:
+        data: Packed postings
+    
+    Yields:
+        Chunk of each note
+    """
+    values = unpack_ints(data)
+    i = 0
+    while i < len(values):
+        end = i + 2 + values[i + 1]
+        yield values[i:end]
+        i = end
+
+
+def iter_postings(data: bytes) -> Iterator[Tuple[int, List[int]]]:
+    """Decode a block written by pack_block() for lookups
+    
+    Args:
+        data: Packed postings
+    
+    Yields:
+        (doc id offset in the block, line numbers) of each note
+    """
+    values = unpack_ints(data).tolist()
+    i = 0
+    while i < len(values):
+        end = i + 2 + values[i + 1]
+        yield values[i], values[i + 2:end]
+        i = end
+
+
+def default_index_path(root_dir: Path, cache_dir: Path, name: str = 'search-index',
+                       suffix: str = '.sqlite') -> Path:
+    """Get the index file location for a notes directory
+    
+    Args:
+        root_dir: Root directory for notes
+        cache_dir: Directory holding notes-tui cache files
+        name: Kind of index, used as the file name prefix
+        suffix: File extension of the index format; the search index is
+                SQLite, other caches pass their own
+    
+    Returns:
+        Path to the index file, unique per notes directory
+    """
+    digest = hashlib.sha1(str(Path(root_dir).resolve()).encode('utf-8')).hexdigest()
+    return Path(cache_dir) / f"{name}-{digest[:12]}{suffix}"
+
+
+class SearchIndex:
+    """On-disk inverted index mapping terms to note line numbers
+    
+    The index is a SQLite database. The postings of a term are split into
+    rows by blocks of BLOCK_DOCS notes, so refreshing after an edit only
+    rewrites one row per term of the note, and opening the index only
+    reads the list of indexed notes. Each note is keyed by its relative
+    path together with its mtime and size, so refreshing a warm index only
+    re-tokenizes notes that changed. The line starts of each note are kept
+    next to it, so the text around a hit can be cut out without counting
+    the lines before it.
+    
+    Query tokens are matched inside terms through a table of the terms'
+    trigrams; only tokens too short for a trigram are compared against the
+    whole vocabulary, inside SQLite. Terms no longer used by any note stay
+    in the vocabulary, where they match no postings.
+    """
+    
+    def __init__(self, root_dir: Path, index_path: Path):
+        """Initialize the index
+        
+        Args:
+            root_dir: Root directory for notes
+            index_path: File the index is persisted to
+        """
+        self.root_dir = Path(root_dir)
+        self.index_path = Path(index_path)
+        self.loaded = False
+        self.dirty = False
+        self._db: Optional[sqlite3.Connection] = None
+        # term -> id while many notes are being indexed
+        self._term_ids: Optional[Dict[str, int]] = None
+        self._reset()
+    
+    def _reset(self) -> None:
+        """Drop the in-memory view of the index"""
+        # relative path -> (doc id, mtime_ns, size)
+        self.files: Dict[str, Tuple[int, int, int]] = {}
+        # doc id -> relative path
+        self.docs: Dict[int, str] = {}
+        # Sum of indexed note sizes, kept current for ranking statistics
+        self.total_size = 0
+        # Postings not merged into the database yet: block -> term id ->
+        # chunks added, and (term id, block) -> doc id offsets removed
+        self._added: Dict[int, Dict[int, List[array]]] = {}
+        self._removed: Dict[Tuple[int, int], Set[int]] = {}
+        self._buffered = 0
+        # Blocks above this one have no rows in the database yet
+        self._last_block = -1
+    
+    def _open(self) -> Tuple[sqlite3.Connection, bool]:
+        """Open the database file
+        
+        Returns:
+            Tuple of (connection, whether it holds a compatible index); a
+            file of another version or notes directory, or no database at
+            all, is replaced by an empty index
+        """
+        expected = {'version': str(INDEX_VERSION), 'root': str(self.root_dir)}
+        path = str(self.index_path)
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                db = self._create(path)
+                if dict(db.execute("SELECT key, value FROM meta")) == expected:
+                    return db, True
+                db.close()
+            except sqlite3.DatabaseError:
+                pass
+            self.index_path.unlink()
+            db = self._create(path)
+        except (OSError, sqlite3.DatabaseError):
+            # No usable cache file: index in memory for this run
+            db = self._create(':memory:')
+        db.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", expected.items())
+        db.commit()
+        return db, False
+    
+    @staticmethod
+    def _create(location: str) -> sqlite3.Connection:
+        """Open a database and create any missing tables"""
+        # Searches run on worker threads, one at a time
+        db = sqlite3.connect(location, check_same_thread=False)
+        try:
+            db.execute("PRAGMA cache_size = -65536")
+            db.executescript(SCHEMA)
+        except sqlite3.DatabaseError:
+            db.close()
+            raise
+        return db
+    
+    def load(self) -> bool:
+        """Open the index on disk and read the list of indexed notes
+        
+        Returns:
+            True if a compatible index was loaded, False otherwise
+        """
+        self.loaded = True
+        self.close()
+        self._reset()
+        self._db, compatible = self._open()
+        if not compatible:
+            return False
+        
+        for doc_id, rel, mtime_ns, size in self._db.execute(
+                "SELECT id, rel, mtime_ns, size FROM files"):
+            self.files[rel] = (doc_id, mtime_ns, size)
+            self.docs[doc_id] = rel
+            self.total_size += size
+        self._last_block = max(self.docs, default=-1) // BLOCK_DOCS
+        self.dirty = False
+        return True
+    
+    def save(self) -> None:
+        """Merge buffered postings and commit the changes since the last save"""
+        if self._db is not None:
+            self._flush()
+            self._db.commit()
+        self.dirty = False
+    
+    def close(self) -> None:
+        """Save and close the database"""
+        if self._db is not None:
+            self.save()
+            self._db.close()
+            self._db = None
+    
+    def update(self, catalog: Optional[NoteCatalog] = None) -> int:
+        """Bring the index in sync with the notes directory
+        
+        Only notes whose mtime or size changed are re-read, and only the
+        rows holding their postings are written.
+        
+        Args:
+            catalog: Catalog of the notes directory; the directory is walked
+                     for a new one if None
+        
+        Returns:
+            Number of notes added, changed or removed
+        """
+        if not self.loaded:
+            self.load()
+        if catalog is None:
+            catalog = NoteCatalog(self.root_dir)
+        catalog.ensure_fresh()
+        notes = catalog.notes
+        
+        stale = [
+            (rel, stat) for rel, stat in notes.items()
+            if rel not in self.files or self.files[rel][1:] != stat
+        ]
+        removed = [rel for rel in self.files if rel not in notes]
+        if len(stale) > VOCABULARY_THRESHOLD:
+            self._term_ids = dict(self._db.execute("SELECT term, id FROM terms"))
+        
+        changed = 0
+        try:
+            for rel, (mtime_ns, size) in stale:
+                if self._index_file(rel, self.root_dir / rel, mtime_ns, size):
+                    changed += 1
+            for rel in removed:
+                self._remove(rel)
+                changed += 1
+        finally:
+            self._term_ids = None
+        
+        if self.dirty:
+            self.save()
+        return changed
+    
+    def add_file(self, note_path: Path) -> bool:
+        """Index or re-index a single note
+        
+        Args:
+            note_path: Absolute path to the note
+        
+        Returns:
+            True if the note was indexed
+        """
+        if not self.loaded:
+            self.load()
+        try:
+            st = note_path.stat()
+        except OSError:
+            return self.remove_file(note_path)
+        rel = note_path.relative_to(self.root_dir).as_posix()
+        indexed = self._index_file(rel, note_path, st.st_mtime_ns, st.st_size)
+        self.save()
+        return indexed
+    
+    def remove_file(self, note_path: Path) -> bool:
+        """Drop a note from the index
+        
+        Args:
+            note_path: Absolute path to the note
+        
+        Returns:
+            True if the note was indexed before
+        """
+        if not self.loaded:
+            self.load()
+        rel = note_path.relative_to(self.root_dir).as_posix()
+        if rel not in self.files:
+            return False
+        self._remove(rel)
+        self.save()
+        return True
+    
+    def _index_file(self, rel: str, note_path: Path, mtime_ns: int, size: int) -> bool:
+        """Read and tokenize one note, buffering its postings"""
+        try:
+            content = note_path.read_text(encoding='utf-8', errors='ignore')
+        except OSError:
+            return False
+        
+        if rel in self.files:
+            self._remove(rel)
+        
+        terms: Dict[str, List[int]] = {}
+        for lineno, line in enumerate(content.lower().split('\n'), 1):
+            for term in tokenize(line):
+                lines = terms.get(term)
+                if lines is None:
+                    terms[term] = [lineno]
+                elif lines[-1] != lineno:
+                    lines.append(lineno)
+        
+        # Lowercasing can change lengths, so line starts come from the original
+        starts = list(accumulate((len(line) + 1 for line in content.split('\n')[:-1]), initial=0))
+        
+        term_ids = self._term_ids_for(list(terms))
+        # The note's term ids tell which rows hold its postings
+        doc_id = self._db.execute(
+            "INSERT INTO files (rel, mtime_ns, size, terms, lines) VALUES (?, ?, ?, ?, ?)",
+            (rel, mtime_ns, size, pack_ints(term_ids), pack_ints(starts))
+        ).lastrowid
+        block, offset = divmod(doc_id, BLOCK_DOCS)
+        # Line numbers and counts, at most lineno, fit in two bytes unless
+        # the note is huge
+        typecode = 'H' if lineno < 0x10000 else 'I'
+        added = self._added.setdefault(block, {})
+        for term_id, lines in zip(term_ids, terms.values()):
+            chunk = array(typecode, (offset, len(lines)))
+            chunk.extend(lines)
+            chunks = added.get(term_id)
+            if chunks is None:
+                added[term_id] = [chunk]
+            else:
+                chunks.append(chunk)
+        
+        self.files[rel] = (doc_id, mtime_ns, size)
+        self.docs[doc_id] = rel
+        self.total_size += size
+        self.dirty = True
+        self._buffered += 1
+        if self._buffered >= FLUSH_DOCS:
+            self._flush()
+        return True
+    
+    def _term_ids_for(self, terms: List[str]) -> List[int]:
+        """Get the ids of terms, adding the ones not in the vocabulary yet"""
+        db = self._db
+        if self._term_ids is not None:
+            ids = {term: self._term_ids[term] for term in terms if term in self._term_ids}
+        else:
+            ids = {}
+            for i in range(0, len(terms), LOOKUP_BATCH):
+                batch = terms[i:i + LOOKUP_BATCH]
+                ids.update(db.execute(
+                    f"SELECT term, id FROM terms WHERE term IN ({','.join('?' * len(batch))})",
+                    batch
+                ))
+        
+        new = [term for term in terms if term not in ids]
+        for term in new:
+            ids[term] = db.execute("INSERT INTO terms (term) VALUES (?)", (term,)).lastrowid
+        if self._term_ids is not None:
+            self._term_ids.update((term, ids[term]) for term in new)
+        db.executemany(
+            "INSERT INTO grams (gram, term_id) VALUES (?, ?)",
+            [(gram, ids[term]) for term in new for gram in grams(term)]
+        )
+        return [ids[term] for term in terms]
+    
+    def _remove(self, rel: str) -> None:
+        """Forget a note, buffering the removal of its postings"""
+        doc_id, _, size = self.files.pop(rel)
+        del self.docs[doc_id]
+        self.total_size -= size
+        term_ids = unpack_ints(
+            self._db.execute("SELECT terms FROM files WHERE id = ?", (doc_id,)).fetchone()[0]
+        )
+        self._db.execute("DELETE FROM files WHERE id = ?", (doc_id,))
+        block, offset = divmod(doc_id, BLOCK_DOCS)
+        for term_id in term_ids:
+            self._removed.setdefault((term_id, block), set()).add(offset)
+        self.dirty = True
+    
+    def _flush(self) -> None:
+        """Merge the buffered postings into their rows
+        
+        Rows of blocks past the last one written are new, so notes
+        appended in bulk are written without reading anything back.
+        """
+        db = self._db
+        rows = []
+        empty = []
+        for block, added in self._added.items():
+            for term_id, chunks in added.items():
+                if block > self._last_block and (term_id, block) not in self._removed:
+                    rows.append((term_id, block, pack_block(chunks)))
+        
+        merged = {
+            (term_id, block) for block, added in self._added.items()
+            if block <= self._last_block for term_id in added
+        }
+        merged.update(self._removed)
+        for term_id, block in sorted(merged):
+            removed = self._removed.get((term_id, block), ())
+            chunks = []
+            row = db.execute(
+                "SELECT docs FROM postings WHERE term_id = ? AND block = ?", (term_id, block)
+            ).fetchone()
+            if row is not None:
+                chunks = [chunk for chunk in unpack_block(row[0]) if chunk[0] not in removed]
+            chunks += [
+                chunk for chunk in self._added.get(block, {}).get(term_id, ())
+                if chunk[0] not in removed
+            ]
+            if chunks:
+                rows.append((term_id, block, pack_block(chunks)))
+            else:
+                empty.append((term_id, block))
+        
+        rows.sort(key=lambda row: row[:2])
+        db.executemany(
+            "INSERT OR REPLACE INTO postings (term_id, block, docs) VALUES (?, ?, ?)", rows
+        )
+        db.executemany("DELETE FROM postings WHERE term_id = ? AND block = ?", empty)
+        self._last_block = max([self._last_block, *self._added])
+        self._added = {}
+        self._removed = {}
+        self._buffered = 0
+    
+    def _postings(self, token: str) -> Iterator[Tuple[int, bytes]]:
+        """Get the postings rows of every term containing a token
+        
+        Args:
+            token: Lowercased query token
+        
+        Returns:
+            (block, postings packed by pack_block()) rows
+        """
+        sql = (
+            "SELECT p.block, p.docs FROM terms t JOIN postings p ON p.term_id = t.id"
+            " WHERE instr(t.term, ?) > 0"
+        )
+        params = [token]
+        token_grams = sorted(grams(token))
+        if token_grams:
+            # Only terms holding every trigram of the token can contain it
+            sql += " AND t.id IN ({})".format(
+                " INTERSECT ".join(["SELECT term_id FROM grams WHERE gram = ?"] * len(token_grams))
+            )
+            params += token_grams
+        return self._db.execute(sql, params)
+    
+    def candidates(self, query: str) -> Optional[Dict[str, List[int]]]:
+        """Find lines that may contain a substring query
+        
+        Every query token must appear inside a term on the same line. For a
+        query made of a single token this is exact; otherwise the caller has
+        to verify the returned lines against the note text.
+        
+        Args:
+            query: Search query
+        
+        Returns:
+            Mapping of relative path to candidate line numbers, or None if
+            the query has no indexable terms
+        """
+        tokens = tokenize(query.lower())
+        if not tokens:
+            return None
+        if not self.loaded:
+            self.load()
+        
+        result: Optional[Dict[int, Set[int]]] = None
+        for token in dict.fromkeys(tokens):
+            hits: Dict[int, List[int]] = {}
+            for block, data in self._postings(token):
+                base = block * BLOCK_DOCS
+                for offset, lines in iter_postings(data):
+                    doc_id = base + offset
+                    if result is not None and doc_id not in result:
+                        continue
+                    if doc_id in hits:
+                        hits[doc_id] += lines
+                    else:
+                        hits[doc_id] = lines
+            
+            if result is None:
+                result = {doc_id: set(lines) for doc_id, lines in hits.items()}
+            else:
+                result = {
+                    doc_id: result[doc_id].intersection(lines)
+                    for doc_id, lines in hits.items()
+                    if not result[doc_id].isdisjoint(lines)
+                }
+            if not result:
+                return {}
+        
+        return {self.docs[doc_id]: sorted(lines) for doc_id, lines in result.items()}
+    
+    @staticmethod
+    def is_exact(query: str) -> bool:
+        """Check whether candidates() is exact for a query
+        
+        Args:
+            query: Search query
+        
+        Returns:
+            True if the query is a single indexable token
+        """
+        return TOKEN_RE.fullmatch(query.lower()) is not None
+    
+    @property
+    def avg_size(self) -> float:
+        """Average size of indexed notes in bytes"""
+        return self.total_size / len(self.files) if self.files else 0.0
+    
+    def note_size(self, rel: str) -> Optional[int]:
+        """Get the indexed size of a note
+        
+        Args:
+            rel: Relative path of the note
+        
+        Returns:
+            Size in bytes, or None if the note is not indexed
+        """
+        entry = self.files.get(rel)
+        return entry[2] if entry else None
+    
+    def line_offsets(self, rel: str, line_numbers: Sequence[int]) -> Optional[List[Optional[int]]]:
+        """Get where lines of a note started when it was indexed
+        
+        Args:
+            rel: Relative path of the note
+            line_numbers: Line numbers, counted from 1
+        
+        Returns:
+            Offset of each line start in the note text, None for lines past
+            the end; None if the note is not indexed
+        """
+        entry = self.files.get(rel)
+        if entry is None or self._db is None:
+            return None
+        row = self._db.execute("SELECT lines FROM files WHERE id = ?", (entry[0],)).fetchone()
+        if row is None:
+            return None
+        starts = unpack_ints(row[0])
+        return [starts[n - 1] if 0 < n <= len(starts) else None for n in line_numbers]
+    
+    def __len__(self) -> int:
+        """Number of indexed notes"""
+        return len(self.files)
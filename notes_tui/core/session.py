@@ -0,0 +1,108 @@
+"""
+UI state saved between runs
+"""
+
+import os
+import pickle
+from pathlib import Path
+from typing import Iterable, Optional, Set
+
+
+# Bump whenever the on-disk layout changes so old sessions are ignored
+SESSION_VERSION = 1
+
+
+class SessionState:
+    """Expanded folders, selected note and preview scroll of the last run
+    
+    Paths are stored relative to the notes root, using '/', and handed out
+    as absolute paths. Folders are kept in a set so restoring the tree
+    checks each folder node with a single lookup.
+    """
+    
+    def __init__(self, root_dir: Path, session_path: Optional[Path] = None):
+        """Initialize the session state
+        
+        Args:
+            root_dir: Root directory for notes
+            session_path: Optional file the state is persisted to
+        """
+        self.root_dir = Path(root_dir)
+        self.session_path = Path(session_path) if session_path else None
+        # Relative paths of the expanded folders
+        self.expanded: Set[str] = set()
+        # Relative path of the note shown in the preview
+        self.selected: Optional[str] = None
+        self.preview_scroll = 0.0
+    
+    def load(self) -> bool:
+        """Load the state saved by the last run
+        
+        Returns:
+            True if a compatible state was loaded, False otherwise
+        """
+        if self.session_path is None:
+            return False
+        try:
+            with open(self.session_path, 'rb') as f:
+                data = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+            return False
+        
+        if (not isinstance(data, dict)
+                or data.get('version') != SESSION_VERSION
+                or data.get('root') != str(self.root_dir)):
+            return False
+        
+        self.expanded = set(data['expanded'])
+        self.selected = data['selected']
+        self.preview_scroll = data['preview_scroll']
+        return True
+    
+    def save(self) -> None:
+        """Write the state to disk atomically"""
+        if self.session_path is None:
+            return
+        data = {
+            'version': SESSION_VERSION,
+            'root': str(self.root_dir),
+            'expanded': self.expanded,
+            'selected': self.selected,
+            'preview_scroll': self.preview_scroll,
+        }
+        self.session_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.session_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.session_path)
+    
+    def _relative(self, path: Path) -> Optional[str]:
+        """Get a path relative to the root, None if it is outside"""
+        try:
+            return Path(path).relative_to(self.root_dir).as_posix()
+        except ValueError:
+            return None
+    
+    def record(self, expanded: Iterable[Path], selected: Optional[Path],
+               preview_scroll: float = 0.0) -> None:
+        """Remember the current view
+        
+        Args:
+            expanded: Expanded folders
+            selected: Note shown in the preview, if any
+            preview_scroll: Vertical scroll offset of the preview
+        """
+        self.expanded = {rel for rel in map(self._relative, expanded) if rel}
+        self.selected = self._relative(selected) if selected is not None else None
+        self.preview_scroll = preview_scroll if self.selected else 0.0
+    
+    def expanded_paths(self) -> Set[str]:
+        """Get the absolute paths of the expanded folders"""
+        return {os.path.join(self.root_dir, *rel.split('/')) for rel in self.expanded}
+    
+    def selected_path(self) -> Optional[Path]:
+        """Get the selected note if it still exists"""
+        if self.selected is None:
+            return None
+        path = self.root_dir / self.selected
+        return path if path.is_file() else None
@@ -0,0 +1,275 @@
+"""
+Persistent snapshot of the notes directory tree
+"""
+
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+
+# Bump whenever the on-disk layout changes so stale snapshots are rebuilt
+SNAPSHOT_VERSION = 1
+
+# A directory modified this recently may change again within the same mtime
+# tick on coarse filesystems, so its mtime is not trusted to detect changes
+MTIME_GRACE_NS = 2_000_000_000
+
+# Sorted subdirectory names and sorted note file names of one directory
+Listing = Tuple[Tuple[str, ...], Tuple[str, ...]]
+
+T = TypeVar('T')
+
+
+def dir_mtime(directory: str) -> Optional[int]:
+    """Get the mtime of a directory if it can be trusted to detect changes
+    
+    Args:
+        directory: Directory path
+    
+    Returns:
+        mtime in nanoseconds, or None if the directory is missing or was
+        modified too recently to tell later changes apart
+    """
+    try:
+        mtime_ns = os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+    if time.time_ns() - mtime_ns < MTIME_GRACE_NS:
+        return None
+    return mtime_ns
+
+
+def scan_directory(directory: str) -> Listing:
+    """Read the subdirectories and notes of one directory
+    
+    Uses a single os.scandir pass; entry types come from the directory
+    listing itself, so most entries need no extra stat call.
+    
+    Args:
+        directory: Directory to scan
+    
+    Returns:
+        Sorted subdirectory names and sorted note file names
+    """
+    dirs = []
+    notes = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                # Skip hidden files except .config
+                if name.startswith('.') and name != '.config':
+                    continue
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue
+                if is_dir:
+                    dirs.append(name)
+                elif name.endswith('.md'):
+                    notes.append(name)
+    except OSError:
+        # Unreadable, or removed while the tree was being walked
+        pass
+    
+    dirs.sort()
+    notes.sort()
+    return tuple(dirs), tuple(notes)
+
+
+def walk_tree(roots: Iterable[T], visit: Callable[[T], Iterable[T]], workers: int = 1) -> None:
+    """Visit every item of a tree, optionally on a thread pool
+    
+    With more than one worker, each item's children are submitted as soon
+    as it has been visited, so on filesystems where every listing is a
+    network round-trip up to `workers` folders are read at once. Callers
+    build their results in listing order, so the outcome does not depend
+    on the order in which items finish.
+    
+    Args:
+        roots: Items to start from
+        visit: Called once per item; returns the item's children
+        workers: Number of threads (1 visits sequentially)
+    """
+    if workers <= 1:
+        stack = list(roots)
+        while stack:
+            stack.extend(visit(stack.pop()))
+        return
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(visit, item) for item in roots}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.update(pool.submit(visit, child) for child in future.result())
+
+
+class TreeSnapshot:
+    """Listing of every folder in the notes tree, persisted between runs
+    
+    Each folder's subfolders and notes are stored with the folder's mtime.
+    Adding, removing or renaming an entry changes the mtime of the folder
+    holding it, so a folder whose mtime is unchanged can be listed from the
+    snapshot without reading the directory again.
+    """
+    
+    def __init__(self, root_dir: Path, snapshot_path: Optional[Path] = None,
+                 workers: int = 1):
+        """Initialize the snapshot
+        
+        Args:
+            root_dir: Root directory for notes
+            snapshot_path: Optional file the snapshot is persisted to
+            workers: Number of folders checked at once when walking the
+                     tree (1 walks sequentially)
+        """
+        self.root_dir = Path(root_dir)
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.workers = max(1, workers)
+        self.loaded = False
+        self.dirty = False
+        # directory path -> (mtime_ns, sorted subdirectory names, sorted note names)
+        self.dirs: Dict[str, Tuple[Optional[int], Tuple[str, ...], Tuple[str, ...]]] = {}
+        # The tree view lists folders while the snapshot is revalidated
+        self._lock = threading.Lock()
+    
+    def load(self) -> bool:
+        """Load the snapshot from disk
+        
+        Returns:
+            True if a compatible snapshot was loaded, False otherwise
+        """
+        self.loaded = True
+        if self.snapshot_path is None:
+            return False
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                data = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+            return False
+        
+        if (not isinstance(data, dict)
+                or data.get('version') != SNAPSHOT_VERSION
+                or data.get('root') != str(self.root_dir)):
+            return False
+        
+        with self._lock:
+            self.dirs = data['dirs']
+            self.dirty = False
+        return True
+    
+    def save(self) -> None:
+        """Write the snapshot to disk atomically"""
+        if self.snapshot_path is None:
+            self.dirty = False
+            return
+        with self._lock:
+            data = {
+                'version': SNAPSHOT_VERSION,
+                'root': str(self.root_dir),
+                'dirs': dict(self.dirs),
+            }
+            self.dirty = False
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.snapshot_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.snapshot_path)
+    
+    def get(self, directory: str, mtime_ns: Optional[int]) -> Optional[Listing]:
+        """Look up the listing of a directory
+        
+        Args:
+            directory: Directory path
+            mtime_ns: Current mtime of the directory, from dir_mtime()
+        
+        Returns:
+            (subdirectory names, note names), or None unless the directory
+            is in the snapshot with the same mtime
+        """
+        if mtime_ns is None:
+            return None
+        entry = self.dirs.get(directory)
+        if entry is None or entry[0] != mtime_ns:
+            return None
+        return entry[1], entry[2]
+    
+    def listing(self, directory: str) -> Tuple[Optional[int], Listing]:
+        """List a directory, from the snapshot if its mtime is unchanged
+        
+        Args:
+            directory: Directory path
+        
+        Returns:
+            (mtime_ns, listing); mtime_ns is the directory mtime the listing
+            matches, or None if that mtime is too recent to rely on
+        """
+        mtime_ns = dir_mtime(directory)
+        listing = self.get(directory, mtime_ns)
+        if listing is None:
+            listing = scan_directory(directory)
+            self.put(directory, mtime_ns, listing)
+        return mtime_ns, listing
+    
+    def put(self, directory: str, mtime_ns: Optional[int], listing: Listing) -> None:
+        """Record the listing of a directory
+        
+        Args:
+            directory: Directory path
+            mtime_ns: mtime of the directory when it was listed
+            listing: (subdirectory names, note names), both sorted
+        """
+        entry = (mtime_ns, listing[0], listing[1])
+        with self._lock:
+            if self.dirs.get(directory) != entry:
+                self.dirs[directory] = entry
+                self.dirty = True
+    
+    def revalidate(self) -> List[str]:
+        """Bring the snapshot in sync with the notes directory
+        
+        Every folder is checked with a single stat; only folders whose
+        mtime changed are read again. Folders are checked on `workers`
+        threads at once.
+        
+        Returns:
+            Directories in the snapshot whose listing changed
+        """
+        changed = []
+        seen = set()
+        now = time.time_ns()
+        
+        def check(directory: str) -> List[str]:
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                # Removed since its parent was listed
+                return []
+            if now - mtime_ns < MTIME_GRACE_NS:
+                mtime_ns = None
+            seen.add(directory)
+            listing = self.get(directory, mtime_ns)
+            if listing is None:
+                listing = scan_directory(directory)
+                entry = self.dirs.get(directory)
+                if entry is not None and (entry[1], entry[2]) != listing:
+                    changed.append(directory)
+                self.put(directory, mtime_ns, listing)
+            return [os.path.join(directory, name) for name in listing[0]]
+        
+        walk_tree([str(self.root_dir)], check, self.workers)
+        
+        with self._lock:
+            for directory in [d for d in self.dirs if d not in seen]:
+                del self.dirs[directory]
+                self.dirty = True
+        return changed
+    
+    def __len__(self) -> int:
+        """Number of directories in the snapshot"""
+        return len(self.dirs)
@@ -0,0 +1,434 @@
+"""
+Filesystem watching for notes changed outside the app
+"""
+
+import ctypes
+import ctypes.util
+from abc import ABC, abstractmethod
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+# Event kinds
+CREATED = 'created'
+MODIFIED = 'modified'
+DELETED = 'deleted'
+MOVED = 'moved'
+# Events were lost; everything must be rescanned
+RESCAN = 'rescan'
+
+# Longest a burst of events (e.g. a git pull) may delay a batch, in debounce periods
+MAX_BATCH_PERIODS = 5
+
+# Shortest debounce in seconds, so reading events always blocks for a while
+# and a steady stream of changes cannot spin the watcher thread
+MIN_DEBOUNCE = 0.05
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR)
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class FileEvent(NamedTuple):
+    """A change to a note or folder"""
+    kind: str
+    path: Path
+    is_dir: bool = False
+    # Destination of a move
+    dest: Optional[Path] = None
+
+
+def is_watched_name(name: str) -> bool:
+    """Check whether a file or folder name is shown in the tree"""
+    # Hidden entries are skipped except .config, like the tree view
+    return not name.startswith('.') or name == '.config'
+
+
+def coalesce(events: List[FileEvent]) -> List[FileEvent]:
+    """Merge a burst of events into the net change per path
+    
+    A note created and then written is reported once as created, one
+    created and deleted again is dropped, and one deleted and re-created
+    (as editors do when saving) is reported as modified.
+    
+    Args:
+        events: Events in the order they happened
+    
+    Returns:
+        Net events, in the order each path first changed
+    """
+    merged: Dict[Tuple, FileEvent] = {}
+    for event in events:
+        if event.kind in (MOVED, RESCAN):
+            merged[(event.kind, event.path, event.dest)] = event
+            continue
+        key = (None, event.path)
+        previous = merged.get(key)
+        if previous is None:
+            merged[key] = event
+        elif event.kind == DELETED:
+            if previous.kind == CREATED:
+                del merged[key]
+            else:
+                merged[key] = event
+        elif previous.kind == DELETED:
+            merged[key] = event._replace(kind=MODIFIED)
+        elif event.kind == CREATED:
+            merged[key] = event
+    return list(merged.values())
+
+
+class Watcher(ABC):
+    """Base class for watchers reporting debounced batches of events
+    
+    Subclasses implement _read_events(), and _setup() and _teardown() when
+    they hold resources; the batching thread lives here.
+    """
+    
+    def __init__(self, root_dir: Path, callback: Callable[[List[FileEvent]], None],
+                 debounce: float = 1.0):
+        """Initialize the watcher
+        
+        Args:
+            root_dir: Root directory for notes
+            callback: Called from the watcher thread with each batch
+            debounce: Quiet time in seconds before a batch is reported,
+                      at least MIN_DEBOUNCE
+        """
+        self.root_dir = Path(root_dir)
+        self.callback = callback
+        self.debounce = max(MIN_DEBOUNCE, debounce)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> None:
+        """Start watching on a background thread
+        
+        Raises:
+            OSError: If the watch cannot be set up
+        """
+        self._setup()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='notes-watcher', daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop watching and wait for the thread to finish"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self._teardown()
+    
+    def _run(self) -> None:
+        """Collect events and report them once they settle"""
+        pending: List[FileEvent] = []
+        first = last = 0.0
+        while not self._stop.is_set():
+            events = self._read_events(self.debounce if pending else 0.5)
+            now = time.monotonic()
+            if events:
+                if not pending:
+                    first = now
+                pending.extend(events)
+                last = now
+            if pending and (now - last >= self.debounce
+                            or now - first >= self.debounce * MAX_BATCH_PERIODS):
+                batch = coalesce(pending)
+                pending = []
+                if batch:
+                    try:
+                        self.callback(batch)
+                    except Exception:
+                        # A failing consumer must not stop the watcher
+                        pass
+    
+    def _setup(self) -> None:
+        """Prepare the watch before the thread starts"""
+    
+    def _teardown(self) -> None:
+        """Release resources after the thread stopped"""
+    
+    @abstractmethod
+    def _read_events(self, timeout: float) -> List[FileEvent]:
+        """Wait up to timeout seconds and return the events that arrived"""
+
+
+class PollingWatcher(Watcher):
+    """Portable watcher comparing periodic snapshots of the notes tree"""
+    
+    def __init__(self, root_dir: Path, callback: Callable[[List[FileEvent]], None],
+                 debounce: float = 1.0, interval: float = 2.0):
+        """Initialize the watcher
+        
+        Args:
+            root_dir: Root directory for notes
+            callback: Called from the watcher thread with each batch
+            debounce: Quiet time in seconds before a batch is reported
+            interval: Seconds between snapshots
+        """
+        super().__init__(root_dir, callback, debounce)
+        self.interval = interval
+        self._snapshot: Dict[str, Tuple[bool, int, int]] = {}
+        self._next_poll = 0.0
+    
+    def _setup(self) -> None:
+        """Take the initial snapshot"""
+        self._snapshot = self._scan()
+        self._next_poll = time.monotonic() + self.interval
+    
+    def _scan(self) -> Dict[str, Tuple[bool, int, int]]:
+        """Map every folder and note to (is_dir, mtime_ns, size)"""
+        snapshot = {}
+        stack = [str(self.root_dir)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if not is_watched_name(entry.name):
+                            continue
+                        try:
+                            is_dir = entry.is_dir()
+                            if not is_dir and not entry.name.endswith('.md'):
+                                continue
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        snapshot[entry.path] = (is_dir, st.st_mtime_ns, st.st_size)
+                        if is_dir:
+                            stack.append(entry.path)
+            except OSError:
+                continue
+        return snapshot
+    
+    def _read_events(self, timeout: float) -> List[FileEvent]:
+        """Compare a new snapshot with the previous one when due"""
+        wait = self._next_poll - time.monotonic()
+        if wait > 0:
+            self._stop.wait(min(wait, timeout))
+            if time.monotonic() < self._next_poll:
+                return []
+        self._next_poll = time.monotonic() + self.interval
+        
+        snapshot = self._scan()
+        old = self._snapshot
+        self._snapshot = snapshot
+        events = []
+        for path, (is_dir, mtime_ns, size) in snapshot.items():
+            previous = old.get(path)
+            if previous is None:
+                events.append(FileEvent(CREATED, Path(path), is_dir))
+            elif previous[0] != is_dir:
+                events.append(FileEvent(DELETED, Path(path), previous[0]))
+                events.append(FileEvent(CREATED, Path(path), is_dir))
+            elif not is_dir and previous[1:] != (mtime_ns, size):
+                events.append(FileEvent(MODIFIED, Path(path)))
+        for path, (is_dir, _, _) in old.items():
+            if path not in snapshot:
+                events.append(FileEvent(DELETED, Path(path), is_dir))
+        return events
+
+
+class InotifyWatcher(Watcher):
+    """Linux watcher reading precise events from inotify"""
+    
+    def __init__(self, root_dir: Path, callback: Callable[[List[FileEvent]], None],
+                 debounce: float = 1.0):
+        """Initialize the watcher
+        
+        Args:
+            root_dir: Root directory for notes
+            callback: Called from the watcher thread with each batch
+            debounce: Quiet time in seconds before a batch is reported
+        """
+        super().__init__(root_dir, callback, debounce)
+        self._libc = None
+        self._fd = -1
+        # watch descriptor -> watched directory
+        self._watches: Dict[int, str] = {}
+    
+    @staticmethod
+    def available() -> bool:
+        """Check whether inotify can be used on this system"""
+        if not sys.platform.startswith('linux'):
+            return False
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        return hasattr(libc, 'inotify_init1')
+    
+    def _setup(self) -> None:
+        """Open an inotify instance and watch every folder"""
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        try:
+            self._add_tree(str(self.root_dir), strict=True)
+        except OSError:
+            self._teardown()
+            raise
+    
+    def _teardown(self) -> None:
+        """Close the inotify instance"""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._watches = {}
+    
+    def _add_tree(self, directory: str, strict: bool = False) -> List[FileEvent]:
+        """Watch a directory and every folder below it
+        
+        Args:
+            directory: Directory to watch
+            strict: Raise if any folder cannot be watched, e.g. because the
+                    system's watch limit is reached; otherwise such folders
+                    are silently skipped
+        
+        Returns:
+            Created events for everything found below the directory, which
+            may have appeared before its watch existed
+        """
+        found = []
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(current), WATCH_MASK)
+            if wd < 0:
+                if strict:
+                    errno = ctypes.get_errno()
+                    raise OSError(errno, os.strerror(errno), current)
+                continue
+            self._watches[wd] = current
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if not is_watched_name(entry.name):
+                            continue
+                        try:
+                            is_dir = entry.is_dir(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        if is_dir:
+                            stack.append(entry.path)
+                            found.append(FileEvent(CREATED, Path(entry.path), True))
+                        elif entry.name.endswith('.md'):
+                            found.append(FileEvent(CREATED, Path(entry.path)))
+            except OSError:
+                continue
+        return found
+    
+    def _read_events(self, timeout: float) -> List[FileEvent]:
+        """Read and translate the events that arrive within timeout"""
+        # Wake up regularly so stop() is noticed
+        ready, _, _ = select.select([self._fd], [], [], min(timeout, 0.5))
+        if not ready:
+            return []
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return []
+        
+        events = []
+        moved_from: Dict[int, Tuple[str, bool]] = {}
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            
+            if mask & IN_Q_OVERFLOW:
+                events.append(FileEvent(RESCAN, self.root_dir, True))
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None or mask & IN_DELETE_SELF or not name:
+                continue
+            
+            is_dir = bool(mask & IN_ISDIR)
+            if not is_watched_name(name) or (not is_dir and not name.endswith('.md')):
+                continue
+            path = os.path.join(directory, name)
+            
+            if mask & IN_MOVED_FROM:
+                moved_from[cookie] = (path, is_dir)
+            elif mask & IN_MOVED_TO:
+                source = moved_from.pop(cookie, None)
+                if source is None:
+                    events.append(FileEvent(CREATED, Path(path), is_dir))
+                    if is_dir:
+                        events.extend(self._add_tree(path))
+                else:
+                    events.append(FileEvent(MOVED, Path(source[0]), is_dir, Path(path)))
+                    if is_dir:
+                        self._rename_watches(source[0], path)
+            elif mask & IN_CREATE:
+                events.append(FileEvent(CREATED, Path(path), is_dir))
+                if is_dir:
+                    events.extend(self._add_tree(path))
+            elif mask & IN_DELETE:
+                events.append(FileEvent(DELETED, Path(path), is_dir))
+            elif mask & (IN_MODIFY | IN_CLOSE_WRITE) and not is_dir:
+                events.append(FileEvent(MODIFIED, Path(path)))
+        
+        # Moved out of the notes tree
+        for path, is_dir in moved_from.values():
+            events.append(FileEvent(DELETED, Path(path), is_dir))
+        return events
+    
+    def _rename_watches(self, source: str, dest: str) -> None:
+        """Follow a folder moved within the tree; its watches stay valid"""
+        prefix = source + os.sep
+        for wd, directory in self._watches.items():
+            if directory == source:
+                self._watches[wd] = dest
+            elif directory.startswith(prefix):
+                self._watches[wd] = dest + directory[len(source):]
+
+
+def create_watcher(root_dir: Path, callback: Callable[[List[FileEvent]], None],
+                   debounce: float = 1.0, poll_interval: float = 2.0) -> Watcher:
+    """Start the best available watcher for a notes directory
+    
+    Uses inotify on Linux and falls back to polling elsewhere, or when
+    inotify is unavailable or out of watches.
+    
+    Args:
+        root_dir: Root directory for notes
+        callback: Called from the watcher thread with each batch of events
+        debounce: Quiet time in seconds before a batch is reported
+        poll_interval: Seconds between snapshots when polling
+    
+    Returns:
+        The started watcher
+    """
+    if InotifyWatcher.available():
+        watcher = InotifyWatcher(root_dir, callback, debounce)
+        try:
+            watcher.start()
+            return watcher
+        except OSError:
+            pass
+    watcher = PollingWatcher(root_dir, callback, debounce, poll_interval)
+    watcher.start()
+    return watcher
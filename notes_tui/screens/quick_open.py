@@ -0,0 +1,165 @@
+"""
+Quick open screen for jumping to a note by fuzzy path
+"""
+
+from pathlib import Path
+from typing import List, Optional
+from textual import work
+from textual.app import ComposeResult
+from textual.screen import ModalScreen
+from textual.containers import Container
+from textual.widgets import Label, Input, OptionList
+from textual.widgets.option_list import Option
+from textual.binding import Binding
+from textual.message import Message
+from textual.worker import get_current_worker
+
+from notes_tui.core.fuzzy import PathFinder
+
+
+class QuickOpenScreen(ModalScreen[Optional[Path]]):
+    """Modal screen that fuzzy-matches note paths as the user types"""
+    
+    CSS = """
+    QuickOpenScreen {
+        align: center top;
+    }
+    
+    #quick-open-container {
+        width: 70%;
+        height: 60%;
+        margin-top: 2;
+        border: thick $background 80%;
+        background: $surface;
+        padding: 1;
+    }
+    
+    #quick-open-input {
+        width: 100%;
+        margin-bottom: 1;
+    }
+    
+    #quick-open-results {
+        height: 1fr;
+        border: solid $primary;
+    }
+    """
+    
+    BINDINGS = [
+        Binding("escape", "cancel", "Cancel", show=True),
+        Binding("down", "cursor_down", "Next", show=False),
+        Binding("up", "cursor_up", "Previous", show=False),
+    ]
+    
+    class MatchesFound(Message):
+        """Message posted from the matching worker with the best paths"""
+        
+        def __init__(self, find_id: int, matches: List[str]) -> None:
+            """Initialize the message
+            
+            Args:
+                find_id: Id of the lookup that produced the matches
+                matches: Matching paths, best first
+            """
+            super().__init__()
+            self.find_id = find_id
+            self.matches = matches
+    
+    def __init__(self, path_finder: PathFinder, root_dir: Path, limit: int = 50, **kwargs):
+        """Initialize the quick open screen
+        
+        Args:
+            path_finder: Fuzzy finder over note paths
+            root_dir: Root directory the paths are relative to
+            limit: Maximum number of results to show
+        """
+        super().__init__(**kwargs)
+        self.path_finder = path_finder
+        self.root_dir = root_dir
+        self.limit = limit
+        self.matches: List[str] = []
+        # Incremented per lookup so matches for superseded queries are ignored
+        self.find_id = 0
+    
+    def compose(self) -> ComposeResult:
+        """Create child widgets"""
+        with Container(id="quick-open-container"):
+            yield Input(placeholder="Open note...", id="quick-open-input")
+            yield OptionList(id="quick-open-results")
+    
+    def on_mount(self) -> None:
+        """Focus the input and list the first notes"""
+        self.query_one("#quick-open-input", Input).focus()
+        self._show("")
+    
+    def set_path_finder(self, path_finder: PathFinder) -> None:
+        """Switch to an up-to-date finder, keeping the typed query
+        
+        Args:
+            path_finder: Fuzzy finder over the current note paths
+        """
+        if not self.is_attached:
+            # Closed before the finder was ready
+            return
+        self.path_finder = path_finder
+        self._show(self.query_one("#quick-open-input", Input).value)
+    
+    def on_input_changed(self, event: Input.Changed) -> None:
+        """Rescore paths on every keystroke"""
+        self._show(event.value)
+    
+    def _show(self, query: str) -> None:
+        """Start looking up the matches for a query"""
+        self.find_id += 1
+        self.find_matches(query, self.path_finder, self.find_id)
+    
+    @work(exclusive=True, thread=True, group="find")
+    def find_matches(self, query: str, path_finder: PathFinder, find_id: int) -> None:
+        """Score paths on a worker thread so typing never waits for it
+        
+        Args:
+            query: Typed query
+            path_finder: Finder to score the paths with
+            find_id: Id of this lookup
+        """
+        matches = [path for path, _ in path_finder.find(query, self.limit)]
+        if not get_current_worker().is_cancelled:
+            self.post_message(self.MatchesFound(find_id, matches))
+    
+    def on_quick_open_screen_matches_found(self, event: MatchesFound) -> None:
+        """Replace the result list with the matches of the latest lookup"""
+        if event.find_id != self.find_id:
+            return
+        
+        self.matches = event.matches
+        results = self.query_one("#quick-open-results", OptionList)
+        results.clear_options()
+        results.add_options([Option(path) for path in self.matches])
+        if self.matches:
+            results.highlighted = 0
+    
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        """Open the highlighted match"""
+        highlighted = self.query_one("#quick-open-results", OptionList).highlighted
+        if highlighted is not None and highlighted < len(self.matches):
+            self._open(self.matches[highlighted])
+    
+    def on_option_list_option_selected(self, event: OptionList.OptionSelected) -> None:
+        """Open a clicked match"""
+        self._open(self.matches[event.option_index])
+    
+    def _open(self, path: str) -> None:
+        """Dismiss with the absolute path of a note"""
+        self.dismiss(self.root_dir / f"{path}.md")
+    
+    def action_cursor_down(self) -> None:
+        """Action: Highlight the next match"""
+        self.query_one("#quick-open-results", OptionList).action_cursor_down()
+    
+    def action_cursor_up(self) -> None:
+        """Action: Highlight the previous match"""
+        self.query_one("#quick-open-results", OptionList).action_cursor_up()
+    
+    def action_cancel(self) -> None:
+        """Action: Close the quick open screen"""
+        self.dismiss(None)
@@ -0,0 +1,291 @@
+"""
+Search screen for finding notes by content
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+from textual import work
+from textual.app import ComposeResult
+from textual.screen import ModalScreen
+from textual.containers import Container
+from textual.widgets import Label, Input, OptionList, Static
+from textual.widgets.option_list import Option
+from textual.binding import Binding
+from textual.message import Message
+from textual.worker import get_current_worker
+from rich.text import Text
+
+from notes_tui.core.search import Search
+
+
+class SearchScreen(ModalScreen[Optional[Path]]):
+    """Modal screen that streams search results while the user types"""
+    
+    CSS = """
+    SearchScreen {
+        align: center middle;
+    }
+    
+    #search-container {
+        width: 80%;
+        height: 80%;
+        border: thick $background 80%;
+        background: $surface;
+        padding: 1;
+    }
+    
+    #search-title {
+        width: 100%;
+        content-align: center middle;
+        text-style: bold;
+        background: $primary;
+        color: $text;
+        padding: 1;
+    }
+    
+    #search-input {
+        width: 100%;
+        margin: 1 0;
+    }
+    
+    #search-results {
+        height: 1fr;
+        border: solid $primary;
+    }
+    
+    #search-context {
+        height: auto;
+        max-height: 12;
+        padding: 0 1;
+    }
+    
+    #search-status {
+        width: 100%;
+        color: $text-muted;
+    }
+    """
+    
+    BINDINGS = [
+        Binding("escape", "cancel", "Cancel", show=True),
+        Binding("down", "focus_results", "Results", show=False),
+    ]
+    
+    class ResultFound(Message):
+        """Message posted from the search worker for each matching note"""
+        
+        def __init__(self, search_id: int, result: Dict) -> None:
+            """Initialize the message
+            
+            Args:
+                search_id: Id of the search that produced the result
+                result: Search result dictionary
+            """
+            super().__init__()
+            self.search_id = search_id
+            self.result = result
+    
+    class SearchFinished(Message):
+        """Message posted from the search worker when a scan completes"""
+        
+        def __init__(self, search_id: int, results: List[Dict]) -> None:
+            """Initialize the message
+            
+            Args:
+                search_id: Id of the search that finished
+                results: Final results, most relevant first
+            """
+            super().__init__()
+            self.search_id = search_id
+            self.results = results
+    
+    class SnippetsLoaded(Message):
+        """Message posted from the snippet worker with the text around a result's hits"""
+        
+        def __init__(self, result: Dict, context: Text) -> None:
+            """Initialize the message
+            
+            Args:
+                result: Result the snippets belong to
+                context: Rendered lines around the hits
+            """
+            super().__init__()
+            self.result = result
+            self.context = context
+    
+    def __init__(self, search: Search, **kwargs):
+        """Initialize the search screen
+        
+        Args:
+            search: Search instance used to run queries
+        """
+        super().__init__(**kwargs)
+        self.search = search
+        self.results: List[Dict] = []
+        # Incremented per query so results from superseded scans are ignored
+        self.search_id = 0
+    
+    def compose(self) -> ComposeResult:
+        """Create child widgets"""
+        with Container(id="search-container"):
+            yield Label("Search Notes", id="search-title")
+            yield Input(
+                placeholder='Type to search... ("phrase", /regex/, AND, OR, NOT, tag:x, status:x)',
+                id="search-input"
+            )
+            yield OptionList(id="search-results")
+            yield Static("", id="search-context")
+            yield Label("", id="search-status")
+    
+    def on_mount(self) -> None:
+        """Focus the input when mounted"""
+        self.query_one("#search-input", Input).focus()
+    
+    def on_input_changed(self, event: Input.Changed) -> None:
+        """Restart the search on every keystroke"""
+        self.search_id += 1
+        self.results = []
+        self.query_one("#search-results", OptionList).clear_options()
+        self.query_one("#search-context", Static).update("")
+        
+        query = event.value.strip()
+        if not query:
+            self.workers.cancel_group(self, "search")
+            self._set_status("")
+            return
+        
+        self._set_status("Searching...")
+        self.run_search(query, self.search_id)
+    
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        """Open the first result when Enter is pressed in the input"""
+        if self.results:
+            self.dismiss(self.results[0]['file'])
+    
+    @work(exclusive=True, thread=True, group="search")
+    def run_search(self, query: str, search_id: int) -> None:
+        """Scan notes on a worker thread, streaming results back
+        
+        Starting a new search cancels this worker; it stops before reading
+        the next note, also while looking up the best results again.
+        
+        Args:
+            query: Search query
+            search_id: Id of this search
+        """
+        worker = get_current_worker()
+        results = []
+        for result in self.search.iter_search(query, cancelled=lambda: worker.is_cancelled):
+            if worker.is_cancelled:
+                return
+            results.append(result)
+            self.post_message(self.ResultFound(search_id, result))
+        if worker.is_cancelled:
+            return
+        
+        # Results stream in path order; once they are all in, rank them. A
+        # stream cut off at max_results holds the first matches found, not
+        # the best ones, so those are looked up again.
+        if self.search.max_results and len(results) >= self.search.max_results:
+            results = self.search.search(query, cancelled=lambda: worker.is_cancelled)
+        else:
+            results = self.search.rank(results)
+        if not worker.is_cancelled:
+            self.post_message(self.SearchFinished(search_id, results))
+    
+    def on_search_screen_result_found(self, event: ResultFound) -> None:
+        """Append a streamed result to the list"""
+        if event.search_id != self.search_id:
+            return
+        
+        self.results.append(event.result)
+        self.query_one("#search-results", OptionList).add_option(self._option(event.result))
+        self._set_status(f"Searching... {len(self.results)} notes found")
+        
+    def on_search_screen_search_finished(self, event: SearchFinished) -> None:
+        """Replace the streamed results by the ranked ones"""
+        if event.search_id != self.search_id:
+            return
+        
+        option_list = self.query_one("#search-results", OptionList)
+        highlighted = option_list.highlighted
+        current = self.results[highlighted]['file'] if highlighted is not None else None
+        self.results = event.results
+        option_list.clear_options()
+        option_list.add_options([self._option(result) for result in self.results])
+        if current is not None:
+            # Keep the result the user was looking at under the cursor
+            files = [result['file'] for result in self.results]
+            option_list.highlighted = files.index(current) if current in files else 0
+        
+        if self.search.max_results and len(self.results) >= self.search.max_results:
+            self._set_status(f"Showing the {len(self.results)} best matching notes")
+        else:
+            self._set_status(f"{len(self.results)} notes found")
+    
+    @staticmethod
+    def _option(result: Dict) -> Option:
+        """Build the list entry for a result"""
+        label = Text(str(result['relative_path']), style="bold")
+        if result['matches']:
+            label.append(f"  ({result['matches']})", style="dim")
+        return Option(label)
+    
+    def on_option_list_option_highlighted(self, event: OptionList.OptionHighlighted) -> None:
+        """Show the lines around the hits of the highlighted result"""
+        if event.option_index >= len(self.results):
+            return
+        
+        # Snippets are only extracted for the result being looked at
+        self.query_one("#search-context", Static).update("")
+        self.load_snippets(self.results[event.option_index])
+    
+    @work(exclusive=True, thread=True, group="snippets")
+    def load_snippets(self, result: Dict) -> None:
+        """Read the lines around the hits of a result on a worker thread
+        
+        Highlighting another result cancels this worker.
+        
+        Args:
+            result: Result dictionary to extract snippets for
+        """
+        worker = get_current_worker()
+        windows = self.search.snippets(result, context=1)
+        if worker.is_cancelled:
+            return
+        
+        context = Text()
+        for window in windows:
+            if context:
+                context.append("...\n", style="dim")
+            for line_no, line in window:
+                context.append(f"{line_no:>5}: ", style="dim")
+                context.append(f"{line}\n")
+        self.post_message(self.SnippetsLoaded(result, context))
+    
+    def on_search_screen_snippets_loaded(self, event: SnippetsLoaded) -> None:
+        """Show snippets unless another result was highlighted meanwhile"""
+        highlighted = self.query_one("#search-results", OptionList).highlighted
+        if (highlighted is not None and highlighted < len(self.results)
+                and self.results[highlighted] is event.result):
+            self.query_one("#search-context", Static).update(event.context)
+    
+    def on_option_list_option_selected(self, event: OptionList.OptionSelected) -> None:
+        """Open the selected result"""
+        self.dismiss(self.results[event.option_index]['file'])
+    
+    def _set_status(self, message: str) -> None:
+        """Update the status line under the results"""
+        self.query_one("#search-status", Label).update(message)
+    
+    def action_focus_results(self) -> None:
+        """Action: Move focus from the input to the result list"""
+        results = self.query_one("#search-results", OptionList)
+        if results.highlighted is None and self.results:
+            results.highlighted = 0
+        results.focus()
+    
+    def action_cancel(self) -> None:
+        """Action: Close the search screen"""
+        self.workers.cancel_group(self, "search")
+        self.workers.cancel_group(self, "snippets")
+        self.dismiss(None)
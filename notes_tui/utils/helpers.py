@@ -3,7 +3,9 @@ Utility helper functions
 """
 
 from pathlib import Path
-from typing import List
+from typing import List, Optional
+
+from notes_tui.core.catalog import NoteCatalog
 
 
 def get_relative_path(file_path: Path, base_path: Path) -> str:
@@ -38,13 +40,18 @@ def format_file_size(bytes: int) -> str:
     return f"{bytes:.1f} TB"
 
 
-def get_file_count(directory: Path) -> int:
+def get_file_count(directory: Path, catalog: Optional[NoteCatalog] = None) -> int:
     """Count markdown files in directory
     
     Args:
         directory: Directory to count files in
+        catalog: Catalog of a notes tree containing directory; the
+                 directory is walked for a new one if None
         
     Returns:
         Number of markdown files
     """
-    return len(list(directory.rglob('*.md')))
+    if catalog is None:
+        catalog = NoteCatalog(directory)
+    catalog.ensure_fresh()
+    return len(catalog.note_paths(directory))
@@ -2,31 +2,381 @@
 Note preview widget for displaying note content
 """
 
+import os
+import re
+import threading
+from bisect import bisect_right
+from itertools import accumulate
 from pathlib import Path
-from typing import Optional
-from textual.widgets import Static
-from textual.containers import ScrollableContainer
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from textual import work
+from textual.app import ComposeResult
+from textual.events import Resize
+from textual.geometry import Size
+from textual.message import Message
+from textual.strip import Strip
+from textual.widget import Widget
+from textual.worker import Worker, get_current_worker
+from textual.containers import VerticalScroll
+from rich.console import Console, RenderableType
 from rich.markdown import Markdown
 from rich.text import Text
 
+from notes_tui.core.render_cache import RenderCache
 
-class NotePreview(Static):
-    """Widget for previewing markdown notes"""
+
+# Pygments theme used for code blocks
+CODE_THEME = "monokai"
+
+# Characters per chunk when a large note is rendered a window at a time
+CHUNK_CHARS = 2 * 1024
+
+# Markers opening and closing fenced code blocks
+FENCES = ('```', '~~~')
+FENCE = re.compile(r'^(```|~~~)', re.MULTILINE)
+
+# (path, mtime_ns, size, width, theme) of a note as rendered
+NoteKey = Tuple[str, int, int, int, str]
+
+
+def render_lines(renderable: RenderableType, width: int) -> List[Strip]:
+    """Render a Rich renderable into lines of a fixed width
+    
+    A console of its own is used for every call, so notes can be rendered
+    on worker threads.
+    
+    Args:
+        renderable: Markdown or text to render
+        width: Width in cells
+    
+    Returns:
+        One strip per line
+    """
+    console = Console(
+        width=width, color_system="truecolor", force_terminal=True,
+        legacy_windows=False, markup=False, emoji=False, highlight=False
+    )
+    return [Strip(line) for line in console.render_lines(renderable, console.options, pad=False)]
+
+
+def _fence_after(content: str, start: int, end: int, fence: Optional[str]) -> Optional[str]:
+    """Track fenced code blocks over a span of Markdown
+    
+    Fences are recognised at the start of a line. Spans using only one
+    kind of fence are handled by counting them; only spans mixing ``` and
+    ~~~ are walked fence by fence.
+    
+    Args:
+        content: Markdown source
+        start: Start of the span, at the beginning of a line
+        end: End of the span
+        fence: Marker of the code block open at start, if any
+    
+    Returns:
+        Marker of the code block still open at end, if any
+    """
+    counts = {
+        marker: content.count('\n' + marker, max(start - 1, 0), end)
+        + (start == 0 and content.startswith(marker))
+        for marker in FENCES
+    }
+    if not all(counts.values()):
+        marker = max(counts, key=counts.get)
+        if fence is not None and fence != marker:
+            # Fences of the other kind are literal text inside the block
+            return fence
+        return fence if counts[marker] % 2 == 0 else (None if fence else marker)
+    
+    for match in FENCE.finditer(content, start, end):
+        if fence is None:
+            fence = match.group(1)
+        elif match.group(1) == fence:
+            fence = None
+    return fence
+
+
+def split_markdown(content: str, chunk_chars: int = CHUNK_CHARS) -> List[str]:
+    """Split Markdown into chunks of whole blocks
+    
+    A chunk ends at the first blank line outside a fenced code block after
+    chunk_chars characters. Text without such a break, like a log or a
+    long code block, is cut at a line end after four times as many; a code
+    block cut this way is closed and reopened so both halves render as
+    code. Cut points are found with str.find and str.count, so splitting
+    costs little next to rendering even for notes of many megabytes.
+    
+    Args:
+        content: Markdown source
+        chunk_chars: Number of characters after which a chunk may end
+    
+    Returns:
+        Chunks that join back into the content, apart from added fences
+    """
+    chunks = []
+    length = len(content)
+    start = 0
+    fence = None
+    opener = ''
+    reopen = ''
+    while start < length:
+        limit = start + 4 * chunk_chars
+        scanned = start
+        cut = -1
+        blank = content.find('\n\n', start + chunk_chars)
+        while blank != -1 and blank < limit:
+            fence = _fence_after(content, scanned, blank + 1, fence)
+            scanned = blank + 1
+            if fence is None:
+                cut = blank + 2
+                break
+            blank = content.find('\n\n', blank + 2)
+        if cut == -1:
+            if length <= limit:
+                cut = length
+            else:
+                cut = content.find('\n', limit) + 1 or length
+            fence = _fence_after(content, scanned, cut, fence)
+        
+        chunk = reopen + content[start:cut]
+        reopen = ''
+        if fence is not None and cut < length:
+            # Reopen with the line that opened the block, info string included
+            line_start = content.rfind('\n' + fence, start, cut) + 1
+            if line_start or content.startswith(fence, start):
+                opener = content[line_start:content.find('\n', line_start) + 1]
+            reopen = opener or f"{fence}\n"
+            chunk += f"{fence}\n"
+        chunks.append(chunk)
+        start = cut
+    return chunks
+
+
+def note_key(note_path: Path, width: int, theme: str) -> NoteKey:
+    """Get the key a note is cached under at its current mtime and size
+    
+    Args:
+        note_path: Path to the note file
+        width: Width the note is rendered at
+        theme: Styles the note is rendered with
+    
+    Returns:
+        Key of the note
+    
+    Raises:
+        OSError: If the note cannot be stat'ed
+    """
+    st = os.stat(note_path)
+    return (str(note_path), st.st_mtime_ns, st.st_size, width, theme)
+
+
+def estimate_size(content: str, lines: List[Strip]) -> int:
+    """Estimate the memory used by a rendered note
+    
+    Args:
+        content: Markdown source of the note
+        lines: Rendered lines
+    
+    Returns:
+        Approximate size in bytes, counting each segment's text and a fixed
+        overhead for the segment itself
+    """
+    return len(content) + sum(len(segment.text) + 100 for line in lines for segment in line)
+
+
+class NoteLines(Widget):
+    """Lines of a rendered note
+    
+    The note is held as chunks of lines rendered once, off the UI thread,
+    so repaints, scrolling and focus changes only copy strips. A chunk that
+    is not rendered yet takes up its estimated height and asks for
+    rendering once any of its lines is painted.
+    """
+    
+    class ChunksNeeded(Message):
+        """Message emitted when unrendered chunks scroll into view"""
+        
+        def __init__(self, indices: List[int]) -> None:
+            """Initialize the message
+            
+            Args:
+                indices: Chunks to render
+            """
+            super().__init__()
+            self.indices = indices
+    
+    DEFAULT_CSS = """
+    NoteLines {
+        height: auto;
+    }
+    """
+    
+    def __init__(self, **kwargs):
+        """Initialize the widget
+        
+        Args:
+            **kwargs: Additional widget arguments
+        """
+        super().__init__(**kwargs)
+        # Rendered lines of each chunk, None until rendered
+        self.chunks: List[Optional[List[Strip]]] = []
+        # Height of each chunk, estimated for chunks not rendered yet
+        self.heights: List[int] = []
+        # First line of each chunk, followed by the total height
+        self.offsets: List[int] = [0]
+        self._wanted: Set[int] = set()
+    
+    def set_lines(self, lines: List[Strip]) -> None:
+        """Show lines rendered as a whole
+        
+        Args:
+            lines: Rendered lines
+        """
+        self.set_chunks([len(lines)], {0: lines})
+    
+    def set_chunks(self, heights: List[int], rendered: Dict[int, List[Strip]]) -> None:
+        """Show a note split into chunks
+        
+        Args:
+            heights: Estimated height of every chunk
+            rendered: Lines of the chunks rendered so far
+        """
+        self.chunks = [rendered.get(i) for i in range(len(heights))]
+        self.heights = [
+            height if lines is None else len(lines)
+            for height, lines in zip(heights, self.chunks)
+        ]
+        self.offsets = list(accumulate([0] + self.heights))
+        self._wanted.clear()
+        self.refresh(layout=True)
+    
+    def set_chunk(self, index: int, lines: List[Strip]) -> int:
+        """Fill in the lines of one chunk
+        
+        Args:
+            index: Chunk number
+            lines: Rendered lines of the chunk
+        
+        Returns:
+            How many lines the chunk grew by compared to its estimate
+        """
+        delta = len(lines) - self.heights[index]
+        self.chunks[index] = lines
+        self.heights[index] = len(lines)
+        if delta:
+            self.offsets = list(accumulate([0] + self.heights))
+            self.refresh(layout=True)
+        else:
+            self.refresh()
+        return delta
+    
+    def get_content_height(self, container: Size, viewport: Size, width: int) -> int:
+        """Height of the note in lines"""
+        return self.offsets[-1]
+    
+    def render_line(self, y: int) -> Strip:
+        """Get one line of the note
+        
+        Args:
+            y: Line number
+        
+        Returns:
+            The line, padded to the widget width; blank while its chunk is
+            being rendered
+        """
+        style = self.rich_style
+        index = bisect_right(self.offsets, y) - 1
+        if 0 <= index < len(self.chunks):
+            lines = self.chunks[index]
+            if lines is None:
+                if not self._wanted:
+                    self.call_later(self._request_chunks)
+                self._wanted.add(index)
+            elif y - self.offsets[index] < len(lines):
+                line = lines[y - self.offsets[index]]
+                return line.crop_extend(0, self.size.width, style).apply_style(style)
+        return Strip.blank(self.size.width, style)
+    
+    def _request_chunks(self) -> None:
+        """Ask for the chunks found missing while painting"""
+        if self._wanted:
+            self.post_message(self.ChunksNeeded(sorted(self._wanted)))
+            self._wanted.clear()
+
+
+class NotePreview(VerticalScroll):
+    """Widget for previewing markdown notes
+    
+    The rendered note is a child of the widget, so notes longer than the
+    pane can be scrolled. Notes are read and rendered on a worker thread;
+    loading another note before that finishes drops the stale work.
+    
+    Rendered notes are kept in an LRU cache keyed by path, mtime, size,
+    width and theme, so going back to a recently viewed note only costs a
+    stat.
+    
+    Notes larger than window_bytes are split into chunks of whole blocks.
+    Only the chunks filling the first screen are rendered before the note
+    is shown; the rest are rendered as they scroll into view, so the time
+    to first paint does not grow with the note.
+    
+    prefetch() renders the first screen of the notes the tree cursor is
+    heading towards into the same cache, up to prefetch_bytes of notes not
+    viewed yet, so stepping through a folder finds each note rendered.
+    """
+    
+    DEFAULT_CSS = """
+    NotePreview {
+        scrollbar-gutter: stable;
+    }
+    """
     
     # Make this widget focusable so Tab key can focus it
     can_focus = True
     
-    def __init__(self, **kwargs):
+    def __init__(self, cache_bytes: int = 32 * 1024 * 1024,
+                 window_bytes: int = 64 * 1024,
+                 prefetch_bytes: int = 8 * 1024 * 1024, **kwargs):
         """Initialize the note preview widget
         
         Args:
+            cache_bytes: Memory budget of the rendered note cache
+            window_bytes: Notes larger than this are rendered a window at a
+                          time (0 always renders whole notes)
+            prefetch_bytes: Memory budget of prefetched notes not viewed yet
+                            (0 disables prefetching)
             **kwargs: Additional widget arguments
         """
         super().__init__(**kwargs)
         self.current_note_content: Optional[str] = None
         self.current_note_path: Optional[Path] = None
+        self.render_cache = RenderCache(cache_bytes)
+        self.window_bytes = window_bytes
+        self.prefetch_bytes = prefetch_bytes
+        # Prefetched notes not viewed yet -> number of chunks rendered
+        self._prefetched: Dict[NoteKey, int] = {}
+        # Latest (notes, width, height, theme) to prefetch, whether the
+        # prefetch worker is running to pick them up, and the direction
+        # they were requested in
+        self._prefetch_targets: Optional[Tuple[List[Path], int, int, str]] = None
+        self._prefetch_running = False
+        self._prefetch_direction = 0
+        self._prefetch_lock = threading.Lock()
+        # Key and source chunks of the note shown, None for placeholders
+        self._note_key: Optional[NoteKey] = None
+        self._chunks: List[str] = []
+        # Chunks being rendered on workers
+        self._chunks_pending: Set[int] = set()
+        # Scroll offset to apply once the loading note is shown
+        self._pending_scroll: Optional[float] = None
+        # Width the shown lines were rendered at
+        self._rendered_width = 0
+        self._content = NoteLines()
+    
+    def compose(self) -> ComposeResult:
+        """Create the widget showing the note"""
+        yield self._content
     
-    def render(self) -> Text | Markdown:
+    def render_note(self) -> RenderableType:
         """Render the note content
         
         Returns:
@@ -40,7 +390,30 @@ class NotePreview(Static):
                 justify="center"
             )
         
-        return Markdown(self.current_note_content, code_theme="monokai")
+        return Markdown(self.current_note_content, code_theme=CODE_THEME)
+    
+    def _render_width(self) -> int:
+        """Width available to the rendered note"""
+        return self.scrollable_content_region.width
+    
+    def _theme(self) -> str:
+        """Name of the styles the note is rendered with"""
+        return f"{getattr(self.app, 'theme', '')}/{CODE_THEME}"
+    
+    def _show_renderable(self, renderable: Optional[RenderableType] = None) -> None:
+        """Render a placeholder or the current content on the UI thread
+        
+        Args:
+            renderable: What to show; the current content if None
+        """
+        width = self._render_width()
+        if width <= 0:
+            # Rendered by on_resize once the layout is known
+            return
+        self._rendered_width = width
+        self._note_key = None
+        self._chunks = []
+        self._content.set_lines(render_lines(renderable or self.render_note(), width))
     
     def set_note(self, content: str) -> None:
         """Set the note content to display
@@ -49,23 +422,298 @@ class NotePreview(Static):
             content: Markdown content to display
         """
         self.current_note_content = content
-        self.refresh()
+        self._show_renderable()
     
-    def load_note(self, note_path: Path) -> None:
+    def load_note(self, note_path: Path, scroll_y: Optional[float] = None) -> None:
         """Load and display a note from file
         
+        The file is read and rendered on a worker thread. A different note
+        shows a loading placeholder until then and starts at the top;
+        reloading the same note keeps its content and scroll position
+        meanwhile, as well as a scroll offset still to be restored.
+        
         Args:
             note_path: Path to the note file
+            scroll_y: Scroll offset to restore once the note is shown
         """
-        try:
+        if note_path != self.current_note_path:
             self.current_note_path = note_path
-            content = note_path.read_text(encoding='utf-8')
-            self.set_note(content)
+            self.current_note_content = None
+            self.workers.cancel_group(self, "preview-chunks")
+            self._show_renderable(Text(f"Loading {note_path.name}…", style="dim italic"))
+            self.scroll_home(animate=False)
+            self._pending_scroll = scroll_y
+        elif scroll_y is not None:
+            self._pending_scroll = scroll_y
+        self._load_rendered(note_path)
+    
+    def _load_rendered(self, note_path: Path) -> None:
+        """Start reading and rendering a note at the current size"""
+        region = self.scrollable_content_region
+        if region.width > 0:
+            self._read_note(note_path, region.width, region.height, self._theme())
+    
+    def _render_chunk(self, key: NoteKey, index: int, source: str) -> List[Strip]:
+        """Render one chunk of a note, or get it from the cache
+        
+        Args:
+            key: Note the chunk belongs to
+            index: Chunk number
+            source: Markdown of the chunk
+        
+        Returns:
+            Rendered lines of the chunk
+        """
+        cached = self.render_cache.get(key + (index,))
+        if cached is not None:
+            return cached[1]
+        lines = render_lines(Markdown(source, code_theme=CODE_THEME), key[3])
+        self.render_cache.put(key + (index,), (source, lines), estimate_size(source, lines))
+        return lines
+    
+    def _render_screen(self, note_path: Path, key: NoteKey, height: int,
+                       worker: Worker) -> Tuple[str, List[str], Dict[int, List[Strip]]]:
+        """Read a note and render the chunks filling its first screen
+        
+        Args:
+            note_path: Path to the note file
+            key: Key of the note from note_key()
+            height: Lines to render
+            worker: Worker rendering the note, checked for cancellation
+        
+        Returns:
+            Tuple of (content, Markdown of each chunk, lines of the chunks
+            rendered)
+        """
+        rendered: Dict[int, List[Strip]] = {}
+        windowed = 0 < self.window_bytes < key[2]
+        cached = None if windowed else self.render_cache.get(key + (0,))
+        if cached is not None:
+            content, rendered[0] = cached
+            return content, [content], rendered
+        content = note_path.read_text(encoding='utf-8')
+        chunks = split_markdown(content) if windowed else [content]
+        shown = 0
+        for index, source in enumerate(chunks):
+            if shown >= max(height, 1) or worker.is_cancelled:
+                break
+            rendered[index] = self._render_chunk(key, index, source)
+            shown += len(rendered[index])
+        return content, chunks, rendered
+    
+    @work(thread=True, exclusive=True, group="preview")
+    def _read_note(self, note_path: Path, width: int, height: int, theme: str) -> None:
+        """Read a note and render its first screen on a worker thread
+        
+        Nothing is shown if another note was loaded meanwhile.
+        
+        Args:
+            note_path: Path to the note file
+            width: Width to render at
+            height: Lines to render before the note is shown
+            theme: Styles to render with, from _theme()
+        """
+        worker = get_current_worker()
+        key = None
+        try:
+            key = note_key(note_path, width, theme)
+            with self._prefetch_lock:
+                # Viewed notes no longer count against the prefetch budget
+                self._prefetched.pop(key, None)
+            content, chunks, rendered = self._render_screen(note_path, key, height, worker)
         except Exception as e:
-            self.set_note(f"# Error Loading Note\n\nCould not load: {note_path}\n\nError: {e}")
+            key = None
+            content = f"# Error Loading Note\n\nCould not load: {note_path}\n\nError: {e}"
+            chunks = [content]
+            rendered = {0: render_lines(Markdown(content, code_theme=CODE_THEME), width)}
+        if not worker.is_cancelled:
+            self.app.call_from_thread(
+                self._show_note, note_path, width, key, content, chunks, rendered
+            )
+    
+    def prefetch(self, note_paths: Sequence[Path], direction: int) -> None:
+        """Render the notes the tree cursor is heading towards into the cache
+        
+        A single worker renders them, nearest first. Each call replaces the
+        notes it has not got to yet, so however fast the cursor moves only
+        one note is prefetched at a time and notes the cursor has passed
+        are dropped. When the cursor turns around, the notes prefetched so
+        far are left to the cache's LRU order instead of counting against
+        the budget.
+        
+        Args:
+            note_paths: Notes next to the highlighted one, nearest first
+            direction: 1 when the cursor moves down, -1 when it moves up
+        """
+        region = self.scrollable_content_region
+        with self._prefetch_lock:
+            if direction != self._prefetch_direction:
+                self._prefetch_direction = direction
+                self._prefetched.clear()
+            if not note_paths or region.width <= 0 or self.prefetch_bytes <= 0:
+                self._prefetch_targets = None
+                return
+            self._prefetch_targets = (
+                list(note_paths), region.width, region.height, self._theme()
+            )
+            if self._prefetch_running:
+                return
+            self._prefetch_running = True
+        self._prefetch_notes()
+    
+    def _prefetched_bytes(self) -> int:
+        """Size of the prefetched notes not viewed yet, forgetting evicted ones
+        
+        Must be called holding _prefetch_lock.
+        """
+        total = 0
+        for key, count in list(self._prefetched.items()):
+            size = sum(self.render_cache.size(key + (index,)) for index in range(count))
+            if size:
+                total += size
+            else:
+                del self._prefetched[key]
+        return total
+    
+    @work(thread=True, group="preview-prefetch")
+    def _prefetch_notes(self) -> None:
+        """Render the first screen of the latest prefetch targets into the cache
+        
+        Runs on a worker thread until no targets are left; prefetch() starts
+        it again when new ones come in while it is not running.
+        """
+        worker = get_current_worker()
+        pending: List[Path] = []
+        while not worker.is_cancelled:
+            with self._prefetch_lock:
+                if self._prefetch_targets is not None:
+                    pending, width, height, theme = self._prefetch_targets
+                    self._prefetch_targets = None
+                if not pending or self._prefetched_bytes() >= self.prefetch_bytes:
+                    # Decided under the lock, so prefetch() cannot hand new
+                    # targets to a worker that is about to stop
+                    self._prefetch_running = False
+                    return
+                note_path = pending.pop(0)
+                if note_path == self.current_note_path:
+                    continue
+            try:
+                key = note_key(note_path, width, theme)
+                if self.render_cache.size(key + (0,)):
+                    continue
+                _, _, rendered = self._render_screen(note_path, key, height, worker)
+            except (OSError, UnicodeDecodeError):
+                # Reported when the note is opened
+                continue
+            with self._prefetch_lock:
+                if not worker.is_cancelled:
+                    self._prefetched[key] = len(rendered)
+        with self._prefetch_lock:
+            self._prefetch_running = False
+    
+    def _show_note(self, note_path: Path, width: int, key: Optional[NoteKey], content: str,
+                   chunks: List[str], rendered: Dict[int, List[Strip]]) -> None:
+        """Display a note read by _read_note()
+        
+        Args:
+            note_path: Path the content was read from
+            width: Width the note was rendered at
+            key: Key of the note, None if it could not be read
+            content: Markdown content of the note
+            chunks: Markdown of each chunk
+            rendered: Lines of the chunks rendered so far
+        """
+        # Another note was selected, or the preview cleared, meanwhile
+        if note_path != self.current_note_path:
+            return
+        self.workers.cancel_group(self, "preview-chunks")
+        self.current_note_content = content
+        self._rendered_width = width
+        self._note_key = key
+        self._chunks = chunks
+        self._chunks_pending = set()
+        # Unrendered chunks are assumed to take a line per source line
+        self._content.set_chunks([source.count('\n') + 1 for source in chunks], rendered)
+        if self._pending_scroll is not None:
+            self.call_after_refresh(self.scroll_to, y=self._pending_scroll, animate=False)
+            self._pending_scroll = None
+    
+    def on_note_lines_chunks_needed(self, event: NoteLines.ChunksNeeded) -> None:
+        """Render chunks scrolled into view, and the ones next to them
+        
+        Args:
+            event: The chunks needed event
+        """
+        if self._note_key is None:
+            return
+        wanted = set()
+        for index in event.indices:
+            wanted.update((index - 1, index, index + 1))
+        todo = sorted(
+            index for index in wanted
+            if 0 <= index < len(self._chunks)
+            and self._content.chunks[index] is None
+            and index not in self._chunks_pending
+        )
+        if todo:
+            self._chunks_pending.update(todo)
+            self._render_chunks(self._note_key, [(index, self._chunks[index]) for index in todo])
+    
+    @work(thread=True, group="preview-chunks")
+    def _render_chunks(self, key: NoteKey, chunks: List[Tuple[int, str]]) -> None:
+        """Render chunks of the shown note on a worker thread
+        
+        Args:
+            key: Note the chunks belong to
+            chunks: (chunk number, Markdown) of each chunk to render
+        """
+        worker = get_current_worker()
+        for index, source in chunks:
+            if worker.is_cancelled:
+                return
+            lines = self._render_chunk(key, index, source)
+            self.app.call_from_thread(self._show_chunk, key, index, lines)
+    
+    def _show_chunk(self, key: NoteKey, index: int, lines: List[Strip]) -> None:
+        """Display a chunk rendered by _render_chunks()
+        
+        Args:
+            key: Note the chunk belongs to
+            index: Chunk number
+            lines: Rendered lines of the chunk
+        """
+        if key != self._note_key:
+            return
+        self._chunks_pending.discard(index)
+        above = self._content.offsets[index + 1] <= self.scroll_y
+        delta = self._content.set_chunk(index, lines)
+        if above and delta:
+            # Keep the lines on screen in place when a chunk above grows;
+            # an animated scroll is finished at its adjusted target
+            self.call_after_refresh(
+                self.scroll_to, y=self.scroll_target_y + delta, animate=False
+            )
+    
+    def on_resize(self, event: Resize) -> None:
+        """Render the note again for a new width
+        
+        Args:
+            event: The resize event
+        """
+        width = self._render_width()
+        if width <= 0 or width == self._rendered_width:
+            return
+        if self.current_note_path is None:
+            self._show_renderable()
+        else:
+            # Keep the old lines on screen until the new ones are ready
+            self._load_rendered(self.current_note_path)
     
     def clear(self) -> None:
         """Clear the preview"""
+        self.workers.cancel_group(self, "preview-chunks")
         self.current_note_content = None
         self.current_note_path = None
-        self.refresh()
+        self._pending_scroll = None
+        self._show_renderable()
+        self.scroll_home(animate=False)
@@ -2,16 +2,30 @@
 Tree view widget for browsing notes directory
 """
 
+import os
+from itertools import islice
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Set
 from textual.widgets import Tree
-from textual.widgets.tree import TreeNode
+from textual.widgets.tree import TreeNode, UnknownNodeID
 from textual.message import Message
+from notes_tui.core.note_entry import NoteEntry
 from notes_tui.core.notes_manager import NotesManager
 
 
 class NotesTreeView(Tree):
-    """File tree browser widget for notes"""
+    """File tree browser widget for notes
+    
+    Large folders are shown a page at a time: only the first page_size
+    entries get a tree node, followed by an "N more…" placeholder that
+    adds the next page when the cursor reaches it. The tree only ever
+    draws the rows on screen, so keeping the number of nodes bounded keeps
+    scrolling and cursor movement fast whatever the folder size.
+    
+    Moving the cursor onto a note reports the next few notes of its folder
+    in the direction of travel, so they can be prepared before the cursor
+    gets there.
+    """
     
     # Tree widgets are focusable by default, but make it explicit
     can_focus = True
@@ -28,16 +42,43 @@ class NotesTreeView(Tree):
             super().__init__()
             self.note_path = note_path
     
-    def __init__(self, notes_manager: NotesManager, **kwargs):
+    class NoteHighlighted(Message):
+        """Message emitted when the cursor moves onto a note"""
+        
+        def __init__(self, note_path: Path, ahead: List[Path], direction: int) -> None:
+            """Initialize the message
+            
+            Args:
+                note_path: Path to the highlighted note
+                ahead: Following notes of the same folder in the direction
+                       the cursor moved, nearest first
+                direction: 1 if the cursor moved down, -1 if it moved up
+            """
+            super().__init__()
+            self.note_path = note_path
+            self.ahead = ahead
+            self.direction = direction
+    
+    def __init__(self, notes_manager: NotesManager, page_size: int = 0,
+                 prefetch: int = 0, **kwargs):
         """Initialize the tree view
         
         Args:
             notes_manager: NotesManager instance
+            page_size: Entries of a folder shown before an "N more…"
+                       placeholder (0 shows every entry)
+            prefetch: Notes ahead of the cursor reported by NoteHighlighted
             **kwargs: Additional widget arguments
         """
         super().__init__("📁 Notes", **kwargs)
         self.notes_manager = notes_manager
+        self.page_size = max(page_size, 0)
+        self.prefetch = max(prefetch, 0)
+        # Line of the previously highlighted node, to tell the direction
+        self._last_line = 0
         self.show_root = True
+        # Path -> node for folders whose contents are loaded
+        self._loaded_folders: Dict[str, TreeNode] = {}
     
     def on_mount(self) -> None:
         """Handle mounting of the widget"""
@@ -46,30 +87,178 @@ class NotesTreeView(Tree):
         self.root.expand()
     
     def load_tree(self) -> None:
-        """Load the file tree"""
+        """Load the top level of the file tree
+        
+        Folders are only scanned when they are first expanded.
+        """
         root = self.root
-        tree = self.notes_manager.get_directory_tree()
-        self._load_tree_node(root, tree)
+        tree = self.notes_manager.list_directory(self.notes_manager.root_dir)
+        tree.loaded = True
+        root.data = tree
+        self._loaded_folders = {tree.path: root}
+        self._load_tree_node(root, tree.children)
     
-    def _load_tree_node(self, parent: TreeNode, tree_data: dict) -> None:
-        """Recursively load tree nodes
+    def _load_tree_node(self, parent: TreeNode, entries: Sequence[NoteEntry]) -> None:
+        """Add nodes for the first page of entries of one folder under its node
         
         Args:
             parent: Parent tree node
-            tree_data: Tree data dictionary
-        """
-        for child in tree_data.get('children', []):
-            if child['is_dir']:
-                icon = "📁"
-                label = f"{icon} {child['name']}"
-            else:
-                icon = "📄"
-                label = f"{icon} {child['name']}"
+            entries: Entries listed by NotesManager.load_children()
+        """
+        if self.page_size:
+            entries = entries[:self.page_size]
+        for entry in entries:
+            self._add_entry(parent, entry)
+        self._update_placeholder(parent)
+    
+    @staticmethod
+    def _placeholder(node: TreeNode) -> Optional[TreeNode]:
+        """Get the "N more…" node of a folder, if it has one"""
+        children = node.children
+        if children and children[-1].data is None:
+            return children[-1]
+        return None
+    
+    def _shown(self, node: TreeNode) -> int:
+        """Number of entries of a folder that have a node"""
+        count = len(node.children)
+        return count - 1 if self._placeholder(node) is not None else count
+    
+    def _update_placeholder(self, node: TreeNode) -> None:
+        """Add, relabel or remove the "N more…" node at the end of a folder
+        
+        Args:
+            node: Tree node of a loaded folder
+        """
+        remaining = len(node.data.children) - self._shown(node)
+        placeholder = self._placeholder(node)
+        if remaining <= 0:
+            if placeholder is not None:
+                placeholder.remove()
+        elif placeholder is None:
+            node.add_leaf(f"   {remaining} more…", data=None)
+        else:
+            placeholder.set_label(f"   {remaining} more…")
+    
+    def show_more(self, node: TreeNode) -> None:
+        """Add nodes for the next page of a folder's entries
+        
+        The placeholder is replaced rather than moved down, so a cursor
+        resting on it lands on the first new entry instead of following it
+        and loading page after page.
+        
+        Args:
+            node: Tree node of a loaded folder
+        """
+        placeholder = self._placeholder(node)
+        if placeholder is None:
+            return
+        placeholder.remove()
+        shown = len(node.children)
+        for entry in node.data.children[shown:shown + (self.page_size or None)]:
+            self._add_entry(node, entry)
+        self._update_placeholder(node)
+    
+    def _add_entry(self, parent: TreeNode, entry: NoteEntry,
+                  before: Optional[TreeNode] = None) -> TreeNode:
+        """Add a node for one folder or note
+        
+        Args:
+            parent: Parent tree node
+            entry: Entry of the folder or note
+            before: Sibling to insert the node in front of, None to append
+        
+        Returns:
+            The new node
+        """
+        if entry.is_dir:
+            icon = "📁"
+            label = f"{icon} {entry.name}"
+            # Expandable before its contents are known
+            return parent.add(label, data=entry, before=before, allow_expand=True)
+        icon = "📄"
+        label = f"{icon} {entry.name}"
+        return parent.add_leaf(label, data=entry, before=before)
+    
+    def _remove_node(self, node: TreeNode) -> None:
+        """Remove a node and forget the loaded folders below it
+        
+        Args:
+            node: Node to remove
+        """
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.data is not None and current.data.loaded:
+                self._loaded_folders.pop(current.data.path, None)
+                stack.extend(current.children)
+        node.remove()
             
-            node = parent.add(label, data=child)
+    def _ensure_loaded(self, node: TreeNode) -> None:
+        """Scan a folder node's directory the first time it is needed
             
-            if child['is_dir'] and child['children']:
-                self._load_tree_node(node, child)
+        Args:
+            node: Tree node of a folder
+        """
+        entry = node.data
+        if entry is None or not entry.is_dir or entry.loaded:
+            return
+        self.notes_manager.load_children(entry)
+        entry.loaded = True
+        self._loaded_folders[entry.path] = node
+        self._load_tree_node(node, entry.children)
+    
+    def on_tree_node_expanded(self, event: Tree.NodeExpanded) -> None:
+        """Load a folder's contents on first expand
+        
+        Args:
+            event: The tree node expanded event
+        """
+        self._ensure_loaded(event.node)
+    
+    def on_tree_node_highlighted(self, event: Tree.NodeHighlighted) -> None:
+        """Show the next page of a folder when the cursor reaches its end,
+        and report notes the cursor moves onto
+        
+        Args:
+            event: The tree node highlighted event
+        """
+        node = event.node
+        line, self._last_line = self._last_line, node.line
+        if node.data is None:
+            if node.parent is not None:
+                self.show_more(node.parent)
+        elif not node.data.is_dir:
+            direction = -1 if node.line < line else 1
+            self.post_message(self.NoteHighlighted(
+                Path(node.data.path), self._notes_ahead(node, direction), direction
+            ))
+    
+    def _notes_ahead(self, node: TreeNode, direction: int) -> List[Path]:
+        """Find the notes the cursor reaches next moving through a folder
+        
+        Notes past the shown pages are included, since the cursor loads
+        them on reaching the placeholder.
+        
+        Args:
+            node: Node of a note
+            direction: 1 to look below the note, -1 to look above it
+        
+        Returns:
+            Paths of up to prefetch notes, nearest first
+        """
+        parent = node.parent
+        if not self.prefetch or parent is None or parent.data is None:
+            return []
+        # Nodes are in the order of the folder's entries
+        index = parent.children.index(node)
+        entries = parent.data.children
+        if direction > 0:
+            following = range(index + 1, len(entries))
+        else:
+            following = range(index - 1, -1, -1)
+        notes = (entries[i] for i in following if not entries[i].is_dir)
+        return [Path(entry.path) for entry in islice(notes, self.prefetch)]
     
     def on_tree_node_selected(self, event: Tree.NodeSelected) -> None:
         """Handle tree node selection
@@ -77,53 +266,159 @@ class NotesTreeView(Tree):
         Args:
             event: The tree node selected event
         """
-        node_data = event.node.data
+        entry = event.node.data
         
-        if node_data and not node_data.get('is_dir', False):
+        if entry is not None and not entry.is_dir:
             # It's a file, emit selection event
-            note_path = Path(node_data['path'])
+            note_path = Path(entry.path)
             self.post_message(self.NoteSelected(note_path))
     
-    def refresh_tree(self) -> None:
-        """Refresh the tree view to show updated files"""
-        # Save expanded state
-        expanded_nodes = []
-        self._collect_expanded_nodes(self.root, expanded_nodes)
+    def refresh_tree(self, paths: Optional[Iterable[Path]] = None,
+                     invalidate: bool = True) -> None:
+        """Refresh the tree view to show updated files
         
-        # Clear existing tree
-        self.root.remove_children()
+        Only loaded folders whose directory mtime changed are listed again,
+        and only the entries that appeared or disappeared are added or
+        removed, so expansion and the cursor stay where they were.
         
-        # Reload the tree
-        self.load_tree()
+        Args:
+            paths: Files or folders known to have changed; only these and
+                   the loaded folders above them are checked. None checks
+                   every loaded folder.
+            invalidate: Also have the notes catalog check the paths again;
+                        False when it already has, e.g. after revalidate(),
+                        so only the widgets are updated
+        """
+        if paths is not None:
+            paths = list(paths)
+        if invalidate:
+            self.notes_manager.invalidate_paths(paths)
         
-        # Restore expanded state
-        self._restore_expanded_nodes(self.root, expanded_nodes)
+        if paths is None:
+            folders = list(self._loaded_folders.values())
+        else:
+            folders = []
+            seen = set()
+            for path in paths:
+                path = Path(path)
+                for parent in (path, *path.parents):
+                    key = str(parent)
+                    if key in self._loaded_folders and key not in seen:
+                        seen.add(key)
+                        folders.append(self._loaded_folders[key])
+            # Parents first, so folders deleted with their parent are skipped
+            folders.sort(key=lambda node: len(node.data.path))
+        
+        cursor = self.cursor_node
+        synced = False
+        for node in folders:
+            path = node.data.path
+            # Skip folders removed while syncing their parent
+            if self._loaded_folders.get(path) is not node:
+                continue
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                # Deleted; syncing its parent removes it
+                continue
+            if mtime_ns != node.data.mtime_ns:
+                self._sync_node(node)
+                synced = True
         
         # Always expand root
         self.root.expand()
     
-    def _collect_expanded_nodes(self, node: TreeNode, expanded: list) -> None:
-        """Collect paths of expanded nodes
+        # Lines shift when nodes are added above the cursor
+        if synced and cursor is not None and self._is_attached(cursor):
+            self.call_after_refresh(self.move_cursor, cursor)
+    
+    def expanded_folders(self) -> List[Path]:
+        """Get the folders shown expanded, below the root
+        
+        Returns:
+            Paths of expanded folders whose parents are expanded too
+        """
+        folders = []
+        stack = [self.root]
+        while stack:
+            for child in stack.pop().children:
+                if child.data is not None and child.data.is_dir and child.is_expanded:
+                    folders.append(Path(child.data.path))
+                    stack.append(child)
+        return folders
+    
+    def restore_state(self, expanded: Set[str], selected: Optional[Path] = None) -> None:
+        """Expand folders and select a note saved from an earlier run
+        
+        Only the folders being expanded are listed, and each folder node is
+        checked against the set with a single lookup.
         
         Args:
-            node: Current tree node
-            expanded: List to collect expanded node paths
+            expanded: Paths of the folders to expand
+            selected: Note to move the cursor to, if any
         """
-        if node.is_expanded and node.data:
-            expanded.append(node.data.get('path'))
+        stack = [self.root]
+        while stack:
+            for child in stack.pop().children:
+                if child.data is not None and child.data.is_dir and child.data.path in expanded:
+                    self._ensure_loaded(child)
+                    child.expand()
+                    stack.append(child)
         
-        for child in node.children:
-            self._collect_expanded_nodes(child, expanded)
+        if selected is None:
+            return
+        parent = self._loaded_folders.get(str(selected.parent))
+        if parent is None:
+            return
+        target = str(selected)
+        while True:
+            node = next((child for child in parent.children
+                         if child.data is not None and child.data.path == target), None)
+            if node is not None or self._placeholder(parent) is None:
+                break
+            # The note is on a later page
+            self.show_more(parent)
+        if node is not None:
+            self.call_after_refresh(self.move_cursor, node)
     
-    def _restore_expanded_nodes(self, node: TreeNode, expanded: list) -> None:
-        """Restore expanded state of nodes
+    def _is_attached(self, node: TreeNode) -> bool:
+        """Check whether a node is still part of the tree"""
+        try:
+            return self.get_node_by_id(node.id) is node
+        except UnknownNodeID:
+            return False
+    
+    def _sync_node(self, node: TreeNode) -> None:
+        """List a loaded folder again and apply the difference to its children
         
         Args:
-            node: Current tree node
-            expanded: List of paths that should be expanded
+            node: Tree node of a loaded folder
         """
-        if node.data and node.data.get('path') in expanded:
-            node.expand()
+        entry = node.data
+        old = {(child.name, child.is_dir): child for child in entry.children}
+        self.notes_manager.load_children(entry)
+        # Keep the existing entries, which hold folders that may be loaded
+        entry.children = [old.get((child.name, child.is_dir), child) for child in entry.children]
+        
+        # As many entries stay shown as before, at least a full page
+        shown = entry.children
+        if self.page_size:
+            shown = shown[:max(self._shown(node), self.page_size)]
+        wanted = {(child.name, child.is_dir) for child in shown}
+        placeholder = self._placeholder(node)
         
-        for child in node.children:
-            self._restore_expanded_nodes(child, expanded)
+        for child in list(node.children):
+            if child is not placeholder and (child.data.name, child.data.is_dir) not in wanted:
+                self._remove_node(child)
+    
+        # Both lists are in listing order, so new entries slot in front of
+        # the first kept sibling that sorts after them
+        kept = [child for child in node.children if child is not placeholder]
+        i = 0
+        for child in shown:
+            if i < len(kept) and kept[i].data is child:
+                i += 1
+                continue
+            self._add_entry(node, child, before=kept[i] if i < len(kept) else placeholder)
+        self._update_placeholder(node)
+        
\ No newline at end of file
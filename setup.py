@@ -34,7 +34,7 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=[
-        "textual>=0.35.0",
+        "textual>=0.73.0",
         "rich>=13.0.0",
         "pyyaml>=6.0",
         "click>=8.1",
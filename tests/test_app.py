@@ -0,0 +1,205 @@
+"""
+Tests for the application driven through Textual's pilot
+"""
+
+import asyncio
+import os
+import threading
+import time
+import pytest
+import yaml
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from notes_tui.app import NotesApp
+from notes_tui.core.fuzzy import PathFinder
+from notes_tui.screens.quick_open import QuickOpenScreen
+from notes_tui.widgets.note_view import NotePreview
+from notes_tui.widgets.tree_view import NotesTreeView
+
+
+DEFAULT_CONFIG = Path(__file__).resolve().parent.parent / 'config' / 'default.yaml'
+
+
+@pytest.fixture
+def make_app():
+    """Build apps over a temporary notes directory with UI settings overridden"""
+    with TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        notes_dir = tmpdir / 'notes'
+        (notes_dir / 'work').mkdir(parents=True)
+        (notes_dir / '.templates').mkdir()
+        (notes_dir / 'work' / 'project.md').write_text('# Project\n')
+        (notes_dir / 'todo.md').write_text('# Todo\n')
+        
+        def make(**ui) -> NotesApp:
+            config = yaml.safe_load(DEFAULT_CONFIG.read_text())
+            config['notes_directory'] = str(notes_dir)
+            config['templates_directory'] = str(notes_dir / '.templates')
+            config['cache_directory'] = str(tmpdir / 'cache')
+            config['watch']['enabled'] = False
+            config['ui']['restore_session'] = False
+            config['ui'].update(ui)
+            config_path = tmpdir / 'config.yaml'
+            config_path.write_text(yaml.safe_dump(config))
+            return NotesApp(config_path)
+        
+        yield make
+
+
+def test_quick_open_does_not_wait_for_path_index(make_app, monkeypatch):
+    """Test that quick open shows at once and picks up new notes when indexed"""
+    app = make_app()
+    manager = app.notes_manager
+    release = threading.Event()
+    get_path_finder = manager.get_path_finder
+    
+    def slow_path_finder():
+        release.wait(5)
+        return get_path_finder()
+    
+    monkeypatch.setattr(manager, 'get_path_finder', slow_path_finder)
+    
+    async def run():
+        async with app.run_test() as pilot:
+            await pilot.pause(0.2)
+            (app.notes_dir / 'work' / 'fresh.md').write_text('# Fresh\n')
+            manager.catalog.invalidate()
+            await app.run_action('quick_open')
+            await pilot.pause()
+            screen = app.screen
+            assert isinstance(screen, QuickOpenScreen)
+            before = list(screen.matches)
+            release.set()
+            for _ in range(100):
+                await pilot.pause(0.02)
+                if 'work/fresh' in screen.matches:
+                    break
+            return before, list(screen.matches)
+    
+    before, after = asyncio.run(run())
+    assert 'work/fresh' not in before
+    assert 'work/fresh' in after
+
+
+def test_quick_open_scores_paths_off_the_ui_thread(make_app, monkeypatch):
+    """Test that typing in quick open does not wait for slow path scoring"""
+    app = make_app()
+    release = threading.Event()
+    find = PathFinder.find
+    
+    def slow_find(path_finder, query, limit=50):
+        if query:
+            release.wait(5)
+        return find(path_finder, query, limit)
+    
+    monkeypatch.setattr(PathFinder, 'find', slow_find)
+    
+    async def run():
+        async with app.run_test() as pilot:
+            await pilot.pause(0.2)
+            await app.run_action('quick_open')
+            await pilot.pause()
+            screen = app.screen
+            await pilot.press('p', 'r', 'o')
+            await pilot.pause()
+            typed = screen.query_one('#quick-open-input').value
+            before = list(screen.matches)
+            release.set()
+            for _ in range(100):
+                await pilot.pause(0.02)
+                if screen.matches == ['work/project']:
+                    break
+            return typed, before, list(screen.matches)
+    
+    typed, before, after = asyncio.run(run())
+    assert typed == 'pro'
+    assert before == ['todo', 'work/project']
+    assert after == ['work/project']
+
+
+def test_revalidate_updates_tree_without_invalidating(make_app, monkeypatch):
+    """Test that folders found changed at startup are not checked a second time"""
+    async def start(app):
+        async with app.run_test() as pilot:
+            await pilot.pause(0.3)
+    
+    # The first run saves the snapshot the second run starts from
+    app = make_app()
+    asyncio.run(start(app))
+    work = app.notes_dir / 'work'
+    (work / 'added.md').write_text('# Added\n')
+    os.utime(work, (time.time() - 60,) * 2)
+    
+    app = make_app()
+    refreshed = []
+    invalidated = []
+    refresh_tree = NotesTreeView.refresh_tree
+    invalidate_paths = app.notes_manager.invalidate_paths
+    
+    def record_refresh(tree_view, paths=None, **kwargs):
+        refreshed.append(list(paths))
+        refresh_tree(tree_view, paths, **kwargs)
+    
+    def record_invalidate(paths=None):
+        invalidated.append(paths)
+        invalidate_paths(paths)
+    
+    monkeypatch.setattr(NotesTreeView, 'refresh_tree', record_refresh)
+    monkeypatch.setattr(app.notes_manager, 'invalidate_paths', record_invalidate)
+    asyncio.run(start(app))
+    assert refreshed == [[work]]
+    assert invalidated == []
+
+
+async def _walk_notes(app: NotesApp, moves: int, settle: float):
+    """Move the tree cursor quickly over several notes, then press Enter
+    
+    Returns:
+        Tuple of (notes loaded into the preview before Enter, notes loaded
+        by Enter, name of the highlighted note)
+    """
+    loaded = []
+    async with app.run_test() as pilot:
+        await pilot.pause(0.2)
+        preview = app.query_one(NotePreview)
+        load_note = preview.load_note
+        preview.load_note = lambda note_path, *args, **kwargs: (
+            loaded.append(note_path.name), load_note(note_path, *args, **kwargs)
+        )
+        tree = app.query_one(NotesTreeView)
+        tree.focus()
+        first = next(child for child in tree.root.children if child.data.path.endswith('day0.md'))
+        tree.move_cursor(first)
+        await pilot.pause()
+        for _ in range(moves):
+            await pilot.press('down')
+        await pilot.pause(settle)
+        before = list(loaded)
+        highlighted = Path(tree.cursor_node.data.path).name
+        await pilot.press('enter')
+        await pilot.pause()
+    return before, loaded[len(before):], highlighted
+
+
+def test_preview_on_highlight_loads_only_resting_note(make_app):
+    """Test that quick cursor moves only preview the note the cursor rests on"""
+    app = make_app(preview_on_highlight=True, preview_delay_ms=300)
+    for i in range(6):
+        (app.notes_dir / f'day{i}.md').write_text(f'# Day {i}\n')
+    
+    before, selected, highlighted = asyncio.run(_walk_notes(app, 4, 0.6))
+    assert highlighted == 'day4.md'
+    assert before == ['day4.md']
+    assert app.current_note.name == 'day4.md'
+
+
+def test_preview_on_highlight_off_waits_for_selection(make_app):
+    """Test that without the mode only selecting a note previews it"""
+    app = make_app()
+    for i in range(6):
+        (app.notes_dir / f'day{i}.md').write_text(f'# Day {i}\n')
+    
+    before, selected, highlighted = asyncio.run(_walk_notes(app, 4, 0.6))
+    assert before == []
+    assert selected == [highlighted] == ['day4.md']
@@ -0,0 +1,189 @@
+"""
+Tests for the note catalog
+"""
+
+import os
+import threading
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from notes_tui.core import tree_snapshot
+from notes_tui.core.catalog import NoteCatalog
+from notes_tui.core.notes_manager import NotesManager
+from notes_tui.core.search import Search
+from notes_tui.core.search_index import SearchIndex
+from notes_tui.utils.helpers import get_file_count
+
+
+@pytest.fixture
+def temp_notes_dir():
+    """Create a temporary notes directory"""
+    with TemporaryDirectory() as notes_dir:
+        notes_dir = Path(notes_dir)
+        (notes_dir / 'work' / 'archive').mkdir(parents=True)
+        (notes_dir / '.hidden').mkdir()
+        (notes_dir / 'note1.md').write_text('# Python Tutorial')
+        (notes_dir / 'work' / 'plan.md').write_text('# Python plan')
+        (notes_dir / 'work' / 'archive' / 'old.md').write_text('# Old')
+        (notes_dir / '.hidden' / 'secret.md').write_text('# Python secret')
+        yield notes_dir
+
+
+def test_catalog_lists_visible_notes(temp_notes_dir):
+    """Test that the catalog records every note shown in the tree"""
+    catalog = NoteCatalog(temp_notes_dir)
+    catalog.ensure_fresh()
+    
+    assert catalog.relative_paths() == ['note1.md', 'work/archive/old.md', 'work/plan.md']
+    assert catalog.note_paths(temp_notes_dir / 'work') == [
+        temp_notes_dir / 'work' / 'archive' / 'old.md', temp_notes_dir / 'work' / 'plan.md'
+    ]
+    mtime_ns, size = catalog.notes['note1.md']
+    assert size == len('# Python Tutorial')
+
+
+def test_catalog_generations_and_notifications(temp_notes_dir):
+    """Test that only refreshes finding a difference notify subscribers"""
+    catalog = NoteCatalog(temp_notes_dir)
+    changes = []
+    catalog.subscribe(changes.append)
+    catalog.ensure_fresh()
+    assert catalog.generation == 1
+    assert len(changes[0].added) == 3
+    
+    catalog.invalidate()
+    catalog.ensure_fresh()
+    assert catalog.generation == 1
+    
+    (temp_notes_dir / 'work' / 'plan.md').write_text('# Python plan, longer')
+    (temp_notes_dir / 'note1.md').unlink()
+    (temp_notes_dir / 'new.md').write_text('')
+    catalog.invalidate()
+    catalog.ensure_fresh()
+    assert catalog.generation == 2
+    assert changes[-1].added == {'new.md'}
+    assert changes[-1].removed == {'note1.md'}
+    assert changes[-1].modified == {'work/plan.md'}
+
+
+def test_catalog_invalidated_notes_skip_the_walk(temp_notes_dir, monkeypatch):
+    """Test that invalidating single notes only stats those notes"""
+    catalog = NoteCatalog(temp_notes_dir)
+    catalog.ensure_fresh()
+    
+    def fail(directory):
+        raise AssertionError(f"scanned {directory}")
+    
+    monkeypatch.setattr(tree_snapshot, 'scan_directory', fail)
+    (temp_notes_dir / 'work' / 'todo.md').write_text('')
+    catalog.invalidate([temp_notes_dir / 'work' / 'todo.md'])
+    catalog.ensure_fresh()
+    assert 'work/todo.md' in catalog.notes
+
+
+def test_consumers_share_one_walk(temp_notes_dir, monkeypatch):
+    """Test that listings, path index and search all read one walk"""
+    manager = NotesManager(temp_notes_dir)
+    search = Search(temp_notes_dir, catalog=manager.catalog)
+    
+    scans = []
+    scan_directory = tree_snapshot.scan_directory
+    monkeypatch.setattr(
+        tree_snapshot, 'scan_directory',
+        lambda directory: scans.append(directory) or scan_directory(directory)
+    )
+    
+    assert len(search.search('python')) == 2
+    assert len(manager.get_all_notes()) == 3
+    assert len(manager.get_notes_by_category('work')) == 2
+    assert len(manager.get_path_finder()) == 3
+    assert len(manager.search_notes('python')) == 2
+    assert get_file_count(temp_notes_dir / 'work', manager.catalog) == 2
+    assert sorted(scans) == sorted({
+        str(temp_notes_dir), str(temp_notes_dir / 'work'), str(temp_notes_dir / 'work' / 'archive')
+    })
+
+
+def test_get_file_count_standalone(temp_notes_dir):
+    """Test counting notes without a shared catalog"""
+    assert get_file_count(temp_notes_dir) == 3
+    assert get_file_count(temp_notes_dir / 'work') == 2
+
+
+def test_catalog_notifies_without_lock(temp_notes_dir, monkeypatch):
+    """Test that a search loading its index and a path lookup finding a
+    change on another thread do not deadlock"""
+    manager = NotesManager(temp_notes_dir)
+    with TemporaryDirectory() as cache_dir:
+        search = Search(temp_notes_dir, index_path=Path(cache_dir) / 'index.sqlite',
+                        catalog=manager.catalog)
+        loading, changed = threading.Event(), threading.Event()
+        load = SearchIndex.load
+        
+        def slow_load(index):
+            # Hold the search's index lock until the other thread has
+            # applied a catalog change
+            loading.set()
+            changed.wait(2)
+            return load(index)
+        
+        monkeypatch.setattr(SearchIndex, 'load', slow_load)
+        
+        def change_notes():
+            loading.wait(2)
+            (temp_notes_dir / 'new.md').write_text('# Python too')
+            manager.invalidate_paths([temp_notes_dir / 'new.md'])
+            manager.get_path_finder()
+            changed.set()
+        
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(search.search('python')), daemon=True),
+            threading.Thread(target=change_notes, daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        assert not any(thread.is_alive() for thread in threads)
+        assert len(results) == 1
+
+
+def test_invalidate_does_not_wait_for_walk(temp_notes_dir, monkeypatch):
+    """Test that invalidating and listing notes return while a walk is running"""
+    catalog = NoteCatalog(temp_notes_dir)
+    catalog.ensure_fresh()
+    walking, release = threading.Event(), threading.Event()
+    stat = NoteCatalog._stat
+    
+    def slow_stat(path):
+        walking.set()
+        release.wait(5)
+        return stat(path)
+    
+    monkeypatch.setattr(NoteCatalog, '_stat', staticmethod(slow_stat))
+    catalog.invalidate()
+    walker = threading.Thread(target=catalog.ensure_fresh, daemon=True)
+    walker.start()
+    assert walking.wait(5)
+    
+    # Both return while the walk is blocked on a stat
+    new = temp_notes_dir / 'work' / 'new.md'
+    new.write_text('')
+    listed = []
+    caller = threading.Thread(
+        target=lambda: (catalog.invalidate([new]), listed.extend(catalog.relative_paths())),
+        daemon=True
+    )
+    caller.start()
+    caller.join(2)
+    done = not caller.is_alive()
+    release.set()
+    assert done
+    assert 'note1.md' in listed
+    walker.join(5)
+    assert not walker.is_alive()
+    
+    # The invalidation made during the walk is applied by the next refresh
+    catalog.ensure_fresh()
+    assert 'work/new.md' in catalog.notes
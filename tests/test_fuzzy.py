@@ -0,0 +1,52 @@
+"""
+Tests for fuzzy path matching
+"""
+
+from notes_tui.core.fuzzy import PathFinder
+from notes_tui.core.note_entry import NoteEntry
+
+
+PATHS = [
+    'work/project-plan',
+    'work/planning/old',
+    'personal/thoughts',
+    'journals/daily/2024-01-01',
+]
+
+
+def test_find_prefers_file_name_matches():
+    """Test that matches inside the file name rank first"""
+    finder = PathFinder(PATHS)
+    results = finder.find('plan')
+    
+    assert [path for path, _ in results] == ['work/project-plan', 'work/planning/old']
+    assert results[0][1] > results[1][1]
+
+
+def test_find_subsequence():
+    """Test that query characters only need to appear in order"""
+    finder = PathFinder(PATHS)
+    
+    assert [path for path, _ in finder.find('wpp')] == ['work/project-plan']
+    assert finder.find('zz') == []
+
+
+def test_find_narrows_incrementally():
+    """Test that extending a query reuses the previous match set"""
+    finder = PathFinder(PATHS)
+    finder.find('j')
+    finder.find('jo')
+    
+    assert finder._matches['jo'] == [3]
+    assert [path for path, _ in finder.find('jou')] == ['journals/daily/2024-01-01']
+
+
+def test_load_tree():
+    """Test building the path index from a directory tree"""
+    tree = NoteEntry.root('/notes')
+    [work] = tree.set_children(['work'], ['todo.md'])
+    work.set_children([], ['project.md'])
+    finder = PathFinder()
+    finder.load_tree(tree)
+    
+    assert finder.paths == ['todo', 'work/project']
@@ -0,0 +1,113 @@
+"""
+Tests for frontmatter parsing and the metadata index
+"""
+
+import os
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from notes_tui.core.metadata import MetadataIndex, read_frontmatter, split_filters
+from notes_tui.core.search import Search
+
+
+def _note(tags, status, date, body='Body text'):
+    """Build note content with template-style frontmatter"""
+    return f'---\ntitle: "Note"\ndate: "{date}"\ntags: {tags}\nstatus: "{status}"\n---\n\n{body}\n'
+
+
+@pytest.fixture
+def temp_notes_with_metadata():
+    """Create temporary notes with frontmatter"""
+    with TemporaryDirectory() as notes_dir:
+        notes_dir = Path(notes_dir)
+        (notes_dir / 'work').mkdir()
+        (notes_dir / 'work' / 'plan.md').write_text(
+            _note("['work', 'Planning']", 'active', '2024-05-01', 'Python roadmap'))
+        (notes_dir / 'work' / 'done.md').write_text(
+            _note("['work']", 'done', '2024-04-12', 'Python retro'))
+        (notes_dir / 'idea.md').write_text(
+            _note('[]', 'active', '2024-05-20', 'Rust idea'))
+        (notes_dir / 'plain.md').write_text('# No frontmatter\n---\ntags: [work]\n---\n')
+        yield notes_dir
+
+
+def test_read_frontmatter(temp_notes_with_metadata):
+    """Test that only a leading, closed frontmatter block is parsed"""
+    meta = read_frontmatter(temp_notes_with_metadata / 'work' / 'plan.md')
+    assert meta['tags'] == ['work', 'Planning']
+    assert meta['status'] == 'active'
+    
+    assert read_frontmatter(temp_notes_with_metadata / 'plain.md') == {}
+    unclosed = temp_notes_with_metadata / 'unclosed.md'
+    unclosed.write_text('---\ntags: [a]\nno closing fence\n')
+    assert read_frontmatter(unclosed) == {}
+
+
+def test_split_filters():
+    """Test separating metadata filters from search text"""
+    assert split_filters('python tag:Work status:active') == (
+        [('tag', 'work'), ('status', 'active')], 'python'
+    )
+    assert split_filters('"tag:work" python') == ([], '"tag:work" python')
+    # The text around filters is kept as typed
+    assert split_filters('tag:work fix(parser)  now status:active') == (
+        [('tag', 'work'), ('status', 'active')], 'fix(parser)  now'
+    )
+    assert split_filters('a tag:work b') == ([('tag', 'work')], 'a b')
+
+
+def test_search_filter_with_punctuated_text(temp_notes_with_metadata):
+    """Test that a filter combined with text containing punctuation still matches"""
+    (temp_notes_with_metadata / 'work' / 'plan.md').write_text(
+        _note("['work']", 'active', '2024-05-01', 'fix(parser) today'))
+    (temp_notes_with_metadata / 'idea.md').write_text(
+        _note('[]', 'active', '2024-05-20', 'fix(parser) later'))
+    search = Search(temp_notes_with_metadata)
+    assert len(search.search('fix(parser)')) == 2
+    assert [str(r['relative_path']) for r in search.search('tag:work fix(parser)')] == [
+        'work/plan.md'
+    ]
+
+
+def test_metadata_filters_and_facets(temp_notes_with_metadata):
+    """Test filter queries and facet counts"""
+    index = MetadataIndex(temp_notes_with_metadata)
+    assert index.update() == 4
+    
+    assert index.query('tag:work') == ['work/done.md', 'work/plan.md']
+    assert index.query('tag:work status:active') == ['work/plan.md']
+    assert index.query('tag:planning') == ['work/plan.md']
+    assert index.query('date:2024-05') == ['idea.md', 'work/plan.md']
+    assert index.facets('status') == {'active': 2, 'done': 1}
+    assert index.facets('tag', index.filter([('status', 'active')])) == {'work': 1, 'planning': 1}
+
+
+def test_metadata_index_is_incremental(temp_notes_with_metadata):
+    """Test that only changed notes are re-read and the cache persists"""
+    with TemporaryDirectory() as cache_dir:
+        index_path = Path(cache_dir) / 'metadata.pickle'
+        index = MetadataIndex(temp_notes_with_metadata, index_path)
+        index.update()
+        
+        changed = temp_notes_with_metadata / 'idea.md'
+        changed.write_text(_note("['rust']", 'done', '2024-06-01'))
+        os.utime(changed, ns=(0, 0))
+        (temp_notes_with_metadata / 'work' / 'done.md').unlink()
+        
+        warm = MetadataIndex(temp_notes_with_metadata, index_path)
+        assert warm.update() == 2
+        assert warm.query('tag:rust') == ['idea.md']
+        assert warm.query('tag:work') == ['work/plan.md']
+        assert warm.facets('status') == {'active': 1, 'done': 1}
+
+
+def test_search_with_filters(temp_notes_with_metadata):
+    """Test combining full-text search with metadata filters, with and without an index"""
+    names = lambda results: sorted(r['relative_path'].as_posix() for r in results)
+    with TemporaryDirectory() as cache_dir:
+        for index_path in [None, Path(cache_dir) / 'index.sqlite']:
+            search = Search(temp_notes_with_metadata, index_path=index_path)
+            assert names(search.search('python')) == ['work/done.md', 'work/plan.md']
+            assert names(search.search('python status:active')) == ['work/plan.md']
+            assert names(search.search('status:active')) == ['idea.md', 'work/plan.md']
+            assert names(search.iter_search('python status:done')) == ['work/done.md']
@@ -0,0 +1,145 @@
+"""
+Tests for the note preview and splitting large notes into chunks
+"""
+
+import asyncio
+import threading
+from textual.app import App, ComposeResult
+from textual.worker import WorkerState
+
+from notes_tui.widgets.note_view import NotePreview, split_markdown
+
+
+class PreviewApp(App):
+    """App showing only a note preview"""
+    
+    def __init__(self, **preview_args):
+        """Initialize with arguments for the preview"""
+        super().__init__()
+        self.preview_args = preview_args
+    
+    def compose(self) -> ComposeResult:
+        """Create the preview"""
+        yield NotePreview(**self.preview_args)
+
+
+def test_split_markdown_cuts_at_blank_lines():
+    """Test that chunks end between blocks and join back into the note"""
+    content = "\n\n".join(f"## Entry {i}\n\nSome text about entry {i}." for i in range(200))
+    chunks = split_markdown(content, chunk_chars=256)
+    assert len(chunks) > 10
+    assert ''.join(chunks) == content
+    assert all(chunk.endswith('\n\n') for chunk in chunks[:-1])
+
+
+def test_split_markdown_keeps_code_blocks_whole():
+    """Test that blank lines inside fenced code blocks are not cut at"""
+    block = "```python\ndef f():\n\n    return 1\n```"
+    content = "\n\n".join([block] * 100)
+    chunks = split_markdown(content, chunk_chars=64)
+    assert ''.join(chunks) == content
+    assert all(chunk.count('```') % 2 == 0 for chunk in chunks)
+
+
+def test_split_markdown_reopens_long_code_blocks():
+    """Test that a code block too long for one chunk is closed and reopened"""
+    content = "```python\n" + "".join(f"x = {i}\n" for i in range(1000)) + "```\n\nafter\n"
+    chunks = split_markdown(content, chunk_chars=256)
+    assert len(chunks) > 1
+    assert all(chunk.count('```') % 2 == 0 for chunk in chunks)
+    assert all(chunk.startswith('```python\n') for chunk in chunks[:-1])
+    assert chunks[-1].endswith('after\n')
+
+
+def test_split_markdown_without_blank_lines():
+    """Test that log-style notes are cut at line ends"""
+    content = "".join(f"2024-01-01 INFO event {i}\n" for i in range(2000))
+    chunks = split_markdown(content, chunk_chars=256)
+    assert len(chunks) > 1
+    assert ''.join(chunks) == content
+    assert all(chunk.endswith('\n') for chunk in chunks)
+
+
+def test_prefetch_runs_one_worker(tmp_path):
+    """Test that fast cursor moves share one prefetch worker and drop passed notes"""
+    notes = []
+    for i in range(40):
+        notes.append(tmp_path / f'note{i:02}.md')
+        notes[-1].write_text(f"# Note {i}\n\n" + "Some *text* and `code`.\n\n" * 200)
+    
+    async def run():
+        app = PreviewApp()
+        async with app.run_test(size=(80, 24)) as pilot:
+            preview = app.query_one(NotePreview)
+            peak = 0
+            for i in range(len(notes) - 3):
+                preview.prefetch(notes[i + 1:i + 4], 1)
+                running = [
+                    worker for worker in app.workers
+                    if worker.group == 'preview-prefetch'
+                    and worker.state in (WorkerState.PENDING, WorkerState.RUNNING)
+                ]
+                peak = max(peak, len(running))
+                await pilot.pause(0.005)
+            for _ in range(200):
+                if not preview._prefetch_running:
+                    break
+                await pilot.pause(0.02)
+            return peak, {key[0] for key in preview._prefetched}
+    
+    peak, prefetched = asyncio.run(run())
+    assert peak == 1
+    assert {str(note) for note in notes[-3:]} <= prefetched
+    assert len(prefetched) < len(notes) - 1
+
+
+def test_superseded_read_is_never_shown(tmp_path, monkeypatch):
+    """Test that a slow read finishing after the next selection is dropped"""
+    slow = tmp_path / 'slow.md'
+    fast = tmp_path / 'fast.md'
+    slow.write_text('# Slow note\n')
+    fast.write_text('# Fast note\n')
+    started, release, finished = threading.Event(), threading.Event(), threading.Event()
+    render_screen = NotePreview._render_screen
+    
+    def slow_render(preview, note_path, *args):
+        if note_path == slow:
+            started.set()
+            release.wait(5)
+        try:
+            return render_screen(preview, note_path, *args)
+        finally:
+            if note_path == slow:
+                finished.set()
+    
+    shown = []
+    show_note = NotePreview._show_note
+    
+    def record_show(preview, *args):
+        show_note(preview, *args)
+        shown.append(preview.current_note_content)
+    
+    monkeypatch.setattr(NotePreview, '_render_screen', slow_render)
+    monkeypatch.setattr(NotePreview, '_show_note', record_show)
+    
+    async def run():
+        app = PreviewApp()
+        async with app.run_test(size=(80, 24)) as pilot:
+            preview = app.query_one(NotePreview)
+            await pilot.pause()
+            preview.load_note(slow)
+            while not started.is_set():
+                await pilot.pause(0.01)
+            preview.load_note(fast)
+            while preview.current_note_content is None:
+                await pilot.pause(0.01)
+            release.set()
+            while not finished.is_set():
+                await pilot.pause(0.01)
+            await pilot.pause(0.1)
+            return preview.current_note_path, preview.current_note_content
+    
+    path, content = asyncio.run(run())
+    assert path == fast
+    assert content == '# Fast note\n'
+    assert shown == ['# Fast note\n']
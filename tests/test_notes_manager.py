@@ -2,9 +2,11 @@
 Tests for Notes Manager
 """
 
+import os
 import pytest
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from notes_tui.core import tree_snapshot
 from notes_tui.core.notes_manager import NotesManager
 
 
@@ -80,3 +82,145 @@ def test_search_notes(temp_notes_dir):
     results = manager.search_notes('test')
     assert len(results) == 1
     assert 'project.md' in str(results[0])
+
+
+def test_search_notes_parallel(temp_notes_dir):
+    """Test searching notes with parallel workers"""
+    manager = NotesManager(temp_notes_dir, search_workers=4)
+    results = manager.search_notes('notes')
+    assert [p.name for p in results] == ['thoughts.md']
+
+
+def test_get_directory_tree(temp_notes_dir):
+    """Test the tree layout, with and without recursion"""
+    (temp_notes_dir / 'work' / 'archive').mkdir()
+    (temp_notes_dir / 'work' / 'archive' / 'old.md').write_text('old')
+    (temp_notes_dir / 'work' / 'a-b.md').write_text('')
+    (temp_notes_dir / 'work' / 'a.md').write_text('')
+    (temp_notes_dir / 'work' / 'image.png').write_text('')
+    (temp_notes_dir / '.hidden').mkdir()
+    (temp_notes_dir / '.hidden' / 'secret.md').write_text('')
+    manager = NotesManager(temp_notes_dir)
+    
+    tree = manager.get_directory_tree()
+    assert [child.name for child in tree.children] == ['journals', 'personal', 'work']
+    work = tree.children[2]
+    assert [(child.name, child.is_dir) for child in work.children] == [
+        ('archive', True), ('a-b', False), ('a', False), ('project', False)
+    ]
+    assert work.children[1].path == str(temp_notes_dir / 'work' / 'a-b.md')
+    assert work.children[0].path == str(temp_notes_dir / 'work' / 'archive')
+    assert _shape(manager.get_directory_tree(iterative=True)) == _shape(tree)
+
+
+def test_concurrent_scan_matches_sequential(temp_notes_dir):
+    """Test that scanning folders on a thread pool builds the same tree"""
+    for i in range(20):
+        (temp_notes_dir / 'work' / f'sub{i}' / 'deeper').mkdir(parents=True)
+        (temp_notes_dir / 'work' / f'sub{i}' / 'deeper' / f'note{i}.md').write_text('')
+    tree = NotesManager(temp_notes_dir).get_directory_tree()
+    
+    manager = NotesManager(temp_notes_dir, scan_workers=8)
+    assert _shape(manager.get_directory_tree()) == _shape(tree)
+    assert len(manager.get_all_notes()) == 22
+    
+    (temp_notes_dir / 'work' / 'sub3' / 'deeper' / 'extra.md').write_text('')
+    manager.invalidate_paths()
+    assert len(manager.get_all_notes()) == 23
+
+
+def _shape(entry):
+    """Reduce a tree of entries to comparable tuples"""
+    return (entry.path, entry.is_dir, [_shape(child) for child in entry.children])
+
+
+def test_list_directory_is_one_level(temp_notes_dir):
+    """Test that listing a directory does not descend into subdirectories"""
+    (temp_notes_dir / 'work' / 'archive').mkdir()
+    (temp_notes_dir / 'work' / 'archive' / 'old.md').write_text('old')
+    manager = NotesManager(temp_notes_dir)
+    
+    root = manager.list_directory()
+    assert [child.name for child in root.children] == ['journals', 'personal', 'work']
+    assert all(not child.children for child in root.children)
+    
+    work = manager.list_directory(temp_notes_dir / 'work')
+    assert [child.name for child in work.children] == ['archive', 'project']
+
+
+def test_path_finder_follows_invalidation(temp_notes_dir):
+    """Test that the fuzzy path index is rebuilt after notes change"""
+    manager = NotesManager(temp_notes_dir)
+    assert len(manager.get_path_finder()) == 2
+    
+    (temp_notes_dir / 'work' / 'new.md').write_text('')
+    assert len(manager.get_path_finder()) == 2
+    manager.invalidate_paths()
+    assert len(manager.get_path_finder()) == 3
+
+
+def test_path_finder_is_replaced_when_rebuilt(temp_notes_dir):
+    """Test that a finder handed out is never changed by a rebuild"""
+    manager = NotesManager(temp_notes_dir)
+    old = manager.get_path_finder()
+    paths = list(old.paths)
+    
+    (temp_notes_dir / 'work' / 'new.md').write_text('')
+    manager.invalidate_paths()
+    new = manager.get_path_finder()
+    assert new is not old
+    assert old.paths == paths
+    assert len(new) == len(paths) + 1
+
+
+def _age_dirs(root, seconds=60):
+    """Backdate every folder's mtime so the snapshot trusts it"""
+    for directory in [root, *[p for p in root.rglob('*') if p.is_dir()]]:
+        st = directory.stat()
+        os.utime(directory, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 1_000_000_000))
+
+
+def test_snapshot_restores_tree_without_scanning(temp_notes_dir, monkeypatch):
+    """Test that a saved snapshot lists unchanged folders without reading them"""
+    with TemporaryDirectory() as cache_dir:
+        snapshot_path = Path(cache_dir) / 'tree.pickle'
+        _age_dirs(temp_notes_dir)
+        manager = NotesManager(temp_notes_dir, snapshot_path=snapshot_path)
+        assert not manager.load_snapshot()
+        manager.revalidate()
+        assert snapshot_path.exists()
+        
+        def fail(directory):
+            raise AssertionError(f"scanned {directory}")
+        
+        manager = NotesManager(temp_notes_dir, snapshot_path=snapshot_path)
+        assert manager.load_snapshot()
+        monkeypatch.setattr(tree_snapshot, 'scan_directory', fail)
+        assert [c.name for c in manager.list_directory().children] == [
+            'journals', 'personal', 'work'
+        ]
+        assert manager.revalidate() == []
+        assert manager.get_path_finder().paths == ['personal/thoughts', 'work/project']
+
+
+def test_snapshot_revalidation_rescans_changed_folders(temp_notes_dir):
+    """Test that revalidation picks up folders changed since the snapshot"""
+    with TemporaryDirectory() as cache_dir:
+        snapshot_path = Path(cache_dir) / 'tree.pickle'
+        _age_dirs(temp_notes_dir, 120)
+        NotesManager(temp_notes_dir, snapshot_path=snapshot_path).revalidate()
+        
+        (temp_notes_dir / 'work' / 'new.md').write_text('')
+        (temp_notes_dir / 'journals').rmdir()
+        _age_dirs(temp_notes_dir)
+        
+        manager = NotesManager(temp_notes_dir, snapshot_path=snapshot_path)
+        manager.load_snapshot()
+        # Folders whose mtime changed are never listed from the snapshot
+        assert [c.name for c in manager.list_directory().children] == [
+            'personal', 'work'
+        ]
+        # The root was already listed again above
+        assert manager.revalidate() == [temp_notes_dir / 'work']
+        assert manager.path_finder.paths == ['personal/thoughts', 'work/new', 'work/project']
+        assert str(temp_notes_dir / 'journals') not in manager.snapshot.dirs
@@ -0,0 +1,76 @@
+"""
+Tests for compiled search queries
+"""
+
+import pytest
+from notes_tui.core.query import Query
+
+
+CONTENT = '# Python Tutorial\nPython is great\nnothing here\nJS and python\n'
+
+
+def _lines(query):
+    """Matching line numbers for CONTENT, or None"""
+    found = Query(query).find_lines(CONTENT)
+    return None if found is None else [line_no for line_no, _ in found]
+
+
+def test_plain_query_is_substring():
+    """Test that plain queries keep substring semantics"""
+    assert Query('is great').is_plain
+    assert _lines('is great') == [2]
+    assert _lines('PYTHON') == [1, 2, 4]
+    assert _lines('ruby') is None
+
+
+def test_line_offsets():
+    """Test that line offsets point at the start of the matching line"""
+    found = Query('js').find_lines(CONTENT)
+    assert found == [(4, CONTENT.index('JS and'))]
+
+
+def test_phrase_and_regex_terms():
+    """Test quoted phrases and regex terms"""
+    assert _lines('"is great" OR /^js/') == [2, 4]
+    assert _lines('/tutor(ial)?/') == [1]
+
+
+def test_boolean_operators():
+    """Test AND, OR and NOT evaluation"""
+    assert _lines('python AND js') == [1, 2, 4]
+    assert _lines('python NOT tutorial') is None
+    assert _lines('(ruby OR js) python') == [1, 2, 4]
+    assert _lines('ruby OR nothing') == [3]
+
+
+def test_required_literals():
+    """Test literals used to narrow candidates with the index"""
+    assert Query('python AND "is great" OR js').required_literals() == []
+    assert Query('python "is great" NOT js').required_literals() == ['python', 'is great']
+
+
+@pytest.mark.parametrize('query', ['AND', 'NOT', 'python AND', 'NOT (python', '/[/ OR x'])
+def test_invalid_queries_match_literally(query):
+    """Test that malformed queries are searched for as typed"""
+    compiled = Query(query)
+    assert compiled.is_plain
+    assert compiled.error
+    expected = [
+        n for n, line in enumerate(CONTENT.split('\n'), 1) if query.lower() in line.lower()
+    ]
+    assert _lines(query) == (expected or None)
+    assert compiled.matches(f'text with {query.upper()} inside')
+
+
+def test_literal_fallback_lines():
+    """Test that a fallback query finds the lines holding its text"""
+    content = 'C++ AND Rust\nc++ only\n'
+    assert Query('c++ AND').find_lines(content) == [(1, 0)]
+    assert Query('NOT').find_lines('NOTHING\nnone') == [(1, 0)]
+
+
+def test_empty_query_matches_every_line():
+    """Test that the empty query matches every line"""
+    assert Query('').matches('')
+    assert _lines('') == [1, 2, 3, 4, 5]
+    assert _lines('   ') == [1, 2, 3, 4, 5]
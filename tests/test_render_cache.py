@@ -0,0 +1,42 @@
+"""
+Tests for the rendered note cache
+"""
+
+from notes_tui.core.render_cache import RenderCache
+
+
+def test_render_cache_evicts_by_size():
+    """Test that the least recently used notes are dropped to fit the budget"""
+    cache = RenderCache(max_bytes=100)
+    cache.put(('a.md', 1, 10, 80, 'dark'), 'a', 40)
+    cache.put(('b.md', 1, 10, 80, 'dark'), 'b', 40)
+    assert cache.get(('a.md', 1, 10, 80, 'dark')) == 'a'
+    
+    # Checking the size of an entry does not keep it
+    assert cache.size(('b.md', 1, 10, 80, 'dark')) == 40
+    cache.put(('c.md', 1, 10, 80, 'dark'), 'c', 40)
+    assert cache.get(('b.md', 1, 10, 80, 'dark')) is None
+    assert cache.size(('b.md', 1, 10, 80, 'dark')) == 0
+    assert cache.get(('a.md', 1, 10, 80, 'dark')) == 'a'
+    assert cache.total_bytes == 80
+
+
+def test_render_cache_keys():
+    """Test that a note is only found for the same mtime, size and width"""
+    cache = RenderCache()
+    cache.put(('a.md', 1, 10, 80, 'dark'), 'a', 10)
+    assert cache.get(('a.md', 2, 10, 80, 'dark')) is None
+    assert cache.get(('a.md', 1, 10, 60, 'dark')) is None
+    
+    # Replacing an entry does not count it twice
+    cache.put(('a.md', 1, 10, 80, 'dark'), 'a2', 30)
+    assert len(cache) == 1
+    assert cache.total_bytes == 30
+
+
+def test_render_cache_skips_oversized():
+    """Test that a note larger than the whole budget is not stored"""
+    cache = RenderCache(max_bytes=10)
+    cache.put('big', 'x', 11)
+    assert len(cache) == 0
+    assert cache.total_bytes == 0
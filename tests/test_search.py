@@ -5,7 +5,7 @@ Tests for Search functionality
 import pytest
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from notes_tui.core.search import Search
+from notes_tui.core.search import Search, scan_notes
 
 
 @pytest.fixture
@@ -35,7 +35,7 @@ def test_search_basic(temp_notes_with_search):
     
     assert len(results) == 2
     assert all('python' in r['relative_path'].name.lower() or 
-               any('Python' in line[1] for line in r['lines']) 
+               any('Python' in line[1] for line, in search.snippets(r))
                for r in results)
 
 
@@ -65,3 +65,146 @@ def test_search_results_sorted(temp_notes_with_search):
     # First result should have more matches
     if len(results) > 1:
         assert results[0]['matches'] >= results[1]['matches']
+
+
+def test_search_parallel_matches_sequential(temp_notes_with_search):
+    """Test that thread and process pool scans return the same ordered results"""
+    sequential = Search(temp_notes_with_search).search('python')
+    threaded = Search(temp_notes_with_search, workers=4).search('python')
+    processes = Search(temp_notes_with_search, workers=2, use_processes=True).search('python')
+    
+    assert threaded == sequential
+    assert processes == sequential
+
+
+def test_search_reuses_one_process_pool(temp_notes_with_search):
+    """Test that process pool scans share a pool that does not fork threads"""
+    search = Search(temp_notes_with_search, workers=2, use_processes=True, cache_size=0)
+    assert len(search.search('python')) == 2
+    pool = search._process_pool
+    assert pool is not None
+    assert pool._mp_context.get_start_method() != 'fork'
+    
+    assert len(search.search('javascript')) == 1
+    assert search._process_pool is pool
+    search.close()
+    assert search._process_pool is None
+
+
+def test_iter_search_streams_results(temp_notes_with_search):
+    """Test that streamed results match the ranked search"""
+    search = Search(temp_notes_with_search)
+    streamed = list(search.iter_search('python'))
+    
+    assert sorted(str(r['relative_path']) for r in streamed) == \
+        sorted(str(r['relative_path']) for r in search.search('python'))
+
+
+def test_search_boolean_query(temp_notes_with_search):
+    """Test boolean queries through Search"""
+    search = Search(temp_notes_with_search)
+    results = search.search('python NOT advanced')
+    
+    assert [r['relative_path'].name for r in results] == ['note1.md']
+
+
+def test_search_malformed_query_is_literal(temp_notes_with_search):
+    """Test that queries that cannot be parsed are searched for as typed"""
+    (temp_notes_with_search / 'cpp.md').write_text('Tips for c++ and Rust')
+    search = Search(temp_notes_with_search)
+    
+    assert [r['relative_path'].name for r in search.search('c++ AND')] == ['cpp.md']
+    assert [r['relative_path'].name for r in search.search('AND')] == ['cpp.md']
+    assert len(search.search('')) == 4
+
+
+def test_search_cache_invalidated_by_generation(temp_notes_with_search):
+    """Test that cached results are reused until the notes change"""
+    search = Search(temp_notes_with_search)
+    first = search.search('python')
+    
+    (temp_notes_with_search / "note4.md").write_text("More python")
+    assert search.search('Python') == first
+    
+    search.invalidate()
+    assert len(search.search('python')) == len(first) + 1
+
+
+def test_search_cache_narrows_prefix(temp_notes_with_search):
+    """Test that a longer query only rescans the hits of a cached prefix"""
+    search = Search(temp_notes_with_search)
+    search.search('pyth')
+    
+    # Not a hit for 'pyth', so the narrowed scan must not see it
+    (temp_notes_with_search / "note4.md").write_text("More python")
+    narrowed = search.search('python')
+    assert "note4.md" not in [r['relative_path'].name for r in narrowed]
+    streamed = list(search.iter_search('pytho'))
+    assert "note4.md" not in [r['relative_path'].name for r in streamed]
+
+
+def test_search_max_results(temp_notes_with_search):
+    """Test top-k search and stopping a streamed search after N results"""
+    search = Search(temp_notes_with_search, max_results=1)
+    full = search.search('python', limit=0)
+    
+    assert search.search('python') == full[:1]
+    assert len(list(search.iter_search('python'))) == 1
+    assert len(list(search.iter_search('python', limit=0))) == len(full)
+
+
+def test_search_snippets_are_lazy(temp_notes_with_search):
+    """Test that results carry offsets and context is extracted on demand"""
+    note = temp_notes_with_search / "context.md"
+    note.write_text("one\ntwo\nthree zebra\nfour\nfive\n")
+    search = Search(temp_notes_with_search)
+    
+    result, = search.search('zebra')
+    assert result['hits'] == [(3, 8)]
+    assert search.snippets(result) == [[(3, 'three zebra')]]
+    assert search.snippets(result, context=1) == [[(2, 'two'), (3, 'three zebra'), (4, 'four')]]
+
+
+@pytest.mark.parametrize('workers, use_processes', [(1, False), (4, False), (2, True)])
+def test_scan_notes_checks_cancellation_per_note(temp_notes_with_search, monkeypatch,
+                                                 workers, use_processes):
+    """Test that a cancelled scan stops reading notes even without matches"""
+    for i in range(200):
+        (temp_notes_with_search / f'extra{i:03}.md').write_text('nothing to see')
+    reads = []
+    
+    def read(note_path):
+        reads.append(note_path)
+        return 'nothing to see'
+    
+    monkeypatch.setattr('notes_tui.core.search._read_note', read)
+    note_paths = sorted(temp_notes_with_search.glob('*.md'))
+    found = list(scan_notes(note_paths, 'missing', workers=workers, use_processes=use_processes,
+                            cancelled=lambda: len(reads) >= 3))
+    assert found == []
+    assert len(reads) < len(note_paths) // 2
+
+
+def test_iter_search_cancelled_is_not_cached(temp_notes_with_search):
+    """Test that an abandoned search stops early and is not reused"""
+    search = Search(temp_notes_with_search)
+    assert list(search.iter_search('python', cancelled=lambda: True)) == []
+    assert len(list(search.iter_search('python'))) == 2
+
+
+@pytest.mark.parametrize('limit', [0, 1])
+def test_search_cancelled_is_not_cached(temp_notes_with_search, monkeypatch, limit):
+    """Test that search() stops reading notes once cancelled"""
+    for i in range(50):
+        (temp_notes_with_search / f'extra{i:02}.md').write_text('python')
+    search = Search(temp_notes_with_search)
+    reads = []
+    
+    def read(note_path):
+        reads.append(note_path)
+        return note_path.read_text()
+    
+    monkeypatch.setattr('notes_tui.core.search._read_note', read)
+    search.search('/pyth.n/', limit=limit, cancelled=lambda: len(reads) >= 3)
+    assert len(reads) == 3
+    assert len(search.search('/pyth.n/')) == 52
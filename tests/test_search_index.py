@@ -0,0 +1,199 @@
+"""
+Tests for the persistent search index
+"""
+
+import os
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from notes_tui.core.search import Search
+from notes_tui.core.search_index import SearchIndex
+
+
+@pytest.fixture
+def temp_notes_with_index():
+    """Create temporary notes and an index location outside the notes tree"""
+    with TemporaryDirectory() as notes_dir, TemporaryDirectory() as cache_dir:
+        notes_dir = Path(notes_dir)
+        (notes_dir / 'work').mkdir()
+        (notes_dir / 'note1.md').write_text('# Python Tutorial\nPython is great')
+        (notes_dir / 'note2.md').write_text('# JavaScript Guide\nJavaScript basics')
+        (notes_dir / 'work' / 'note3.md').write_text('# Python Advanced\nAdvanced Python topics')
+        
+        yield notes_dir, Path(cache_dir) / 'index.sqlite'
+
+
+def _summary(search, results):
+    """Reduce results to comparable tuples"""
+    return sorted(
+        (str(r['relative_path']), r['matches'], str(search.snippets(r))) for r in results
+    )
+
+
+def test_index_matches_full_scan(temp_notes_with_index):
+    """Test that indexed search returns the same results as a scan"""
+    notes_dir, index_path = temp_notes_with_index
+    indexed = Search(notes_dir, index_path=index_path)
+    scanned = Search(notes_dir)
+    
+    for query in ['python', 'PYTH', 'script', 'is great', '# Python', 'missing']:
+        assert _summary(indexed, indexed.search(query)) == _summary(scanned, scanned.search(query))
+
+
+def test_index_persists(temp_notes_with_index):
+    """Test that a warm start loads the index without re-reading notes"""
+    notes_dir, index_path = temp_notes_with_index
+    index = SearchIndex(notes_dir, index_path)
+    assert index.update() == 3
+    assert index_path.exists()
+    
+    warm = SearchIndex(notes_dir, index_path)
+    assert warm.update() == 0
+    assert len(warm) == 3
+
+
+def test_index_updates_changed_files(temp_notes_with_index):
+    """Test that only changed, new and deleted notes are re-indexed"""
+    notes_dir, index_path = temp_notes_with_index
+    index = SearchIndex(notes_dir, index_path)
+    index.update()
+    
+    changed = notes_dir / 'note2.md'
+    changed.write_text('# JavaScript Guide\nNow mentions Python too')
+    os.utime(changed, ns=(0, 0))
+    (notes_dir / 'note4.md').write_text('Rust notes')
+    (notes_dir / 'note1.md').unlink()
+    
+    assert index.update() == 3
+    assert set(index.candidates('python')) == {'note2.md', 'work/note3.md'}
+    assert index.candidates('rust') == {'note4.md': [1]}
+
+
+def test_index_narrows_boolean_queries(temp_notes_with_index):
+    """Test that boolean queries through the index match a full scan"""
+    notes_dir, index_path = temp_notes_with_index
+    indexed = Search(notes_dir, index_path=index_path)
+    scanned = Search(notes_dir)
+    
+    for query in ['python NOT advanced', '"is great" python', '/adv.nced/ OR guide']:
+        assert _summary(indexed, indexed.search(query)) == _summary(scanned, scanned.search(query))
+
+
+def test_index_ranks_by_bm25(temp_notes_with_index):
+    """Test that a long note repeating a term does not outrank focused notes"""
+    notes_dir, index_path = temp_notes_with_index
+    filler = 'lorem ipsum dolor sit amet\n' * 400
+    (notes_dir / 'long.md').write_text(f'python\n{filler}python\n{filler}')
+    search = Search(notes_dir, index_path=index_path)
+    
+    results = search.search('python')
+    assert results[0]['relative_path'].name != 'long.md'
+    assert results[-1]['relative_path'].name == 'long.md'
+    assert results[-1]['matches'] == 2
+    assert all(r['score'] > 0 for r in results)
+
+
+def test_index_statistics_are_incremental(temp_notes_with_index):
+    """Test that corpus size statistics follow changes without a rebuild"""
+    notes_dir, index_path = temp_notes_with_index
+    index = SearchIndex(notes_dir, index_path)
+    index.update()
+    expected = sum(p.stat().st_size for p in notes_dir.rglob('*.md'))
+    assert index.total_size == expected
+    
+    (notes_dir / 'note1.md').unlink()
+    index.update()
+    expected = sum(p.stat().st_size for p in notes_dir.rglob('*.md'))
+    assert index.total_size == expected
+    assert index.avg_size == expected / 2
+
+
+def test_index_top_k_matches_full_ranking(temp_notes_with_index):
+    """Test that bounded indexed search returns the head of the full ranking"""
+    notes_dir, index_path = temp_notes_with_index
+    for i in range(20):
+        (notes_dir / f'extra{i:02}.md').write_text('python\n' * (i % 4 + 1) + 'filler ' * i)
+    search = Search(notes_dir, index_path=index_path, cache_size=0)
+    
+    for query in ['python', 'python filler', 'python NOT advanced']:
+        full = search.search(query, limit=0)
+        for limit in [1, 3, 10, 100]:
+            assert search.search(query, limit=limit) == full[:limit]
+
+
+def test_index_edits_across_blocks(temp_notes_with_index, monkeypatch):
+    """Test that edits and deletions are merged into existing postings rows"""
+    monkeypatch.setattr('notes_tui.core.search_index.BLOCK_DOCS', 4)
+    monkeypatch.setattr('notes_tui.core.search_index.FLUSH_DOCS', 5)
+    notes_dir, index_path = temp_notes_with_index
+    for i in range(30):
+        (notes_dir / f'extra{i:02}.md').write_text(f'python\nshared word{i % 3}\n')
+    SearchIndex(notes_dir, index_path).update()
+    
+    for i in range(0, 30, 4):
+        (notes_dir / f'extra{i:02}.md').unlink()
+    for i in range(1, 30, 4):
+        edited = notes_dir / f'extra{i:02}.md'
+        edited.write_text('edited\n')
+        os.utime(edited, ns=(0, 0))
+    index = SearchIndex(notes_dir, index_path)
+    index.update()
+    
+    reopened = SearchIndex(notes_dir, index_path)
+    assert reopened.update() == 0
+    for query in ['python', 'word1', 'edited', 'shared']:
+        expected = {
+            path.relative_to(notes_dir).as_posix(): [
+                n for n, line in enumerate(path.read_text().splitlines(), 1)
+                if query in line.lower()
+            ]
+            for path in notes_dir.rglob('*.md') if query in path.read_text().lower()
+        }
+        assert reopened.candidates(query) == expected
+
+
+def test_index_replaces_unreadable_file(temp_notes_with_index):
+    """Test that a file left by an older index format is rebuilt"""
+    notes_dir, index_path = temp_notes_with_index
+    index_path.write_bytes(b'not a database')
+    index = SearchIndex(notes_dir, index_path)
+    assert index.update() == 3
+    assert set(index.candidates('python')) == {'note1.md', 'work/note3.md'}
+
+
+def test_index_snippets_seek_to_stored_offsets(temp_notes_with_index, monkeypatch):
+    """Test that snippets of index hits start at stored line offsets"""
+    notes_dir, index_path = temp_notes_with_index
+    lines = [f'filler İ line {i}' for i in range(1, 500)] + ['the zebra line', 'after']
+    (notes_dir / 'long.md').write_text('\n'.join(lines))
+    search = Search(notes_dir, index_path=index_path)
+    
+    result, = search.search('zebra')
+    assert result['hits'] == [(500, None)]
+    assert search.index.line_offsets('long.md', [1, 500, 502]) == [
+        0, len('\n'.join(lines[:499])) + 1, None
+    ]
+    assert search.snippets(result, context=1) == [
+        [(499, 'filler İ line 499'), (500, 'the zebra line'), (501, 'after')]
+    ]
+    
+    # The text is cut out at the stored offset without counting lines
+    second_line = len(lines[0]) + 1
+    monkeypatch.setattr(search.index, 'line_offsets', lambda rel, numbers: [second_line])
+    assert search.snippets(result) == [[(500, 'filler İ line 2')]]
+    
+    # Counting lines is only the fallback for offsets no longer starting a line
+    monkeypatch.setattr(search.index, 'line_offsets', lambda rel, numbers: [7])
+    assert search.snippets(result) == [[(500, 'the zebra line')]]
+
+
+def test_index_top_k_stops_when_cancelled(temp_notes_with_index, monkeypatch):
+    """Test that a cancelled top-k search reads no more candidates"""
+    notes_dir, index_path = temp_notes_with_index
+    search = Search(notes_dir, index_path=index_path)
+    reads = []
+    monkeypatch.setattr('notes_tui.core.search._read_note', lambda note_path: reads.append(note_path))
+    
+    # Two tokens on a line are verified against the note text
+    assert search.search('python tutorial', limit=1, cancelled=lambda: True) == []
+    assert reads == []
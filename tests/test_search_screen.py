@@ -0,0 +1,55 @@
+"""
+Tests for the search screen
+"""
+
+import asyncio
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from textual.app import App
+from textual.widgets import OptionList
+
+from notes_tui.core.search import Search
+from notes_tui.screens.search_screen import SearchScreen
+
+
+@pytest.fixture
+def ranked_notes():
+    """Create notes whose path order is the reverse of their relevance"""
+    with TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        filler = 'lorem ipsum dolor sit amet\n' * 50
+        for i in range(5):
+            # Later notes mention the term more often in less text
+            (tmpdir / f'note{i}.md').write_text('python\n' * (i + 1) + filler * (5 - i))
+        yield tmpdir
+
+
+async def _search(search: Search, query: str):
+    """Type a query and wait for the search to finish"""
+    screen = SearchScreen(search)
+    app = App()
+    async with app.run_test() as pilot:
+        app.push_screen(screen)
+        await pilot.pause()
+        await pilot.press(*query)
+        status = screen.query_one('#search-status')
+        for _ in range(100):
+            await pilot.pause(0.05)
+            if not str(status.render()).startswith('Searching'):
+                break
+        names = [result['relative_path'].name for result in screen.results]
+        options = screen.query_one('#search-results', OptionList).option_count
+    return names, options
+
+
+@pytest.mark.parametrize('max_results', [0, 2])
+def test_search_screen_ranks_final_results(ranked_notes, max_results):
+    """Test that streamed results are replaced by the best ranked ones"""
+    search = Search(ranked_notes, max_results=max_results)
+    expected = [r['relative_path'].name for r in Search(ranked_notes).search('python')]
+    assert expected[0] == 'note4.md'
+    
+    names, options = asyncio.run(_search(search, 'python'))
+    assert names == expected[:max_results or None]
+    assert options == len(names)
@@ -0,0 +1,58 @@
+"""
+Tests for the saved UI session
+"""
+
+import os
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from notes_tui.core.session import SessionState
+
+
+@pytest.fixture
+def temp_notes_dir():
+    """Create a temporary notes directory"""
+    with TemporaryDirectory() as notes_dir:
+        notes_dir = Path(notes_dir)
+        (notes_dir / 'work' / 'archive').mkdir(parents=True)
+        (notes_dir / 'work' / 'plan.md').write_text('# Plan')
+        yield notes_dir
+
+
+def test_session_round_trip(temp_notes_dir):
+    """Test that a recorded session is restored by the next run"""
+    with TemporaryDirectory() as cache_dir:
+        session_path = Path(cache_dir) / 'session.pickle'
+        session = SessionState(temp_notes_dir, session_path)
+        assert not session.load()
+        
+        session.record(
+            [temp_notes_dir / 'work', temp_notes_dir / 'work' / 'archive', Path('/elsewhere')],
+            temp_notes_dir / 'work' / 'plan.md',
+            12.0
+        )
+        session.save()
+        
+        restored = SessionState(temp_notes_dir, session_path)
+        assert restored.load()
+        assert restored.expanded == {'work', 'work/archive'}
+        assert restored.expanded_paths() == {
+            str(temp_notes_dir / 'work'), os.path.join(temp_notes_dir, 'work', 'archive')
+        }
+        assert restored.selected_path() == temp_notes_dir / 'work' / 'plan.md'
+        assert restored.preview_scroll == 12.0
+        
+        # Sessions belong to one notes directory
+        assert not SessionState(temp_notes_dir / 'work', session_path).load()
+
+
+def test_session_drops_missing_note(temp_notes_dir):
+    """Test that a note deleted since the last run is not selected"""
+    session = SessionState(temp_notes_dir)
+    session.record([], temp_notes_dir / 'work' / 'plan.md', 5.0)
+    (temp_notes_dir / 'work' / 'plan.md').unlink()
+    assert session.selected_path() is None
+    
+    session.record([], None, 5.0)
+    assert session.selected is None
+    assert session.preview_scroll == 0.0
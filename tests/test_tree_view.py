@@ -0,0 +1,175 @@
+"""
+Tests for the notes tree view, driven through Textual's pilot
+"""
+
+import asyncio
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from textual.app import App, ComposeResult
+
+from notes_tui.core.notes_manager import NotesManager
+from notes_tui.widgets.tree_view import NotesTreeView
+
+
+class TreeApp(App):
+    """App showing only a notes tree"""
+    
+    def __init__(self, root_dir: Path, **tree_args):
+        """Initialize with the notes directory and arguments for the tree"""
+        super().__init__()
+        self.root_dir = root_dir
+        self.tree_args = tree_args
+    
+    def compose(self) -> ComposeResult:
+        """Create the tree"""
+        yield NotesTreeView(NotesManager(self.root_dir), **self.tree_args)
+
+
+@pytest.fixture
+def temp_tree():
+    """Create a notes directory with a nested folder"""
+    with TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        (tmpdir / 'work' / 'sub').mkdir(parents=True)
+        for name in ['a', 'b', 'c']:
+            (tmpdir / 'work' / f'{name}.md').write_text(f'# {name}\n')
+        (tmpdir / 'work' / 'sub' / 'x.md').write_text('# x\n')
+        (tmpdir / 'top.md').write_text('# top\n')
+        yield tmpdir
+
+
+def _find(tree: NotesTreeView, path: Path):
+    """Get the node showing a path"""
+    stack = [tree.root]
+    while stack:
+        node = stack.pop()
+        if node.data is not None and node.data.path == str(path):
+            return node
+        stack.extend(node.children)
+    raise LookupError(path)
+
+
+def _nodes(tree: NotesTreeView) -> dict:
+    """Map the path of every node to its node id"""
+    nodes = {}
+    stack = [tree.root]
+    while stack:
+        node = stack.pop()
+        if node.data is not None:
+            nodes[node.data.path] = node.id
+        stack.extend(node.children)
+    return nodes
+
+
+def test_refresh_only_changes_affected_nodes(temp_tree):
+    """Test that adding, removing and renaming notes keeps every other node"""
+    work = temp_tree / 'work'
+    
+    async def run():
+        app = TreeApp(temp_tree)
+        async with app.run_test() as pilot:
+            tree = app.query_one(NotesTreeView)
+            await pilot.pause()
+            _find(tree, work).expand()
+            await pilot.pause()
+            _find(tree, work / 'sub').expand()
+            await pilot.pause()
+            tree.move_cursor(_find(tree, work / 'b.md'))
+            await pilot.pause()
+            before = _nodes(tree)
+            
+            (work / 'a.md').unlink()
+            (work / 'b2.md').write_text('# b2\n')
+            (work / 'c.md').rename(work / 'd.md')
+            tree.refresh_tree([work])
+            await pilot.pause()
+            
+            after = _nodes(tree)
+            labels = [str(child.label) for child in _find(tree, work).children]
+            return before, after, labels, tree.cursor_node.data.path, _find(tree, work / 'sub')
+    
+    before, after, labels, cursor, sub = asyncio.run(run())
+    assert labels == ['📁 sub', '📄 b', '📄 b2', '📄 d']
+    added = {str(work / 'b2.md'), str(work / 'd.md')}
+    removed = {str(work / 'a.md'), str(work / 'c.md')}
+    assert set(after) == set(before) - removed | added
+    # Nodes of unchanged entries are the same nodes, not rebuilt ones
+    assert {path: before[path] for path in set(before) - removed} == {
+        path: after[path] for path in set(after) - added
+    }
+    assert sub.is_expanded
+    assert cursor == str(work / 'b.md')
+
+
+@pytest.fixture
+def large_folder(temp_tree):
+    """Add a folder holding more notes than fit on a few pages"""
+    big = temp_tree / 'big'
+    big.mkdir()
+    for i in range(25):
+        (big / f'n{i:02}.md').write_text(f'# {i}\n')
+    yield temp_tree, big
+
+
+def _children(tree: NotesTreeView, folder: Path) -> list:
+    """Labels of a folder's child nodes"""
+    return [str(child.label).strip() for child in _find(tree, folder).children]
+
+
+def test_paging_through_placeholder(large_folder):
+    """Test that reaching the placeholder shows the next page under the cursor"""
+    root, big = large_folder
+    
+    async def run():
+        app = TreeApp(root, page_size=10)
+        async with app.run_test(size=(60, 50)) as pilot:
+            tree = app.query_one(NotesTreeView)
+            tree.focus()
+            await pilot.pause()
+            _find(tree, big).expand()
+            await pilot.pause()
+            first = _children(tree, big)
+            
+            tree.move_cursor(_find(tree, big / 'n09.md'))
+            await pilot.pause()
+            await pilot.press('down')
+            await pilot.pause()
+            second = _children(tree, big)
+            cursor = tree.cursor_node.data.path
+            
+            # A refresh keeps as many entries shown as before
+            (big / 'n09b.md').write_text('# new\n')
+            tree.refresh_tree([big])
+            await pilot.pause()
+            return first, second, cursor, _children(tree, big), tree.cursor_node.data.path
+    
+    first, second, cursor, refreshed, after = asyncio.run(run())
+    assert first == [f'📄 n{i:02}' for i in range(10)] + ['15 more…']
+    assert second == [f'📄 n{i:02}' for i in range(20)] + ['5 more…']
+    assert cursor == str(big / 'n10.md')
+    assert refreshed[:11] == [f'📄 n{i:02}' for i in range(10)] + ['📄 n09b']
+    assert refreshed[-1] == '6 more…' and len(refreshed) == 21
+    assert after == cursor
+
+
+def test_restore_state_across_pages(large_folder):
+    """Test that a saved note past the first page is shown and selected"""
+    root, big = large_folder
+    
+    async def run():
+        app = TreeApp(root, page_size=10)
+        async with app.run_test(size=(60, 50)) as pilot:
+            tree = app.query_one(NotesTreeView)
+            await pilot.pause()
+            tree.restore_state({str(big), str(root / 'work')}, big / 'n22.md')
+            await pilot.pause()
+            return (
+                _children(tree, big), tree.cursor_node.data.path,
+                sorted(str(path) for path in tree.expanded_folders())
+            )
+    
+    children, cursor, expanded = asyncio.run(run())
+    assert children == [f'📄 n{i:02}' for i in range(25)]
+    assert cursor == str(big / 'n22.md')
+    assert expanded == [str(big), str(root / 'work')]
@@ -0,0 +1,167 @@
+"""
+Tests for the file watcher
+"""
+
+import os
+import queue
+import time
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from notes_tui.core.search import Search
+from notes_tui.core.watcher import (
+    CREATED, DELETED, MIN_DEBOUNCE, MODIFIED, MOVED, FileEvent, InotifyWatcher,
+    PollingWatcher, Watcher, coalesce
+)
+
+
+@pytest.fixture
+def temp_notes_dir():
+    """Create a temporary notes directory"""
+    with TemporaryDirectory() as notes_dir:
+        notes_dir = Path(notes_dir)
+        (notes_dir / 'work').mkdir()
+        (notes_dir / 'note1.md').write_text('# Python Tutorial\nPython is great')
+        (notes_dir / 'work' / 'note2.md').write_text('# Rust Guide\nRust basics')
+        yield notes_dir
+
+
+def _collect(batches, timeout=5.0):
+    """Gather events from batches until none arrive for a moment"""
+    events = list(batches.get(timeout=timeout))
+    while True:
+        try:
+            events.extend(batches.get(timeout=0.5))
+        except queue.Empty:
+            return {(event.kind, event.path) for event in events}
+
+
+def test_coalesce_merges_bursts():
+    """Test that a burst of events is reduced to the net change per path"""
+    a, b, c = Path('/n/a.md'), Path('/n/b.md'), Path('/n/c.md')
+    events = coalesce([
+        FileEvent(CREATED, a),
+        FileEvent(MODIFIED, a),
+        FileEvent(CREATED, b),
+        FileEvent(DELETED, b),
+        FileEvent(DELETED, c),
+        FileEvent(CREATED, c),
+    ])
+    assert events == [FileEvent(CREATED, a), FileEvent(MODIFIED, c)]
+
+
+def test_coalesce_keeps_moves():
+    """Test that moves are passed through with their destination"""
+    move = FileEvent(MOVED, Path('/n/old'), True, Path('/n/new'))
+    assert coalesce([move, FileEvent(MODIFIED, Path('/n/x.md'))])[0] == move
+
+
+def test_watcher_requires_read_events(temp_notes_dir):
+    """Test that a watcher must say how it reads events"""
+    with pytest.raises(TypeError):
+        Watcher(temp_notes_dir, print)
+
+
+def test_watcher_debounce_has_a_floor(temp_notes_dir):
+    """Test that a zero debounce still waits between reads of a busy stream"""
+    timeouts = []
+    
+    class Stream(Watcher):
+        """Watcher reporting a change on every read"""
+        
+        def _read_events(self, timeout):
+            timeouts.append(timeout)
+            self._stop.wait(timeout)
+            return [FileEvent(MODIFIED, self.root_dir / 'busy.md')]
+    
+    batches = []
+    watcher = Stream(temp_notes_dir, batches.append, debounce=0)
+    assert watcher.debounce == MIN_DEBOUNCE
+    watcher.start()
+    time.sleep(1.0)
+    watcher.stop()
+    assert batches
+    assert min(timeouts) >= MIN_DEBOUNCE
+    assert len(timeouts) < 1.0 / MIN_DEBOUNCE
+
+
+def _check_watcher(watcher_class, notes_dir, **kwargs):
+    """Run a watcher through creating, changing and deleting notes"""
+    batches = queue.Queue()
+    watcher = watcher_class(notes_dir, batches.put, debounce=0.1, **kwargs)
+    watcher.start()
+    try:
+        new_note = notes_dir / 'work' / 'new.md'
+        new_note.write_text('# New')
+        assert (CREATED, new_note) in _collect(batches)
+        
+        note1 = notes_dir / 'note1.md'
+        note1.write_text('# Python Tutorial\nUpdated content')
+        st = note1.stat()
+        # Make sure the change is visible to mtime based polling
+        os.utime(note1, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert (MODIFIED, note1) in _collect(batches)
+        
+        new_note.unlink()
+        assert (DELETED, new_note) in _collect(batches)
+        
+        # Hidden files are not reported
+        (notes_dir / '.hidden.md').write_text('secret')
+        with pytest.raises(queue.Empty):
+            batches.get(timeout=0.5)
+    finally:
+        watcher.stop()
+
+
+def test_polling_watcher(temp_notes_dir):
+    """Test that the polling watcher reports changes to notes"""
+    _check_watcher(PollingWatcher, temp_notes_dir, interval=0.05)
+
+
+@pytest.mark.skipif(not InotifyWatcher.available(), reason="inotify not available")
+def test_inotify_watcher(temp_notes_dir):
+    """Test that the inotify watcher reports changes to notes"""
+    _check_watcher(InotifyWatcher, temp_notes_dir)
+
+
+@pytest.mark.skipif(not InotifyWatcher.available(), reason="inotify not available")
+def test_inotify_watcher_follows_new_folders(temp_notes_dir):
+    """Test that notes in folders created after start are reported"""
+    batches = queue.Queue()
+    watcher = InotifyWatcher(temp_notes_dir, batches.put, debounce=0.1)
+    watcher.start()
+    try:
+        (temp_notes_dir / 'projects').mkdir()
+        note = temp_notes_dir / 'projects' / 'plan.md'
+        note.write_text('# Plan')
+        events = _collect(batches)
+        assert (CREATED, temp_notes_dir / 'projects') in events
+        
+        note.write_text('# Plan\nMore')
+        assert (MODIFIED, note) in _collect(batches)
+    finally:
+        watcher.stop()
+
+
+def test_update_notes_reindexes_single_files(temp_notes_dir, monkeypatch):
+    """Test that changed notes are re-indexed without rescanning the tree"""
+    with TemporaryDirectory() as cache_dir:
+        search = Search(temp_notes_dir, index_path=Path(cache_dir) / 'index.sqlite')
+        assert len(search.search('python')) == 1
+        
+        note = temp_notes_dir / 'work' / 'new.md'
+        note.write_text('# Python Notes')
+        (temp_notes_dir / 'note1.md').unlink()
+        search.update_notes([note, temp_notes_dir / 'note1.md'])
+        
+        def fail():
+            raise AssertionError("walked the whole tree")
+        
+        with monkeypatch.context() as patch:
+            patch.setattr(search.catalog, 'refresh', fail)
+            assert [r['relative_path'] for r in search.search('python')] == [Path('work/new.md')]
+        
+        # A folder change falls back to a full refresh
+        (temp_notes_dir / 'work' / 'note2.md').write_text('# Python Guide')
+        search.update_notes([temp_notes_dir / 'work'])
+        assert len(search.search('python')) == 2